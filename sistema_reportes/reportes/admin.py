@@ -1,12 +1,26 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import OrganismoSectorial, PPDA, Medida, Indicador, MedidaAvance, ReporteAnual, Actividad, PerfilUsuario
+from .models import (
+    OrganismoSectorial, PPDA, Medida, Indicador, MedidaAvance, ReporteAnual, Actividad, PerfilUsuario, ReglaAlerta,
+    AlertaCritica
+)
+from .busqueda import consulta_busqueda
 
 # Organización del admin por grupos lógicos
 class BaseAdmin(admin.ModelAdmin):
     list_per_page = 20
 
+class BusquedaTextoAdmin(BaseAdmin):
+    """
+    Busca sobre la columna `busqueda` (índice GIN de texto completo) en vez
+    de aplicar icontains a cada campo de search_fields.
+    """
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(busqueda=consulta_busqueda(search_term)), False
+
 # Registra los modelos en el panel de administración agrupados por categorías
 @admin.register(OrganismoSectorial)
 class OrganismoSectorialAdmin(BaseAdmin):
@@ -19,7 +33,7 @@ class OrganismoSectorialAdmin(BaseAdmin):
     )
 
 @admin.register(PPDA)
-class PPDAAdmin(BaseAdmin):
+class PPDAAdmin(BusquedaTextoAdmin):
     list_display = ('nombre', 'descripcion', 'fecha_inicio', 'fecha_termino', 'organismo')
     list_filter = ('organismo',)
     search_fields = ('nombre', 'descripcion')
@@ -33,10 +47,10 @@ class PPDAAdmin(BaseAdmin):
     )
 
 @admin.register(Medida)
-class MedidaAdmin(BaseAdmin):
+class MedidaAdmin(BusquedaTextoAdmin):
     list_display = ('nombre', 'tipo', 'prioridad', 'organismo_responsable')
     list_filter = ('tipo', 'prioridad', 'organismo_responsable')
-    search_fields = ('nombre',)
+    search_fields = ('nombre', 'descripcion')
     fieldsets = (
         ('Identificación', {
             'fields': ('nombre', 'tipo', 'prioridad')
@@ -61,10 +75,10 @@ class IndicadorAdmin(BaseAdmin):
     )
 
 @admin.register(MedidaAvance)
-class MedidaAvanceAdmin(BaseAdmin):
+class MedidaAvanceAdmin(BusquedaTextoAdmin):
     list_display = ('medida', 'descripcion', 'avance', 'estado', 'fecha_limite')
     list_filter = ('estado', 'medida')
-    search_fields = ('descripcion',)
+    search_fields = ('descripcion', 'observaciones')
     fieldsets = (
         ('Seguimiento', {
             'fields': ('medida', 'descripcion', 'fecha_limite')
@@ -89,7 +103,7 @@ class ReporteAnualAdmin(BaseAdmin):
     )
 
 @admin.register(Actividad)
-class ActividadAdmin(BaseAdmin):
+class ActividadAdmin(BusquedaTextoAdmin):
     list_display = ('nombre', 'fecha_inicio', 'fecha_termino', 'organismo_responsable', 'medida')
     search_fields = ('nombre', 'descripcion')
     list_filter = ('organismo_responsable',)
@@ -102,17 +116,30 @@ class ActividadAdmin(BaseAdmin):
         }),
     )
 
+@admin.register(ReglaAlerta)
+class ReglaAlertaAdmin(BaseAdmin):
+    list_display = ('nombre', 'unidad', 'ppda', 'umbral', 'ventana_horas', 'descripcion', 'activa')
+    list_filter = ('activa', 'ppda')
+    search_fields = ('nombre', 'descripcion')
+
+@admin.register(AlertaCritica)
+class AlertaCriticaAdmin(BaseAdmin):
+    list_display = ('descripcion', 'estado', 'fecha_alerta', 'estacion', 'valor', 'organismo_sectorial', 'ppda')
+    list_filter = ('estado', 'regla', 'organismo_sectorial')
+    readonly_fields = ('regla', 'estacion', 'valor', 'fecha_medicion')
+
 @admin.register(PerfilUsuario)
 class PerfilUsuarioAdmin(BaseAdmin):
-    list_display = ('user', 'rol', 'fecha_creacion', 'fecha_actualizacion')
+    list_display = ('user', 'rol', 'organismo', 'fecha_creacion', 'fecha_actualizacion')
+    list_select_related = ('user', 'organismo')
     search_fields = ('user__username', 'rol')
-    list_filter = ('rol',)
+    list_filter = ('rol', 'organismo')
     fieldsets = (
         ('Información de Usuario', {
             'fields': ('user',)
         }),
         ('Roles y Permisos', {
-            'fields': ('rol',)
+            'fields': ('rol', 'organismo')
         }),
     )
 
@@ -1,17 +1,11 @@
-import requests
+from django.conf import settings
 
-def obtener_datos_airecoo():
+from .integraciones import iterar_respuesta
+
+def iterar_datos_airecoo(desde=None):
     """
-    Obtiene datos desde la API de Airecoo.
+    Recorre los registros de Airecoo a medida que llegan (modo stream). Con
+    `desde` solo se piden lecturas posteriores a esa fecha.
     """
-    url = "http://www.airecoo.mma.gob.cl/api/calidad-aire"  # URL ficticia, reemplazar por la API real
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()  # Retorna los datos en formato JSON
-        else:
-            print(f"Error al obtener datos de Airecoo: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Excepción al conectar con Airecoo: {e}")
-        return None
\ No newline at end of file
+    params = {"desde": desde.isoformat()} if desde else None
+    return iterar_respuesta('Airecoo', settings.AIRECOO_API_URL, params=params)
@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .grupos import tiene_grupo
+from .models import PerfilUsuario
+
+CLAVE_ORGANISMO_USUARIO = 'organismo_usuario:{}'
+CLAIM_ORGANISMO = 'organismo'
+
+# Grupos que ven los datos de todos los organismos
+GRUPOS_SIN_ALCANCE = ('admin', 'auditor')
+
+# Alcance de un usuario sin privilegios ni organismo asignado: ningún
+# organismo tiene este id, así que sus lecturas quedan vacías
+SIN_ORGANISMO = 0
+
+
+def _clave(user_id):
+    return CLAVE_ORGANISMO_USUARIO.format(user_id)
+
+
+def organismo_de_usuario(user):
+    """
+    Retorna el id del organismo del perfil del usuario, o None.
+
+    Se memoriza en el objeto usuario y en la cache de Django, que se
+    invalida desde signals.py cuando se guarda o elimina el perfil.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+
+    if not hasattr(user, '_organismo_cache'):
+        # Se guarda en una tupla para distinguir "sin organismo" de "no está en cache"
+        guardado = cache.get(_clave(user.pk))
+        if guardado is None:
+            guardado = (
+                PerfilUsuario.objects.filter(user_id=user.pk).values_list('organismo_id', flat=True).first(),
+            )
+            cache.set(_clave(user.pk), guardado, getattr(settings, 'GRUPOS_CACHE_TIMEOUT', 300))
+        user._organismo_cache = guardado[0]
+    return user._organismo_cache
+
+
+def _resolver_alcance(request):
+    if request.user.is_superuser or tiene_grupo(request, *GRUPOS_SIN_ALCANCE):
+        return None
+    token = getattr(request, 'auth', None)
+    if token is not None and hasattr(token, 'get') and CLAIM_ORGANISMO in token:
+        organismo = token[CLAIM_ORGANISMO]
+    else:
+        organismo = organismo_de_usuario(request.user)
+    return SIN_ORGANISMO if organismo is None else organismo
+
+
+def alcance_de_request(request):
+    """
+    Id del organismo al que se restringen los datos de la request, o None
+    si el usuario ve todos (superusuarios y grupos sin alcance). Un perfil
+    sin organismo asignado tiene alcance SIN_ORGANISMO: no ve datos.
+
+    Se resuelve una vez por request. Si el token JWT trae el claim de
+    organismo no se consulta la base de datos.
+    """
+    if not hasattr(request, '_alcance_organismo'):
+        request._alcance_organismo = _resolver_alcance(request)
+    return request._alcance_organismo
+
+
+def verificar_organismos(request, organismo_ids):
+    """
+    Rechaza la request si alguno de los organismos está fuera de su alcance.
+    """
+    organismo = alcance_de_request(request)
+    if organismo == SIN_ORGANISMO:
+        raise PermissionDenied("Usuario no tiene organismo asignado")
+    if organismo is not None and any(organismo_id != organismo for organismo_id in organismo_ids):
+        raise PermissionDenied("No tiene acceso a datos de otro organismo")
+
+
+def guardar_en_alcance(request, serializer, campo):
+    """
+    Guarda el serializer fijando `campo` (FK a OrganismoSectorial) al
+    organismo de la request. Sin alcance se usa el organismo indicado, que
+    es obligatorio al crear.
+    """
+    organismo = alcance_de_request(request)
+    if organismo == SIN_ORGANISMO:
+        raise PermissionDenied("Usuario no tiene organismo asignado")
+    if organismo is None:
+        if serializer.instance is None and not serializer.validated_data.get(campo):
+            raise ValidationError({campo: ["Este campo es requerido."]})
+        return serializer.save()
+    serializer.validated_data.pop(campo, None)
+    return serializer.save(**{f'{campo}_id': organismo})
+
+
+def filtrar_por_alcance(request, queryset, campo):
+    """
+    Restringe el queryset al organismo de la request con un solo predicado
+    sobre `campo`. Sin alcance se retorna tal cual.
+    """
+    organismo = alcance_de_request(request)
+    if organismo is None:
+        return queryset
+    return queryset.filter(**{campo: organismo})
+
+
+class AlcanceOrganismoFilter(BaseFilterBackend):
+    """
+    Aplica filtrar_por_alcance con el campo `campo_organismo` de la vista.
+    Las vistas sin ese atributo no se filtran.
+    """
+    def filter_queryset(self, request, queryset, view):
+        campo = getattr(view, 'campo_organismo', None)
+        if campo is None:
+            return queryset
+        return filtrar_por_alcance(request, queryset, campo)
+
+
+def invalidar_organismo(user_ids):
+    cache.delete_many([_clave(user_id) for user_id in user_ids])
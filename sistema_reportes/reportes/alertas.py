@@ -0,0 +1,175 @@
+import hashlib
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache_respuestas import versiones_modelos
+from .models import AlertaCritica, Indicador, ReglaAlerta
+
+CLAVE_REGLAS = 'alertas:reglas:{}'
+
+Regla = namedtuple('Regla', 'id nombre unidad ppda_id umbral ventana descripcion')
+
+
+def reglas_compiladas():
+    """
+    Reglas activas agrupadas por parámetro, desde la cache. La clave lleva
+    la versión de ReglaAlerta, que cambia con cada save/delete.
+    """
+    clave = CLAVE_REGLAS.format(*versiones_modelos((ReglaAlerta,)))
+    reglas = cache.get(clave)
+    if reglas is None:
+        reglas = defaultdict(list)
+        for fila in ReglaAlerta.objects.filter(activa=True).order_by('id').values_list(
+            'id', 'nombre', 'unidad', 'ppda_id', 'umbral', 'ventana_horas', 'descripcion'
+        ):
+            regla = Regla(*fila)
+            reglas[regla.nombre].append(regla._replace(ventana=regla.ventana and timedelta(hours=regla.ventana)))
+        reglas = dict(reglas)
+        cache.set(clave, reglas, getattr(settings, 'REFERENCIAS_CACHE_TIMEOUT', 86400))
+    return reglas
+
+
+def _aplica(regla, lectura):
+    return (not regla.unidad or regla.unidad == lectura.unidad) and regla.ppda_id in (None, lectura.ppda_id)
+
+
+def _serie(lectura):
+    return (lectura.nombre, lectura.estacion, lectura.organismo_sectorial_id, lectura.ppda_id)
+
+
+def _promedios_moviles(pendientes):
+    """
+    Calcula el promedio móvil de cada (regla, lectura) pendiente con una
+    sola consulta: el historial de las series del lote entre la primera
+    ventana y la última lectura, sumado con prefijos por serie.
+    """
+    desde = min(lectura.fecha_medicion - regla.ventana for regla, lectura in pendientes)
+    hasta = max(lectura.fecha_medicion for _, lectura in pendientes)
+    series = {_serie(lectura) for _, lectura in pendientes}
+    historial = defaultdict(list)
+    for *serie, fecha, valor in Indicador.objects.filter(
+        nombre__in={serie[0] for serie in series},
+        estacion__in={serie[1] for serie in series},
+        fecha_medicion__gt=desde,
+        fecha_medicion__lte=hasta,
+    ).order_by('fecha_medicion').values_list(
+        'nombre', 'estacion', 'organismo_sectorial_id', 'ppda_id', 'fecha_medicion', 'valor'
+    ):
+        if tuple(serie) in series:
+            historial[tuple(serie)].append((fecha, valor))
+
+    acumulados = {}
+    for serie, filas in historial.items():
+        fechas = [fecha for fecha, _ in filas]
+        acumulados[serie] = (fechas, [0, *accumulate(valor for _, valor in filas)])
+
+    promedios = []
+    for regla, lectura in pendientes:
+        fechas, sumas = acumulados.get(_serie(lectura), ([], [0]))
+        inicio = bisect_right(fechas, lectura.fecha_medicion - regla.ventana)
+        fin = bisect_right(fechas, lectura.fecha_medicion)
+        if fin > inicio:
+            promedios.append((regla, lectura, (sumas[fin] - sumas[inicio]) / (fin - inicio)))
+    return promedios
+
+
+def calcular_clave_deduplicacion(regla, lectura):
+    dia = timezone.localtime(lectura.fecha_medicion).date().isoformat()
+    partes = [str(regla.id), *map(str, _serie(lectura)[1:]), dia]
+    return hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+
+def _descripcion(regla, lectura, valor):
+    medida = f"promedio {int(regla.ventana.total_seconds() // 3600)} h" if regla.ventana else "lectura"
+    return (
+        f"{regla.descripcion or regla.nombre}: {medida} de {valor:.2f} {lectura.unidad} supera el umbral "
+        f"{regla.umbral:g} en {lectura.estacion or 'estación sin nombre'}"
+    )
+
+
+def evaluar_lecturas(lecturas):
+    """
+    Compara un lote de lecturas ya guardadas con las reglas activas y crea
+    las AlertaCritica que correspondan. Retorna la cantidad de alertas nuevas.
+
+    Las lecturas deben estar guardadas, porque el promedio móvil se calcula
+    con el historial de la base. Se genera a lo más una alerta por regla,
+    serie (parámetro, estación, organismo y PPDA) y día, con el mayor valor
+    del lote; volver a evaluar las mismas lecturas no crea duplicados. El
+    costo depende del lote: las reglas vienen de la cache y el historial
+    se limita a las series y al rango de fechas del lote.
+    """
+    reglas = reglas_compiladas()
+    if not reglas:
+        return 0
+
+    excedidas = []
+    pendientes = []
+    for lectura in lecturas:
+        for regla in reglas.get(lectura.nombre, ()):
+            if not _aplica(regla, lectura):
+                continue
+            if regla.ventana:
+                pendientes.append((regla, lectura))
+            elif lectura.valor > regla.umbral:
+                excedidas.append((regla, lectura, lectura.valor))
+    if pendientes:
+        excedidas.extend(fila for fila in _promedios_moviles(pendientes) if fila[2] > fila[0].umbral)
+    if not excedidas:
+        return 0
+
+    alertas = {}
+    for regla, lectura, valor in excedidas:
+        clave = calcular_clave_deduplicacion(regla, lectura)
+        if clave not in alertas or valor > alertas[clave].valor:
+            alertas[clave] = AlertaCritica(
+                descripcion=_descripcion(regla, lectura, valor),
+                estado='pendiente',
+                organismo_sectorial_id=lectura.organismo_sectorial_id,
+                ppda_id=lectura.ppda_id,
+                regla_id=regla.id,
+                estacion=lectura.estacion,
+                valor=valor,
+                fecha_medicion=lectura.fecha_medicion,
+                clave_deduplicacion=clave,
+            )
+
+    existentes = set(
+        AlertaCritica.objects.filter(clave_deduplicacion__in=alertas.keys()).values_list(
+            'clave_deduplicacion', flat=True
+        )
+    )
+    nuevas = [alerta for clave, alerta in alertas.items() if clave not in existentes]
+    if nuevas:
+        # ignore_conflicts cubre dos evaluaciones concurrentes del mismo día
+        AlertaCritica.objects.bulk_create(nuevas, ignore_conflicts=True)
+    return len(nuevas)
+
+
+def evaluar_periodo(desde=None, hasta=None, tamano_lote=None):
+    """
+    Vuelve a evaluar las lecturas guardadas entre `desde` y `hasta` (por
+    ejemplo, tras crear una regla) en lotes del tamaño de la ingesta.
+    """
+    tamano_lote = tamano_lote or settings.INTEGRACION_TAMANO_LOTE
+    lecturas = Indicador.objects.only(
+        'nombre', 'valor', 'unidad', 'estacion', 'fecha_medicion', 'organismo_sectorial_id', 'ppda_id'
+    ).order_by('fecha_medicion', 'id')
+    if desde is not None:
+        lecturas = lecturas.filter(fecha_medicion__gte=desde)
+    if hasta is not None:
+        lecturas = lecturas.filter(fecha_medicion__lte=hasta)
+
+    creadas = 0
+    iterador = lecturas.iterator(chunk_size=tamano_lote)
+    while True:
+        lote = list(islice(iterador, tamano_lote))
+        if not lote:
+            return creadas
+        creadas += evaluar_lecturas(lote)
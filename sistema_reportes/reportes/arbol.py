@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+
+from .cache_respuestas import calcular_etag, versiones_modelos
+from .models import Actividad, Indicador, Medida, MedidaAvance, OrganismoSectorial, PPDA
+from .serializers import PPDAArbolSerializer
+
+CLAVE_ARBOL = 'arbol_ppda:{}'
+
+# Modelos cuyas filas forman parte del árbol; cualquier escritura cambia su versión
+MODELOS_ARBOL = (PPDA, Medida, MedidaAvance, Actividad, Indicador, OrganismoSectorial)
+
+
+def prefetch_arbol():
+    """
+    Prefetch del árbol: una consulta por nivel (medidas, avances, actividades
+    e indicadores) sin importar cuántas filas tenga cada uno. Los indicadores
+    se limitan a los más recientes; el queryset recortado sólo se puede
+    precargar con to_attr.
+    """
+    return [
+        Prefetch('medidas', queryset=Medida.objects.order_by('id').prefetch_related(
+            Prefetch('avances', queryset=MedidaAvance.objects.order_by('fecha_limite', 'id')),
+            Prefetch('actividades', queryset=Actividad.objects.order_by('fecha_inicio', 'id')),
+        )),
+        Prefetch(
+            'indicadores',
+            queryset=Indicador.objects.order_by('-fecha_medicion', '-id')[:settings.PPDA_ARBOL_MAX_INDICADORES],
+            to_attr='indicadores_recientes',
+        ),
+    ]
+
+
+def etag_arbol(ppda_id):
+    return calcular_etag('arbol', ppda_id, versiones_modelos(MODELOS_ARBOL))
+
+
+def arbol_ppda(ppda, contexto, etag=None):
+    """
+    Retorna el árbol serializado del PPDA desde la cache. La clave lleva las
+    versiones de MODELOS_ARBOL, por lo que cualquier cambio en una fila del
+    árbol (o en otra fila de esos modelos) lo vuelve a armar.
+    """
+    clave = CLAVE_ARBOL.format(etag or etag_arbol(ppda.pk))
+    usar_cache = getattr(settings, 'RESPUESTAS_CACHE', True)
+    datos = cache.get(clave) if usar_cache else None
+    if datos is None:
+        prefetch_related_objects([ppda], *prefetch_arbol())
+        datos = PPDAArbolSerializer(ppda, context=contexto).data
+        if usar_cache:
+            cache.set(clave, datos, settings.PPDA_ARBOL_CACHE_TIMEOUT)
+    return datos
@@ -0,0 +1,91 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from .listas import valores_lista
+from .views import (
+    ActividadViewSet, IndicadorViewSet, MedidaAvanceViewSet, OrganismoSectorialViewSet, PPDAViewSet,
+    ReporteAnualViewSet, ReporteConsolidadoViewSet,
+)
+
+# Parámetros de listado que se auditan por ViewSet: sin filtros y con cada
+# filtro que expone get_queryset
+CONSULTAS_AUDITORIA = [
+    (OrganismoSectorialViewSet, [{}, {'nombre': 'SEA'}]),
+    (PPDAViewSet, [{}, {'organismo_id': '1'}]),
+    (MedidaAvanceViewSet, [{}, {'estado': 'P'}, {'avance_min': '50'}]),
+    (IndicadorViewSet, [{}, {'nombre': 'PM2.5'}, {'organismo_id': '1'}, {'ppda_id': '1'}, {'desde': '2024-01-01'}]),
+    (ActividadViewSet, [{}, {'medida_id': '1'}]),
+    (ReporteAnualViewSet, [{}, {'periodo': '2024-12-31'}, {'organismo_id': '1'}]),
+    (ReporteConsolidadoViewSet, [{}, {'organismo_id': '1'}, {'ppda_id': '1'}]),
+]
+
+
+def queryset_de_listado(vista, parametros):
+    """
+    Reproduce el queryset que ejecuta el `list` del ViewSet con los
+    parámetros dados: filtros, modo .values() y tamaño de página.
+    """
+    request = Request(APIRequestFactory().get('/', parametros))
+    request.user = User(is_superuser=True)
+    instancia = vista(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+    queryset = instancia.filter_queryset(instancia.get_queryset())
+    campos = getattr(instancia, 'campos_lista', None)
+    if campos:
+        organismos = getattr(instancia, 'campos_lista_organismo', {})
+        queryset = valores_lista(queryset, {**campos, **{columna: columna for columna in organismos.values()}})
+    return queryset[:api_settings.PAGE_SIZE or 20]
+
+
+def recorrer_plan(nodo):
+    """
+    Recorre el plan de EXPLAIN (FORMAT JSON) y retorna sus nodos en orden.
+    """
+    yield nodo
+    for hijo in nodo.get('Plans', []):
+        yield from recorrer_plan(hijo)
+
+
+def _filas_por_tabla(tablas):
+    if not tablas:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)', [list(tablas)])
+        # reltuples es -1 en tablas que aún no se han analizado
+        return {tabla: int(filas) if filas >= 0 else None for tabla, filas in cursor.fetchall()}
+
+
+def auditar_consultas(analizar=False, min_filas=1000):
+    """
+    Ejecuta EXPLAIN sobre el listado de cada ViewSet y retorna, por consulta,
+    el costo estimado y los Seq Scan del plan. Un Seq Scan se marca cuando la
+    tabla tiene al menos `min_filas` filas según las estadísticas de
+    PostgreSQL (en tablas pequeñas el planner lo elige con razón).
+    """
+    resultados = []
+    for vista, variantes in CONSULTAS_AUDITORIA:
+        for parametros in variantes:
+            plan = json.loads(queryset_de_listado(vista, parametros).explain(format='json', analyze=analizar))
+            raiz = plan[0]['Plan']
+            scans = [
+                {'tabla': nodo['Relation Name'], 'filtro': nodo.get('Filter', '')}
+                for nodo in recorrer_plan(raiz) if nodo['Node Type'] == 'Seq Scan'
+            ]
+            resultados.append({
+                'vista': vista.__name__,
+                'parametros': parametros,
+                'costo': raiz['Total Cost'],
+                'ms': raiz.get('Actual Total Time'),
+                'seq_scans': scans,
+            })
+
+    filas = _filas_por_tabla({scan['tabla'] for resultado in resultados for scan in resultado['seq_scans']})
+    for resultado in resultados:
+        for scan in resultado['seq_scans']:
+            scan['filas_tabla'] = filas.get(scan['tabla'])
+            scan['marcado'] = (scan['filas_tabla'] or 0) >= min_filas
+    return resultados
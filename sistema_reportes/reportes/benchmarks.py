@@ -0,0 +1,593 @@
+import asyncio
+import datetime
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework.test import APIClient
+
+from .datos_sinteticos import analizar_tablas, generar_datos
+from .ingesta import guardar_datos_airecoo, guardar_datos_snifa
+from .listas import formatear_filas, valores_lista
+from .models import Indicador, Medida, MedidaAvance, OrganismoSectorial, PPDA
+from .renderers import CamelCaseORJSONRenderer
+from .serializers import IndicadorSerializer, MedidaAvanceSerializer, TokenConGruposSerializer
+from .urls import router
+from .views import IndicadorViewSet, MedidaAvanceViewSet
+
+
+def medir(funcion, repeticiones=5):
+    """
+    Ejecuta `funcion` varias veces y retorna la mediana en segundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def _percentil(valores, percentil):
+    ordenados = sorted(valores)
+    return ordenados[min(round(percentil / 100 * (len(ordenados) - 1)), len(ordenados) - 1)]
+
+
+def medir_con_consultas(funcion, repeticiones=5):
+    """
+    Ejecuta `funcion` varias veces y retorna la mediana y el percentil 95 en
+    milisegundos, las consultas SQL de la última ejecución y su resultado.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            resultado = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return {
+        'ms': round(statistics.median(tiempos) * 1000, 2),
+        'p95_ms': round(_percentil(tiempos, 95) * 1000, 2),
+        'consultas': len(consultas),
+    }, resultado
+
+
+def _avances_en_memoria(cantidad):
+    organismo = OrganismoSectorial(id=1, nombre='SEA')
+    medida = Medida(
+        id=1, nombre='Recambio de calefactores', tipo='regulatoria', organismo_responsable=organismo,
+        fecha_inicio=timezone.localdate(), fecha_termino=timezone.localdate()
+    )
+    return [
+        MedidaAvance(
+            id=i, medida=medida, descripcion=f'Avance {i} del programa de recambio',
+            fecha_limite=timezone.localdate(), avance=i % 101, estado='PECR'[i % 4],
+            observaciones='Sin observaciones', fecha_actualizacion=timezone.now()
+        )
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def _indicadores_en_memoria(cantidad):
+    organismo = OrganismoSectorial(id=1, nombre='SEA')
+    ppda = PPDA(id=1, nombre='PPDA Coyhaique')
+    ahora = timezone.now()
+    return [
+        Indicador(
+            id=i, nombre='PM2.5', descripcion='Material particulado fino', valor=i / 10, unidad='µg/m³',
+            organismo_sectorial=organismo, ppda=ppda, fecha_registro=ahora.date(), fecha_medicion=ahora,
+            medio_verificacion='Estación de monitoreo'
+        )
+        for i in range(1, cantidad + 1)
+    ]
+
+
+PAYLOADS_RENDERIZADO = {
+    'MedidaAvanceSerializer': (MedidaAvanceSerializer, _avances_en_memoria),
+    'IndicadorSerializer': (IndicadorSerializer, _indicadores_en_memoria),
+}
+
+
+def benchmark_renderizado(filas=5000, repeticiones=5):
+    """
+    Compara CamelCaseJSONRenderer con CamelCaseORJSONRenderer sobre la
+    salida ya serializada de cada serializer (sin base de datos). Verifica
+    además que ambos produzcan el mismo JSON.
+    """
+    actual = CamelCaseJSONRenderer()
+    rapido = CamelCaseORJSONRenderer()
+    resultados = []
+    for nombre, (serializer_class, construir) in PAYLOADS_RENDERIZADO.items():
+        data = serializer_class(construir(filas), many=True).data
+        if json.loads(actual.render(data)) != json.loads(rapido.render(data)):
+            raise AssertionError(f"Los renderers producen JSON distinto para {nombre}")
+        segundos_actual = medir(lambda: actual.render(data), repeticiones)
+        segundos_rapido = medir(lambda: rapido.render(data), repeticiones)
+        resultados.append({
+            'payload': nombre,
+            'filas': filas,
+            'camelcase_json_ms': round(segundos_actual * 1000, 2),
+            'camelcase_orjson_ms': round(segundos_rapido * 1000, 2),
+            'aceleracion': round(segundos_actual / segundos_rapido, 2) if segundos_rapido else None,
+        })
+    return resultados
+
+
+def _crear_datos_listas(filas):
+    hoy = timezone.localdate()
+    organismo, _ = OrganismoSectorial.objects.get_or_create(nombre='SEA')
+    ppda = PPDA.objects.create(nombre='PPDA benchmark', fecha_inicio=hoy, fecha_termino=hoy, organismo=organismo)
+    medida = Medida.objects.create(
+        nombre='Recambio de calefactores', tipo='regulatoria', descripcion='Benchmark',
+        fecha_inicio=hoy, fecha_termino=hoy, organismo_responsable=organismo, ppda=ppda
+    )
+    MedidaAvance.objects.bulk_create(
+        MedidaAvance(
+            medida=medida, descripcion=f'Avance {i} del programa de recambio', fecha_limite=hoy,
+            avance=i % 101, estado='PECR'[i % 4], observaciones='Sin observaciones'
+        )
+        for i in range(filas)
+    )
+    Indicador.objects.bulk_create(
+        Indicador(
+            nombre='PM2.5', descripcion='Material particulado fino', valor=i / 10, unidad='µg/m³',
+            organismo_sectorial=organismo, ppda=ppda
+        )
+        for i in range(filas)
+    )
+    return medida, ppda
+
+
+def _como_json(filas):
+    return json.loads(json.dumps(filas, default=str))
+
+
+def benchmark_listas(filas=5000, repeticiones=5):
+    """
+    Filas por segundo del `list` con ModelSerializer frente al modo
+    .values() de ListaValoresMixin, con la misma consulta filtrada. Los datos
+    se crean dentro de una transacción que se revierte al terminar.
+    """
+    resultados = []
+    with transaction.atomic():
+        medida, ppda = _crear_datos_listas(filas)
+        casos = [
+            ('medidas-avance', MedidaAvanceViewSet, MedidaAvanceSerializer,
+             MedidaAvance.objects.filter(medida=medida).select_related('medida').order_by('id')),
+            ('indicadores', IndicadorViewSet, IndicadorSerializer,
+             Indicador.objects.filter(ppda=ppda).select_related('organismo_sectorial', 'ppda').order_by('id')),
+        ]
+        for nombre, vista, serializer_class, queryset in casos:
+            def con_serializer():
+                return serializer_class(queryset.all(), many=True).data
+
+            def con_valores():
+                campos = {**vista.campos_lista, **{c: c for c in vista.campos_lista_organismo.values()}}
+                return formatear_filas(
+                    list(valores_lista(queryset.all(), campos)),
+                    vista.campos_lista_fecha_hora, vista.campos_lista_archivo, None, vista.campos_lista_organismo
+                )
+
+            if _como_json(con_serializer()) != _como_json(con_valores()):
+                raise AssertionError(f"El modo .values() produce filas distintas para {nombre}")
+            segundos_serializer = medir(con_serializer, repeticiones)
+            segundos_valores = medir(con_valores, repeticiones)
+            resultados.append({
+                'lista': nombre,
+                'filas': filas,
+                'serializer_filas_s': round(filas / segundos_serializer) if segundos_serializer else None,
+                'values_filas_s': round(filas / segundos_valores) if segundos_valores else None,
+                'aceleracion': round(segundos_serializer / segundos_valores, 2) if segundos_valores else None,
+            })
+        transaction.set_rollback(True)
+    return resultados
+
+
+def _volumenes(filas):
+    """
+    Filas por tabla para `filas` indicadores, con la proporción de
+    producción (1M indicadores, 100k avances, 50k actividades).
+    """
+    return {'indicadores': filas, 'avances': max(filas // 10, 1), 'actividades': max(filas // 20, 1)}
+
+
+def _host():
+    return next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+
+
+def _usuario_benchmark():
+    """
+    Usuario del grupo admin creado para la medición y su JWT.
+    """
+    user = User.objects.create_user(username=f'benchmark-{uuid.uuid4().hex[:12]}')
+    user.groups.add(Group.objects.get_or_create(name='admin')[0])
+    return user, str(TokenConGruposSerializer.get_token(user).access_token)
+
+
+def _cliente_api():
+    """
+    Cliente autenticado con un JWT de un usuario del grupo admin, creado
+    para la medición.
+    """
+    _, token = _usuario_benchmark()
+    cliente = APIClient(SERVER_NAME=_host())
+    cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return cliente
+
+
+def endpoints_a_medir():
+    """
+    Retorna (nombre, url, parámetros) de cada GET de la API: listado,
+    detalle y acciones de cada ViewSet del router más las vistas de
+    series, dashboard, búsqueda, exportación y estado de integraciones.
+    """
+    casos = []
+    for _, viewset, basename in router.registry:
+        casos.append((f'{basename}-list', reverse(f'{basename}-list'), {}))
+        pk = viewset.serializer_class.Meta.model.objects.order_by('pk').values_list('pk', flat=True).first()
+        if pk is not None:
+            casos.append((f'{basename}-detail', reverse(f'{basename}-detail', args=[pk]), {}))
+        for accion in viewset.get_extra_actions():
+            if 'get' not in accion.mapping or (accion.detail and pk is None):
+                continue
+            nombre = f'{basename}-{accion.url_name}'
+            casos.append((nombre, reverse(nombre, args=[pk] if accion.detail else []), {}))
+    return casos + [
+        ('indicadores-series', reverse('indicadores-series'), {'resolucion': 'dia'}),
+        ('dashboard-cumplimiento', reverse('dashboard-cumplimiento'), {}),
+        ('buscar', reverse('buscar'), {'q': 'calefactores'}),
+        ('exportar-indicadores', reverse('exportar', args=['indicadores']), {}),
+        ('estado-integraciones', reverse('estado_integraciones'), {}),
+    ]
+
+
+def _obtener(cliente, url, parametros):
+    response = cliente.get(url, parametros)
+    # Las exportaciones se consumen completas para medir la descarga y no solo la primera fila
+    cuerpo = b''.join(response.streaming_content) if response.streaming else response.content
+    return response.status_code, len(cuerpo)
+
+
+def benchmark_endpoints(filas=5000, repeticiones=5, generar=True):
+    """
+    Latencia (mediana y p95) y consultas SQL de cada GET de la API, sin la
+    cache de respuestas y con ella. Con `generar` se crean datos sintéticos
+    (`filas` indicadores y avances y actividades en la proporción de
+    producción) dentro de una transacción que se revierte al terminar; sin
+    él se mide la base de datos tal como está.
+    """
+    resultados = []
+    with transaction.atomic():
+        if generar:
+            generar_datos(**_volumenes(filas))
+            analizar_tablas()
+        cliente = _cliente_api()
+        for nombre, url, parametros in endpoints_a_medir():
+            with override_settings(RESPUESTAS_CACHE=False):
+                sin_cache, (estado, tamano) = medir_con_consultas(
+                    lambda: _obtener(cliente, url, parametros), repeticiones
+                )
+            # El benchmark corre en un solo proceso: la cache local sirve para medir
+            with override_settings(RESPUESTAS_CACHE=True):
+                _obtener(cliente, url, parametros)
+                con_cache, _ = medir_con_consultas(lambda: _obtener(cliente, url, parametros), repeticiones)
+            resultados.append({
+                'endpoint': nombre,
+                'estado': estado,
+                'bytes': tamano,
+                **sin_cache,
+                'cache_ms': con_cache['ms'],
+                'cache_consultas': con_cache['consultas'],
+            })
+        transaction.set_rollback(True)
+    return resultados
+
+
+def _lecturas_snifa(cantidad, inicio):
+    return [
+        {'parametro': 'PM2.5', 'valor': i % 150, 'estacion': f'Estación {i % 20}',
+         'fecha': (inicio + datetime.timedelta(hours=i // 20)).isoformat()}
+        for i in range(cantidad)
+    ]
+
+
+def _lecturas_airecoo(cantidad, inicio):
+    return [
+        {'nombre': 'PM10', 'valor': i % 200, 'unidad': 'µg/m³', 'estacion': f'Estación {i % 20}',
+         'fecha': (inicio + datetime.timedelta(hours=i // 20)).isoformat()}
+        for i in range(cantidad)
+    ]
+
+
+INICIO_LECTURAS = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+RUTAS_INGESTA = {
+    'snifa': (guardar_datos_snifa, _lecturas_snifa),
+    'airecoo': (guardar_datos_airecoo, _lecturas_airecoo),
+}
+
+
+def benchmark_ingesta(filas=5000, repeticiones=5):
+    """
+    Latencia, filas por segundo y consultas SQL de guardar `filas` lecturas
+    por cada ruta de integración, con lecturas nuevas y volviendo a cargar
+    las mismas (el caso sin cambios de las sincronizaciones repetidas).
+    Todo se revierte al terminar.
+    """
+    resultados = []
+    with transaction.atomic():
+        organismo, _ = OrganismoSectorial.objects.get_or_create(nombre='SEA')
+        with override_settings(INTEGRACION_ORGANISMO_ID=organismo.id):
+            for ruta, (guardar, construir) in RUTAS_INGESTA.items():
+                # Cada repetición usa otro rango de horas para que todas las lecturas sean nuevas
+                cargas = iter([
+                    construir(filas, INICIO_LECTURAS + datetime.timedelta(hours=-(-filas // 20) * i))
+                    for i in range(repeticiones)
+                ])
+                datos = None
+
+                def cargar_nuevas():
+                    nonlocal datos
+                    datos = next(cargas)
+                    return guardar(datos)
+
+                nuevas, resultado = medir_con_consultas(cargar_nuevas, repeticiones)
+                repetidas, repetido = medir_con_consultas(lambda: guardar(datos), repeticiones)
+                for carga, medicion, contadores in (('nuevas', nuevas, resultado), ('repetidas', repetidas, repetido)):
+                    resultados.append({
+                        'ruta': ruta,
+                        'carga': carga,
+                        'filas': filas,
+                        'insertadas': contadores['insertados'],
+                        **medicion,
+                        'filas_s': round(filas / medicion['ms'] * 1000) if medicion['ms'] else None,
+                    })
+        transaction.set_rollback(True)
+    return resultados
+
+
+# (endpoint, ruta WSGI, variante async, parámetros)
+ENDPOINTS_ASGI = [
+    ('indicadores-series', 'indicadores-series', 'async-indicadores-series', {'resolucion': 'dia'}),
+    ('dashboard-cumplimiento', 'dashboard-cumplimiento', 'async-dashboard-cumplimiento', {}),
+    ('resumen-anual', 'reporte-anual-resumen-anual', 'async-resumen-anual', {}),
+    ('estado-integraciones', 'estado_integraciones', 'async-estado-integraciones', {}),
+]
+
+
+def _pedir_wsgi(aplicacion, ruta, parametros, cabeceras):
+    """
+    GET contra la aplicación WSGI con el environ que arma un servidor WSGI.
+    Retorna (estado, bytes).
+    """
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': ruta,
+        'QUERY_STRING': urlencode(parametros),
+        'SERVER_NAME': _host(),
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        **{f"HTTP_{clave.upper().replace('-', '_')}": valor for clave, valor in cabeceras.items()},
+    }
+    estados = []
+    response = aplicacion(environ, lambda estado, cabeceras, exc_info=None: estados.append(estado))
+    try:
+        cuerpo = b''.join(response)
+    finally:
+        response.close()
+    return int(estados[0].split()[0]), len(cuerpo)
+
+
+async def _pedir_asgi(aplicacion, ruta, parametros, cabeceras):
+    """
+    GET contra la aplicación ASGI con los mensajes que envía un servidor
+    ASGI. Retorna (estado, bytes).
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': ruta,
+        'raw_path': ruta.encode(),
+        'root_path': '',
+        'query_string': urlencode(parametros).encode(),
+        'headers': [(clave.lower().encode(), valor.encode()) for clave, valor in cabeceras.items()],
+        'client': ('127.0.0.1', 0),
+        'server': (_host(), 80),
+    }
+    cuerpo_enviado = False
+
+    async def receive():
+        nonlocal cuerpo_enviado
+        if cuerpo_enviado:
+            # El cliente no se desconecta: se espera hasta que Django cancele la lectura
+            await asyncio.Future()
+        cuerpo_enviado = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    mensajes = []
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    await aplicacion(scope, receive, send)
+    return mensajes[0]['status'], sum(len(mensaje.get('body', b'')) for mensaje in mensajes[1:])
+
+
+def _ronda_wsgi(aplicacion, ruta, parametros, cabeceras, clientes):
+    # Un worker WSGI sincrónico atiende las requests de una en una
+    inicio = time.perf_counter()
+    estados, latencias = set(), []
+    for _ in range(clientes):
+        estado, _ = _pedir_wsgi(aplicacion, ruta, parametros, cabeceras)
+        estados.add(estado)
+        latencias.append(time.perf_counter() - inicio)
+    return time.perf_counter() - inicio, latencias, estados
+
+
+async def _ronda_asgi(aplicacion, ruta, parametros, cabeceras, clientes):
+    inicio = time.perf_counter()
+
+    async def cliente():
+        estado, _ = await _pedir_asgi(aplicacion, ruta, parametros, cabeceras)
+        return estado, time.perf_counter() - inicio
+
+    respuestas = await asyncio.gather(*(cliente() for _ in range(clientes)))
+    return time.perf_counter() - inicio, [latencia for _, latencia in respuestas], {e for e, _ in respuestas}
+
+
+def _resumen_rondas(endpoint, servidor, clientes, rondas):
+    totales = [total for total, _, _ in rondas]
+    latencias = [latencia for _, ronda, _ in rondas for latencia in ronda]
+    estados = set().union(*(estados for _, _, estados in rondas))
+    total = statistics.median(totales)
+    return {
+        'endpoint': endpoint,
+        'servidor': servidor,
+        'estado': estados.pop() if len(estados) == 1 else sorted(estados),
+        'clientes': clientes,
+        'ms': round(statistics.median(latencias) * 1000, 2),
+        'p95_ms': round(_percentil(latencias, 95) * 1000, 2),
+        'total_ms': round(total * 1000, 2),
+        'peticiones_s': round(clientes / total, 1) if total else None,
+    }
+
+
+def benchmark_asgi(repeticiones=5, clientes=20):
+    """
+    `clientes` requests simultáneas a cada endpoint de lectura con variante
+    async, servidas por un worker WSGI sincrónico (la vista de DRF) y por
+    un worker ASGI (la vista async en un solo event loop). La latencia de
+    cada cliente incluye la espera en cola. Con ASGI las consultas de cada
+    request corren en su propio hilo y conexión, así que se mide la base
+    de datos existente (cargarla antes con seed_datos) y el usuario de la
+    medición se crea confirmado y se elimina al terminar.
+    """
+    aplicaciones = {'wsgi': WSGIHandler(), 'asgi': ASGIHandler()}
+    user, token = _usuario_benchmark()
+    cabeceras = {'host': _host(), 'authorization': f'Bearer {token}'}
+    resultados = []
+    try:
+        for endpoint, ruta_wsgi, ruta_asgi, parametros in ENDPOINTS_ASGI:
+            ruta_wsgi, ruta_asgi = reverse(ruta_wsgi), reverse(ruta_asgi)
+            _pedir_wsgi(aplicaciones['wsgi'], ruta_wsgi, parametros, cabeceras)
+            rondas = [
+                _ronda_wsgi(aplicaciones['wsgi'], ruta_wsgi, parametros, cabeceras, clientes)
+                for _ in range(repeticiones)
+            ]
+            resultados.append(_resumen_rondas(endpoint, 'wsgi', clientes, rondas))
+
+            asyncio.run(_pedir_asgi(aplicaciones['asgi'], ruta_asgi, parametros, cabeceras))
+            rondas = [
+                asyncio.run(_ronda_asgi(aplicaciones['asgi'], ruta_asgi, parametros, cabeceras, clientes))
+                for _ in range(repeticiones)
+            ]
+            resultados.append(_resumen_rondas(endpoint, 'asgi', clientes, rondas))
+    finally:
+        user.delete()
+    return resultados
+
+
+ESCENARIOS = {
+    'renderizado': benchmark_renderizado,
+    'listas': benchmark_listas,
+    'endpoints': benchmark_endpoints,
+    'ingesta': benchmark_ingesta,
+    'asgi': benchmark_asgi,
+}
+
+# Escenarios que pueden medir la base de datos existente en vez de generar datos
+ESCENARIOS_CON_DATOS = ('endpoints',)
+
+# Escenarios con clientes simultáneos, que no reciben `filas`
+ESCENARIOS_CONCURRENTES = ('asgi',)
+
+
+def _commit():
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def metadatos():
+    """
+    Contexto de la ejecución que se guarda junto a los resultados.
+    """
+    return {
+        'fecha': timezone.now().isoformat(),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base_datos': f'{connection.vendor} {connection.pg_version}' if connection.vendor == 'postgresql'
+        else connection.vendor,
+    }
+
+
+def _identificador(fila):
+    return ' '.join(str(valor) for valor in fila.values() if isinstance(valor, str))
+
+
+def comparar_resultados(base, actual, tolerancia=0.2):
+    """
+    Compara dos resultados de ESCENARIOS (por ejemplo de dos commits) y
+    retorna las regresiones: medianas de tiempo (`*ms`, sin el p95, que con
+    pocas repeticiones es ruido) que crecen más que la tolerancia relativa y
+    cualquier aumento de consultas SQL. Las filas se emparejan por sus
+    campos de texto (endpoint, ruta, payload...).
+    """
+    regresiones = []
+    for escenario, filas in actual.items():
+        anteriores = {_identificador(fila): fila for fila in base.get(escenario, [])}
+        for fila in filas:
+            anterior = anteriores.get(_identificador(fila))
+            if anterior is None:
+                continue
+            for metrica, valor in fila.items():
+                previo = anterior.get(metrica)
+                if not isinstance(valor, (int, float)) or not isinstance(previo, (int, float)):
+                    continue
+                if metrica.endswith('ms') and not metrica.startswith('p95'):
+                    regresion = valor > previo * (1 + tolerancia)
+                elif metrica.endswith('consultas'):
+                    regresion = valor > previo
+                else:
+                    continue
+                if regresion:
+                    regresiones.append({
+                        'escenario': escenario,
+                        'fila': _identificador(fila),
+                        'metrica': metrica,
+                        'base': previo,
+                        'actual': valor,
+                    })
+    return regresiones
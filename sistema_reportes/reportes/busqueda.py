@@ -0,0 +1,78 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import CharField, F, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Left
+
+from .models import PPDA, Medida, MedidaAvance, Actividad
+
+CONFIGURACION = 'spanish'
+LARGO_RESUMEN = 200
+LIMITE_MAXIMO = 50
+
+# Modelo → (campo, peso) que componen la columna `busqueda`. Los triggers de la
+# migración 0012 calculan el mismo vector en cada INSERT/UPDATE, de modo que
+# también quedan cubiertos bulk_create, bulk_update y update(); si esto cambia
+# hay que agregar una migración que reemplace los triggers.
+CAMPOS_BUSQUEDA = {
+    PPDA: [('nombre', 'A'), ('descripcion', 'B')],
+    Medida: [('nombre', 'A'), ('descripcion', 'B')],
+    MedidaAvance: [('descripcion', 'A'), ('observaciones', 'B')],
+    Actividad: [('nombre', 'A'), ('descripcion', 'B')],
+}
+
+# Nombre expuesto en /api/buscar/ → (modelo, campo de título, campo de resumen, campo de organismo)
+MODELOS_BUSQUEDA = {
+    'ppda': (PPDA, 'nombre', 'descripcion', 'organismo_id'),
+    'medida': (Medida, 'nombre', 'descripcion', 'organismo_responsable_id'),
+    'avance': (MedidaAvance, 'medida__nombre', 'descripcion', 'medida__organismo_responsable_id'),
+    'actividad': (Actividad, 'nombre', 'descripcion', 'organismo_responsable_id'),
+}
+
+
+def vector_busqueda(modelo):
+    """
+    Expresión equivalente al vector que mantiene el trigger del modelo.
+    """
+    vectores = [
+        SearchVector(campo, weight=peso, config=CONFIGURACION) for campo, peso in CAMPOS_BUSQUEDA[modelo]
+    ]
+    vector = vectores[0]
+    for siguiente in vectores[1:]:
+        vector = vector + siguiente
+    return vector
+
+
+def consulta_busqueda(texto):
+    """
+    Consulta en sintaxis web: comillas para frases, `-` para excluir y `or`.
+    """
+    return SearchQuery(texto, config=CONFIGURACION, search_type='websearch')
+
+
+def buscar(texto, modelos=None, limite=20, organismo_id=None):
+    """
+    Busca el texto en los modelos indicados y retorna los resultados ordenados
+    por relevancia. Cada modelo filtra por su índice GIN y todos se combinan
+    con UNION ALL en una sola consulta. Con `organismo_id` solo se buscan
+    los registros de ese organismo.
+    """
+    consulta = consulta_busqueda(texto)
+    partes = []
+    for nombre in modelos or MODELOS_BUSQUEDA:
+        modelo, titulo, resumen, campo_organismo = MODELOS_BUSQUEDA[nombre]
+        queryset = modelo.objects.filter(busqueda=consulta)
+        if organismo_id is not None:
+            queryset = queryset.filter(**{campo_organismo: organismo_id})
+        partes.append(
+            queryset
+            .annotate(
+                modelo=Value(nombre, output_field=CharField()),
+                titulo=Cast(titulo, output_field=TextField()),
+                resumen=Left(Coalesce(resumen, Value('')), LARGO_RESUMEN),
+                rango=SearchRank(F('busqueda'), consulta),
+            )
+            .values('id', 'modelo', 'titulo', 'resumen', 'rango')
+            .order_by('-rango', 'id')[:limite]
+        )
+    if len(partes) == 1:
+        return list(partes[0])
+    return list(partes[0].union(*partes[1:], all=True).order_by('-rango', 'modelo', 'id')[:limite])
@@ -0,0 +1,160 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from rest_framework.response import Response
+
+from .alcance import alcance_de_request
+from .grupos import grupos_de_request
+
+CLAVE_VERSION = 'version_respuestas:{}'
+CLAVE_RESPUESTA = 'respuesta:{}'
+
+
+@checks.register(checks.Tags.caches)
+def verificar_cache_compartida(app_configs, **kwargs):
+    """
+    La cache de respuestas se invalida cambiando versiones en la cache, y
+    las escrituras ocurren también en los workers de Celery (ingesta). Con
+    una cache por proceso esos cambios no llegarían a los procesos web.
+    """
+    if getattr(settings, 'RESPUESTAS_CACHE', False) and isinstance(caches['default'], LocMemCache):
+        return [checks.Error(
+            "RESPUESTAS_CACHE requiere una cache compartida entre procesos.",
+            hint="Configure CACHE_URL con redis:// o db://, o desactive RESPUESTAS_CACHE.",
+            id='reportes.E001',
+        )]
+    return []
+
+
+def _clave_version(modelo):
+    return CLAVE_VERSION.format(modelo._meta.label_lower)
+
+
+def versiones_modelos(modelos):
+    """
+    Retorna la versión vigente de cada modelo. Una versión ausente (cache
+    vacía o expulsada) se inicializa con la hora actual en milisegundos, de
+    modo que nunca se repite una versión ya usada.
+    """
+    claves = [_clave_version(modelo) for modelo in modelos]
+    versiones = cache.get_many(claves)
+    for clave in claves:
+        if clave not in versiones:
+            cache.add(clave, time.time_ns() // 1_000_000, None)
+            versiones[clave] = cache.get(clave)
+    return tuple(versiones[clave] for clave in claves)
+
+
+def _incrementar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, time.time_ns() // 1_000_000, None)
+
+
+def invalidar_cache_modelos(*modelos):
+    """
+    Invalida lo cacheado (respuestas de la API y datos de referencia) que
+    depende de los modelos. La versión se incrementa al escribir y otra vez al confirmar la transacción, para
+    descartar lo que otra request haya cacheado con datos aún sin confirmar.
+    """
+    claves = {_clave_version(modelo) for modelo in modelos}
+    for clave in claves:
+        _incrementar(clave)
+    transaction.on_commit(lambda: [_incrementar(clave) for clave in claves])
+
+
+def validadores(queryset, campo_modificacion=None, con_total=True):
+    """
+    Calcula con una sola consulta el total de filas y la última
+    modificación del queryset filtrado, que forman parte del ETag. Con
+    `con_total` falso se usa el mayor pk en vez de COUNT, para listas con
+    paginación keyset sobre tablas grandes. Retorna (marca, ultima_modificacion).
+    """
+    agregados = {'marca': Count('pk') if con_total else Max('pk')}
+    if campo_modificacion:
+        agregados['ultima_modificacion'] = Max(campo_modificacion)
+    resultado = queryset.order_by().select_related(None).prefetch_related(None).aggregate(**agregados)
+    return resultado['marca'], resultado.get('ultima_modificacion')
+
+
+def calcular_etag(*partes):
+    return hashlib.md5(repr(partes).encode(), usedforsecurity=False).hexdigest()
+
+
+class CacheHTTPMixin:
+    """
+    ETag y cache de respuestas para `list` y `retrieve`.
+
+    El ETag combina el total y la última modificación del queryset filtrado
+    (una consulta agregada, ver `validadores`), las versiones de
+    `modelos_cache`, la URL y el alcance del usuario. Si el cliente envía un validador vigente se responde
+    304; si no, se busca la respuesta en la cache bajo ese mismo ETag. Las
+    escrituras sobre `modelos_cache` cambian la versión desde signals.py, así
+    que las entradas antiguas simplemente dejan de usarse. No se envía
+    Last-Modified: la última modificación no cambia al eliminar filas ni al
+    escribir en modelos relacionados, así que un If-Modified-Since daría
+    304 con datos obsoletos.
+    """
+    campo_modificacion = None
+    modelos_cache = ()
+    validar_con_total = True
+
+    def alcance_cache(self):
+        """
+        Parte de la clave que depende del usuario: superusuario, grupos y
+        organismo del alcance. Las vistas cuyo queryset se filtra por otro
+        dato del usuario deben extenderla.
+        """
+        return (
+            self.request.user.is_superuser,
+            tuple(sorted(grupos_de_request(self.request))),
+            alcance_de_request(self.request),
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self._responder_con_cache(self.filter_queryset(self.get_queryset()), super().list, args, kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup]})
+        except (TypeError, ValueError, ValidationError):
+            # Identificador inválido: get_object() responde 404
+            return super().retrieve(request, *args, **kwargs)
+        return self._responder_con_cache(queryset, super().retrieve, args, kwargs)
+
+    def _responder_con_cache(self, queryset, vista, args, kwargs):
+        request = self.request
+        if not getattr(settings, 'RESPUESTAS_CACHE', True):
+            return vista(request, *args, **kwargs)
+
+        marca, ultima_modificacion = validadores(queryset, self.campo_modificacion, self.validar_con_total)
+        etag = quote_etag(calcular_etag(
+            type(self).__name__, self.action, request.build_absolute_uri(), self.alcance_cache(),
+            versiones_modelos(self.modelos_cache or (queryset.model,)), marca, ultima_modificacion,
+        ))
+        respuesta = get_conditional_response(request, etag=etag)
+        if respuesta is None:
+            clave = CLAVE_RESPUESTA.format(etag.strip('"'))
+            data = cache.get(clave)
+            if data is not None:
+                respuesta = Response(data)
+            else:
+                respuesta = vista(request, *args, **kwargs)
+                if respuesta.status_code != 200:
+                    return respuesta
+                cache.set(clave, respuesta.data, getattr(settings, 'RESPUESTAS_CACHE_TIMEOUT', 300))
+
+        respuesta['ETag'] = etag
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        patch_vary_headers(respuesta, ('Authorization',))
+        return respuesta
@@ -0,0 +1,165 @@
+import datetime
+import hashlib
+import json
+import tempfile
+
+from django.core.files import File
+from django.db.models import ExpressionWrapper, F, FloatField, Max, Min, Sum
+from django.utils import timezone
+
+from .exportacion import escribir_xlsx
+from .models import Actividad, IndicadorAgregado, MedidaAvance, ReporteAnual, ReporteConsolidado
+
+# Subir la versión cuando cambie el formato del archivo, para no reutilizar
+# reportes generados con la plantilla anterior
+VERSION_PLANTILLA = 1
+
+NOMBRES_ESTADO = dict(MedidaAvance.ESTADOS)
+
+# Archivos más grandes que esto se escriben a disco mientras se generan
+MAXIMO_EN_MEMORIA = 5 * 1024 * 1024
+
+
+def datos_consolidado(organismo_id, anio, ppda_id=None):
+    """
+    Reúne los datos del reporte con una consulta por tabla. Los indicadores
+    se leen desde los agregados mensuales.
+    """
+    actividades = Actividad.objects.filter(
+        organismo_responsable_id=organismo_id, fecha_inicio__year__lte=anio, fecha_termino__year__gte=anio
+    )
+    avances = MedidaAvance.objects.filter(medida__organismo_responsable_id=organismo_id, fecha_limite__year=anio)
+    reportes = ReporteAnual.objects.filter(organismo_responsable_id=organismo_id, periodo__year=anio)
+    indicadores = IndicadorAgregado.objects.filter(
+        resolucion='mes', organismo_sectorial_id=organismo_id, periodo__year=anio
+    )
+    if ppda_id:
+        actividades = actividades.filter(medida__ppda_id=ppda_id)
+        avances = avances.filter(medida__ppda_id=ppda_id)
+        reportes = reportes.filter(medida__medida__ppda_id=ppda_id)
+        indicadores = indicadores.filter(ppda_id=ppda_id)
+
+    return {
+        'actividades': list(
+            actividades.order_by('fecha_inicio', 'id')
+            .values_list('id', 'nombre', 'medida__nombre', 'fecha_inicio', 'fecha_termino')
+        ),
+        'avances': list(
+            avances.order_by('medida__nombre', 'fecha_limite', 'id')
+            .values_list('id', 'medida__nombre', 'descripcion', 'fecha_limite', 'avance', 'estado')
+        ),
+        'reportes': list(
+            reportes.order_by('periodo', 'id')
+            .values_list('id', 'periodo', 'medida__medida__nombre', 'cumplimiento', 'observaciones')
+        ),
+        'indicadores': list(
+            indicadores.values('nombre', 'unidad')
+            .annotate(
+                promedio=ExpressionWrapper(
+                    Sum(F('promedio') * F('cantidad')) / Sum('cantidad'), output_field=FloatField()
+                ),
+                minimo=Min('minimo'),
+                maximo=Max('maximo'),
+                mediciones=Sum('cantidad'),
+            )
+            .order_by('nombre', 'unidad')
+            .values_list('nombre', 'unidad', 'promedio', 'minimo', 'maximo', 'mediciones')
+        ),
+    }
+
+
+def calcular_hash_entradas(organismo_id, anio, ppda_id, datos):
+    contenido = json.dumps(
+        {'version': VERSION_PLANTILLA, 'organismo': organismo_id, 'ppda': ppda_id, 'anio': anio, **datos},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def _promedio(valores):
+    valores = [v for v in valores if v is not None]
+    return round(sum(valores) / len(valores), 2) if valores else None
+
+
+def indicadores_resumen(datos):
+    """
+    Cifras principales del reporte como pares (etiqueta, valor).
+    """
+    estados = [avance[5] for avance in datos['avances']]
+    return [
+        ('Actividades', len(datos['actividades'])),
+        ('Avances', len(estados)),
+        *[(f"Avances {nombre.lower()}", estados.count(codigo)) for codigo, nombre in MedidaAvance.ESTADOS],
+        ('Avance promedio (%)', _promedio([avance[4] for avance in datos['avances']])),
+        ('Reportes anuales', len(datos['reportes'])),
+        ('Cumplimiento promedio (%)', _promedio([reporte[3] for reporte in datos['reportes']])),
+        ('Indicadores monitoreados', len(datos['indicadores'])),
+    ]
+
+
+def texto_resumen(resumen):
+    return '\n'.join(f"{etiqueta}: {'-' if valor is None else valor}" for etiqueta, valor in resumen)
+
+
+def hojas_reporte(datos, resumen):
+    return [
+        ('Resumen', ['Indicador', 'Valor'], resumen),
+        ('Actividades', ['ID', 'Actividad', 'Medida', 'Inicio', 'Término'], datos['actividades']),
+        (
+            'Avances',
+            ['ID', 'Medida', 'Descripción', 'Fecha límite', 'Avance (%)', 'Estado'],
+            [(*avance[:5], NOMBRES_ESTADO.get(avance[5], avance[5])) for avance in datos['avances']],
+        ),
+        (
+            'Reportes anuales',
+            ['ID', 'Periodo', 'Medida', 'Cumplimiento (%)', 'Observaciones'],
+            datos['reportes'],
+        ),
+        (
+            'Indicadores',
+            ['Indicador', 'Unidad', 'Promedio', 'Mínimo', 'Máximo', 'Mediciones'],
+            datos['indicadores'],
+        ),
+    ]
+
+
+def generar_reporte_consolidado(organismo_id, anio, ppda_id=None, forzar=False):
+    """
+    Genera (o reutiliza) el reporte consolidado de un organismo, PPDA y año.
+
+    Si el hash de los datos coincide con el del último reporte del mismo
+    periodo y su archivo existe, se retorna ese reporte sin regenerarlo.
+    Retorna (reporte, regenerado).
+    """
+    datos = datos_consolidado(organismo_id, anio, ppda_id)
+    huella = calcular_hash_entradas(organismo_id, anio, ppda_id, datos)
+    periodo = datetime.date(anio, 12, 31)
+
+    reporte = ReporteConsolidado.objects.filter(
+        organismo_responsable_id=organismo_id, ppda_id=ppda_id, periodo=periodo
+    ).order_by('-fecha_creacion', '-id').first()
+    if (
+        reporte is not None and not forzar and reporte.hash_entradas == huella
+        and reporte.archivo_reporte and reporte.archivo_reporte.storage.exists(reporte.archivo_reporte.name)
+    ):
+        return reporte, False
+
+    if reporte is None:
+        reporte = ReporteConsolidado(organismo_responsable_id=organismo_id, ppda_id=ppda_id, periodo=periodo)
+    anterior = reporte.archivo_reporte.name if reporte.archivo_reporte else None
+
+    resumen = indicadores_resumen(datos)
+    reporte.resumen_actividades = texto_resumen(resumen)
+    reporte.hash_entradas = huella
+    reporte.fecha_generacion = timezone.now()
+    nombre = f"consolidado_{organismo_id}_{ppda_id or 'todos'}_{anio}_{huella[:12]}.xlsx"
+    with tempfile.SpooledTemporaryFile(max_size=MAXIMO_EN_MEMORIA) as archivo:
+        for trozo in escribir_xlsx(hojas_reporte(datos, resumen)):
+            archivo.write(trozo)
+        archivo.seek(0)
+        reporte.archivo_reporte.save(nombre, File(archivo), save=False)
+    reporte.save()
+
+    if anterior and anterior != reporte.archivo_reporte.name:
+        reporte.archivo_reporte.storage.delete(anterior)
+    return reporte, True
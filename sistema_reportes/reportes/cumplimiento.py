@@ -0,0 +1,259 @@
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from .models import CumplimientoSnapshot, Medida, MedidaAvance, ReporteAnual
+from .referencias import NOMBRES_ORGANISMO
+
+# Primer entero de los advisory locks de PostgreSQL por clave de snapshot
+# (sincronizacion.py usa 7331)
+ESPACIO_BLOQUEO = 7332
+
+
+def _redondear(valor):
+    return round(valor, 2) if valor else 0
+
+
+def filtrar_reportes(queryset, organismo_id=None, anio_desde=None, anio_hasta=None):
+    """
+    Aplica los filtros opcionales del resumen de cumplimiento.
+    """
+    if organismo_id:
+        queryset = queryset.filter(organismo_responsable_id=organismo_id)
+    if anio_desde:
+        queryset = queryset.filter(periodo__year__gte=anio_desde)
+    if anio_hasta:
+        queryset = queryset.filter(periodo__year__lte=anio_hasta)
+    return queryset
+
+
+def _filas_resumen(queryset):
+    if queryset is None:
+        queryset = ReporteAnual.objects.all()
+    return (
+        queryset
+        .order_by()
+        .values('periodo', 'organismo_responsable_id', 'organismo_responsable__nombre')
+        .annotate(
+            suma=Sum('cumplimiento'),
+            total=Count('id'),
+            minimo=Min('cumplimiento'),
+            maximo=Max('cumplimiento'),
+        )
+        .order_by('periodo', 'organismo_responsable__nombre')
+    )
+
+
+def _agrupar_resumen(filas):
+    periodos = {}
+    for fila in filas:
+        periodo = periodos.setdefault(fila['periodo'], {
+            'periodo': fila['periodo'],
+            'suma': 0,
+            'total_reportes': 0,
+            'minimo_cumplimiento': None,
+            'maximo_cumplimiento': None,
+            'organismos': [],
+        })
+        periodo['suma'] += fila['suma'] or 0
+        periodo['total_reportes'] += fila['total']
+        if periodo['minimo_cumplimiento'] is None or fila['minimo'] < periodo['minimo_cumplimiento']:
+            periodo['minimo_cumplimiento'] = fila['minimo']
+        if periodo['maximo_cumplimiento'] is None or fila['maximo'] > periodo['maximo_cumplimiento']:
+            periodo['maximo_cumplimiento'] = fila['maximo']
+
+        codigo = fila['organismo_responsable__nombre']
+        periodo['organismos'].append({
+            'organismo_id': fila['organismo_responsable_id'],
+            'organismo': codigo,
+            'organismo_nombre': NOMBRES_ORGANISMO.get(codigo, codigo),
+            'promedio_cumplimiento': _redondear(fila['suma'] / fila['total'] if fila['total'] else None),
+            'minimo_cumplimiento': fila['minimo'],
+            'maximo_cumplimiento': fila['maximo'],
+            'total_reportes': fila['total'],
+        })
+
+    data = []
+    for periodo in periodos.values():
+        total = periodo['total_reportes']
+        data.append({
+            'periodo': periodo['periodo'],
+            'promedio_cumplimiento': _redondear(periodo['suma'] / total if total else None),
+            'minimo_cumplimiento': periodo['minimo_cumplimiento'],
+            'maximo_cumplimiento': periodo['maximo_cumplimiento'],
+            'total_reportes': total,
+            'organismos': periodo['organismos'],
+        })
+    return data
+
+
+def resumen_cumplimiento(queryset=None):
+    """
+    Resume el cumplimiento por periodo con una sola consulta agrupada.
+
+    La consulta agrupa por (periodo, organismo) y el total de cada periodo se
+    obtiene sumando esos grupos, por lo que el costo no depende de la cantidad
+    de periodos.
+    """
+    return _agrupar_resumen(_filas_resumen(queryset))
+
+
+async def aresumen_cumplimiento(queryset=None):
+    """
+    Versión async de resumen_cumplimiento, con la misma consulta.
+    """
+    return _agrupar_resumen([fila async for fila in _filas_resumen(queryset)])
+
+
+# Campo del snapshot que cuenta cada estado de MedidaAvance
+CAMPOS_ESTADO = {
+    'P': 'pendientes',
+    'E': 'en_progreso',
+    'C': 'completados',
+    'R': 'retrasados',
+}
+
+
+def _agregados_avances(hoy):
+    agregados = {
+        'avance_promedio': Avg('avance'),
+        'total_avances': Count('id'),
+        'vencidos': Count('id', filter=Q(fecha_limite__lt=hoy) & ~Q(estado='C')),
+    }
+    for estado, campo in CAMPOS_ESTADO.items():
+        agregados[campo] = Count('id', filter=Q(estado=estado))
+    return agregados
+
+
+def _agregados_reportes():
+    return {
+        'cumplimiento_promedio': Avg('cumplimiento'),
+        'total_reportes': Count('id'),
+    }
+
+
+def recalcular_snapshot(ppda_id, organismo_id, anio):
+    """
+    Recalcula el snapshot de una clave (ppda, organismo, año) con dos
+    agregaciones acotadas a esa clave. Si ya no quedan avances ni
+    reportes el snapshot se elimina.
+
+    Los recálculos de una misma clave se serializan con un advisory lock
+    de la transacción: sin él, dos requests concurrentes podían chocar al
+    crear el snapshot, o la que agregó primero escribir al final un valor
+    desactualizado.
+    """
+    clave = {'ppda_id': ppda_id, 'organismo_id': organismo_id, 'anio': anio}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, hashtext(%s))',
+                [ESPACIO_BLOQUEO, f'{ppda_id}:{organismo_id}:{anio}']
+            )
+        avances = MedidaAvance.objects.filter(
+            medida__ppda_id=ppda_id,
+            medida__organismo_responsable_id=organismo_id,
+            fecha_limite__year=anio,
+        ).aggregate(**_agregados_avances(timezone.localdate()))
+        reportes = ReporteAnual.objects.filter(
+            medida__medida__ppda_id=ppda_id,
+            organismo_responsable_id=organismo_id,
+            periodo__year=anio,
+        ).aggregate(**_agregados_reportes())
+
+        if not avances['total_avances'] and not reportes['total_reportes']:
+            CumplimientoSnapshot.objects.filter(**clave).delete()
+            return None
+        snapshot, _ = CumplimientoSnapshot.objects.update_or_create(**clave, defaults={**avances, **reportes})
+    return snapshot
+
+
+def recalcular_snapshots():
+    """
+    Reconstruye todos los snapshots con una consulta agrupada por tabla.
+    Se ejecuta periódicamente porque los vencidos cambian con la fecha
+    aunque no se modifique ningún avance.
+    """
+    snapshots = {}
+    avances = (
+        MedidaAvance.objects
+        .order_by()
+        .values(
+            ppda_id=F('medida__ppda_id'),
+            organismo_id=F('medida__organismo_responsable_id'),
+            anio=ExtractYear('fecha_limite'),
+        )
+        .annotate(**_agregados_avances(timezone.localdate()))
+    )
+    for fila in avances:
+        clave = (fila['ppda_id'], fila['organismo_id'], fila['anio'])
+        snapshots[clave] = CumplimientoSnapshot(**fila)
+
+    reportes = (
+        ReporteAnual.objects
+        .order_by()
+        .values(
+            ppda_id=F('medida__medida__ppda_id'),
+            organismo_id=F('organismo_responsable_id'),
+            anio=ExtractYear('periodo'),
+        )
+        .annotate(**_agregados_reportes())
+    )
+    for fila in reportes:
+        clave = (fila['ppda_id'], fila['organismo_id'], fila['anio'])
+        snapshot = snapshots.setdefault(clave, CumplimientoSnapshot(
+            ppda_id=fila['ppda_id'], organismo_id=fila['organismo_id'], anio=fila['anio']
+        ))
+        snapshot.cumplimiento_promedio = fila['cumplimiento_promedio']
+        snapshot.total_reportes = fila['total_reportes']
+
+    with transaction.atomic():
+        # Los recálculos por clave esperan a que termine la reconstrucción
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {CumplimientoSnapshot._meta.db_table} IN EXCLUSIVE MODE')
+        CumplimientoSnapshot.objects.all().delete()
+        CumplimientoSnapshot.objects.bulk_create(snapshots.values(), batch_size=1000)
+    return len(snapshots)
+
+
+def clave_snapshot_avance(avance):
+    """
+    Clave (ppda, organismo, año) del snapshot al que aporta un avance. Usa
+    la medida si ya está cargada (lotes); si no, lee solo sus dos columnas.
+    """
+    if MedidaAvance.medida.is_cached(avance):
+        medida = avance.medida
+        return (medida.ppda_id, medida.organismo_responsable_id, avance.fecha_limite.year)
+    fila = Medida.objects.filter(pk=avance.medida_id).values_list('ppda_id', 'organismo_responsable_id').first()
+    if fila is None:
+        return None
+    return (*fila, avance.fecha_limite.year)
+
+
+def programar_recalculo(*claves):
+    """
+    Recalcula las claves afectadas cuando la transacción en curso se
+    confirma. Las claves repetidas o incompletas se descartan.
+    """
+    for clave in {c for c in claves if c and c[1] is not None and c[2] is not None}:
+        # robust: un error al recalcular se registra, la escritura ya está confirmada
+        transaction.on_commit(lambda clave=clave: recalcular_snapshot(*clave), robust=True)
+
+
+def consultar_snapshots(alcance, ppda_id=None, organismo_id=None, anio=None):
+    """
+    Lectura del dashboard: un filtro sobre la tabla de snapshots. `alcance`
+    es el organismo al que se restringe la lectura (None para todos) y se
+    aplica además del filtro `organismo_id`.
+    """
+    queryset = CumplimientoSnapshot.objects.select_related('ppda')
+    if alcance is not None:
+        queryset = queryset.filter(organismo_id=alcance)
+    if ppda_id:
+        queryset = queryset.filter(ppda_id=ppda_id)
+    if organismo_id:
+        queryset = queryset.filter(organismo_id=organismo_id)
+    if anio:
+        queryset = queryset.filter(anio=anio)
+    return queryset.order_by('-anio', 'organismo__nombre', 'ppda_id')
@@ -0,0 +1,404 @@
+import datetime
+import io
+import random
+from itertools import islice
+from operator import methodcaller
+from types import SimpleNamespace
+
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+
+from .alertas import evaluar_lecturas
+from .cache_respuestas import invalidar_cache_modelos
+from .cumplimiento import recalcular_snapshots
+from .models import (
+    Actividad, AlertaCritica, CumplimientoSnapshot, EjecucionSincronizacion, EstadoIntegracion, Indicador,
+    IndicadorAgregado, Medida, MedidaAvance, OrganismoSectorial, PPDA, PRIORIDADES, ReglaAlerta, ReporteAnual,
+    ReporteConsolidado
+)
+from .series import actualizar_agregados
+
+# Volúmenes esperados en producción
+VOLUMENES_PRODUCCION = {'indicadores': 1_000_000, 'avances': 100_000, 'actividades': 50_000}
+
+TAMANO_LOTE = 5000
+
+# Proporciones de las tablas que se derivan de las anteriores
+AVANCES_POR_MEDIDA = 10
+REPORTES_POR_AVANCE = 0.2
+MAXIMO_EJECUCIONES = 365
+
+# Fuente de integración (como en sincronizacion.FUENTES) y su nombre en Indicador.fuente
+FUENTES = {'snifa': 'SNIFA', 'airecoo': 'Airecoo'}
+PARAMETROS = [('PM2.5', 'µg/m³'), ('PM10', 'µg/m³'), ('SO2', 'ppb'), ('NO2', 'ppb'), ('O3', 'ppb')]
+# Umbrales de episodios críticos (alerta, preemergencia y emergencia) en promedio de 24 h
+EPISODIOS = {'PM2.5': [80, 110, 170], 'PM10': [195, 240, 330]}
+NIVELES_EPISODIO = ['Alerta', 'Preemergencia', 'Emergencia']
+MESES_INVIERNO = {5, 6, 7, 8}
+ESTACIONES_POR_PPDA = 4
+COMUNAS = [
+    'Temuco', 'Padre Las Casas', 'Coyhaique', 'Osorno', 'Valdivia', 'Talca', 'Maule', 'Chillán', 'Los Ángeles',
+    'Quintero', 'Puchuncaví', 'Concón', 'Santiago', 'Rancagua', 'Curicó', 'Andacollo', 'Tocopilla', 'Huasco',
+]
+ACCIONES = [
+    'Recambio de calefactores a leña', 'Fiscalización de fuentes fijas', 'Programa de aislación térmica',
+    'Control de quemas agrícolas', 'Educación ambiental en colegios', 'Restricción vehicular en episodios',
+    'Monitoreo de calidad del aire', 'Certificación de leña seca', 'Pavimentación de calles de tierra',
+    'Reducción de emisiones de termoeléctricas', 'Arborización urbana', 'Subsidio a calefacción eficiente',
+]
+ESTADOS_AVANCE = [estado for estado, _ in MedidaAvance.ESTADOS]
+TIPOS_MEDIDA = [tipo for tipo, _ in Medida.TIPOS_MEDIDA]
+CODIGOS_PRIORIDAD = [prioridad for prioridad, _ in PRIORIDADES]
+
+# Modelos que escribe generar_datos, en orden de dependencia
+MODELOS_GENERADOS = (
+    OrganismoSectorial, PPDA, Medida, MedidaAvance, ReporteAnual, Actividad, ReglaAlerta, Indicador, AlertaCritica,
+    IndicadorAgregado, CumplimientoSnapshot, EstadoIntegracion, EjecucionSincronizacion,
+)
+
+
+def _en_lotes(filas, tamano):
+    filas = iter(filas)
+    while True:
+        lote = list(islice(filas, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+ESCAPES_COPY = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+TIPOS_SIN_ESCAPE = {
+    'AutoField', 'BigAutoField', 'ForeignKey', 'OneToOneField', 'IntegerField', 'BigIntegerField',
+    'SmallIntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField', 'FloatField',
+}
+
+
+def _texto(valor):
+    return str(valor).translate(ESCAPES_COPY)
+
+
+def _conversor_copy(campo):
+    """
+    Función que lleva un valor (no nulo) del campo al formato de texto de
+    COPY. Se elige una vez por columna: es el costo dominante de la carga.
+    """
+    tipo = campo.get_internal_type()
+    if tipo == 'BooleanField':
+        return lambda valor: 't' if valor else 'f'
+    if tipo in ('DateField', 'DateTimeField'):
+        return methodcaller('isoformat')
+    if tipo in TIPOS_SIN_ESCAPE:
+        return str
+    return _texto
+
+
+def _valor_por_defecto(campo, ahora):
+    if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False):
+        return timezone.localdate(ahora) if campo.get_internal_type() == 'DateField' else ahora
+    # Sin default explícito Django usa '' en los textos no nulos y None en el resto
+    return campo.get_default()
+
+
+def _copiar(modelo, lote):
+    """
+    Inserta el lote (diccionarios de attname -> valor) con COPY. Los ids se
+    reservan antes desde la secuencia de la tabla y se escriben en cada
+    fila. Las columnas que no vienen en las filas toman el valor por
+    defecto del modelo, ya que la tabla no tiene defaults propios.
+    """
+    tabla = modelo._meta.db_table
+    campos = modelo._meta.concrete_fields
+    ahora = timezone.now()
+    columnas = [(campo.attname, _conversor_copy(campo), _valor_por_defecto(campo, ahora)) for campo in campos]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)", [tabla, len(lote)]
+        )
+        for fila, (pk,) in zip(lote, cursor.fetchall()):
+            fila['id'] = pk
+        lineas = []
+        for fila in lote:
+            valores = [fila.get(attname, defecto) for attname, _, defecto in columnas]
+            lineas.append('\t'.join(
+                '\\N' if valor is None else convertir(valor) for valor, (_, convertir, _) in zip(valores, columnas)
+            ))
+        lineas.append('')
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            connection.ops.quote_name(tabla), ', '.join(connection.ops.quote_name(campo.column) for campo in campos)
+        )
+        crudo = cursor.cursor
+        if hasattr(crudo, 'copy_expert'):
+            crudo.copy_expert(sql, io.StringIO('\n'.join(lineas)))
+        else:
+            # psycopg 3
+            with crudo.copy(sql) as copia:
+                copia.write('\n'.join(lineas))
+
+
+def _insertar(modelo, filas, tamano_lote, usar_copy):
+    """
+    Inserta `filas` (cualquier iterable de diccionarios) de a `tamano_lote`
+    con COPY o con bulk_create, y entrega cada lote ya insertado con el id
+    de cada fila.
+    """
+    for lote in _en_lotes(filas, tamano_lote):
+        if usar_copy:
+            _copiar(modelo, lote)
+        else:
+            objetos = modelo.objects.bulk_create([modelo(**fila) for fila in lote])
+            for fila, objeto in zip(lote, objetos):
+                fila['id'] = objeto.pk
+        yield lote
+
+
+def _cargar(modelo, filas, tamano_lote, usar_copy):
+    return sum(len(lote) for lote in _insertar(modelo, filas, tamano_lote, usar_copy))
+
+
+def copy_disponible():
+    return connection.vendor == 'postgresql'
+
+
+def _organismos():
+    OrganismoSectorial.objects.bulk_create(
+        [
+            OrganismoSectorial(
+                nombre=codigo, contacto=f'contacto@{codigo.lower()}.cl', telefono=f'+5622{i:07d}'
+            )
+            for i, (codigo, _) in enumerate(OrganismoSectorial.TIPOS_ORGANISMO, start=1)
+        ],
+        ignore_conflicts=True
+    )
+    return list(OrganismoSectorial.objects.order_by('id').values_list('id', flat=True))
+
+
+def _ppdas(cantidad, organismos, azar, hoy):
+    for i in range(cantidad):
+        comuna = COMUNAS[i % len(COMUNAS)]
+        yield {
+            'nombre': f'PPDA {comuna}' + (f' {i // len(COMUNAS) + 1}' if i >= len(COMUNAS) else ''),
+            'descripcion': f'Plan de prevención y descontaminación atmosférica de {comuna}',
+            'fecha_inicio': hoy - datetime.timedelta(days=azar.randint(365, 3650)),
+            'fecha_termino': hoy + datetime.timedelta(days=azar.randint(365, 3650)),
+            'organismo_id': organismos[i % len(organismos)],
+        }
+
+
+def _medidas(cantidad, ppdas, organismos, azar):
+    for i in range(cantidad):
+        ppda = ppdas[i % len(ppdas)]
+        accion = ACCIONES[azar.randrange(len(ACCIONES))]
+        inicio = ppda['fecha_inicio'] + datetime.timedelta(days=azar.randint(0, 365))
+        yield {
+            'nombre': f"{accion} en {ppda['nombre'][5:]}",
+            'tipo': TIPOS_MEDIDA[i % len(TIPOS_MEDIDA)],
+            'descripcion': f"{accion}. Medida {i + 1} del {ppda['nombre']}.",
+            'fecha_inicio': inicio,
+            'fecha_termino': max(inicio, ppda['fecha_termino']),
+            'prioridad': CODIGOS_PRIORIDAD[azar.randrange(len(CODIGOS_PRIORIDAD))],
+            'organismo_responsable_id': organismos[azar.randrange(len(organismos))],
+            'ppda_id': ppda['id'],
+        }
+
+
+def _avances(cantidad, medidas, azar, hoy):
+    for i in range(cantidad):
+        medida = medidas[i % len(medidas)]
+        estado = ESTADOS_AVANCE[azar.randrange(len(ESTADOS_AVANCE))]
+        yield {
+            'medida_id': medida[0],
+            'descripcion': f'Avance {i // len(medidas) + 1}: {medida[1]}',
+            'fecha_limite': hoy + datetime.timedelta(days=azar.randint(-1095, 365)),
+            'avance': 100 if estado == 'C' else 0 if estado == 'P' else azar.randint(1, 99),
+            'estado': estado,
+            'observaciones': '' if azar.random() < 0.7 else 'Informado por el organismo responsable',
+        }
+
+
+def _reportes_anuales(avances, azar):
+    for avance_id, organismo_id, fecha_limite in avances:
+        yield {
+            'organismo_responsable_id': organismo_id,
+            'periodo': datetime.date(fecha_limite.year, 12, 31),
+            'medida_id': avance_id,
+            'cumplimiento': round(azar.uniform(0, 100), 1),
+        }
+
+
+def _actividades(cantidad, medidas, azar, hoy):
+    for i in range(cantidad):
+        medida = medidas[i % len(medidas)]
+        inicio = hoy + datetime.timedelta(days=azar.randint(-1095, 180))
+        yield {
+            'nombre': f'Actividad {i // len(medidas) + 1}: {medida[1]}',
+            'descripcion': 'Jornada en terreno con la comunidad' if i % 3 == 0 else None,
+            'fecha_inicio': inicio,
+            'fecha_termino': inicio + datetime.timedelta(days=azar.randint(0, 60)),
+            'medida_id': medida[0],
+            'organismo_responsable_id': medida[2],
+        }
+
+
+def _reglas_alerta():
+    for nombre, umbrales in EPISODIOS.items():
+        for nivel, umbral in zip(NIVELES_EPISODIO, umbrales):
+            ReglaAlerta.objects.get_or_create(
+                nombre=nombre, unidad='µg/m³', ppda=None, umbral=umbral, ventana_horas=None,
+                defaults={'descripcion': f'{nivel} {nombre}'}
+            )
+
+
+def _indicadores(cantidad, ppdas, azar, fin):
+    """
+    Lecturas horarias hacia atrás desde `fin`, repartidas en series
+    (PPDA, estación, parámetro), más altas en invierno. Llevan clave de
+    deduplicación como las que llegan desde SNIFA y Airecoo.
+    """
+    fuentes = list(FUENTES.values())
+    series = [
+        (ppda, f"{ppda['nombre'][5:]} {estacion + 1}", nombre, unidad, fuentes[(estacion + j) % len(fuentes)])
+        for ppda in ppdas
+        for estacion in range(ESTACIONES_POR_PPDA)
+        for j, (nombre, unidad) in enumerate(PARAMETROS)
+    ]
+    for i in range(cantidad):
+        ppda, estacion, nombre, unidad, fuente = series[i % len(series)]
+        fecha = fin - datetime.timedelta(hours=i // len(series))
+        factor = 2 if fecha.month in MESES_INVIERNO else 1
+        lectura = SimpleNamespace(
+            nombre=nombre, descripcion='', valor=round(azar.lognormvariate(3, 0.6) * factor, 2), unidad=unidad,
+            fecha_medicion=fecha, fuente=fuente, estacion=estacion,
+            organismo_sectorial_id=ppda['organismo_id'], ppda_id=ppda['id'],
+        )
+        # El cálculo de la clave solo usa atributos, sirve con la lectura sin instanciar el modelo
+        lectura.clave_deduplicacion = Indicador.calcular_clave_deduplicacion(lectura)
+        yield lectura
+
+
+def _ejecuciones(fuente, dias, azar, fin):
+    for dia in range(min(dias, MAXIMO_EJECUCIONES)):
+        inicio = fin - datetime.timedelta(days=dia)
+        estado = azar.choices(['exitosa', 'fallida', 'omitida'], [90, 5, 5])[0]
+        obtenidas = azar.randint(100, 2000) if estado == 'exitosa' else 0
+        duracion = round(azar.uniform(2, 60), 2) if estado != 'omitida' else 0
+        yield {
+            'fuente': fuente,
+            'estado': estado,
+            'inicio': inicio,
+            'fin': inicio + datetime.timedelta(seconds=duracion),
+            'duracion': duracion,
+            'cursor': inicio - datetime.timedelta(days=1),
+            'filas_obtenidas': obtenidas,
+            'filas_insertadas': obtenidas,
+            'error': 'Tiempo de espera agotado al consultar la fuente' if estado == 'fallida' else '',
+        }
+
+
+def generar_datos(indicadores=0, avances=0, actividades=0, ppdas=12, tamano_lote=TAMANO_LOTE, semilla=0,
+                  agregados=True, usar_copy=None):
+    """
+    Genera datos con valores válidos para todos los modelos de reportes salvo
+    usuarios y reportes consolidados, y retorna cuántas filas creó por
+    tabla. La misma semilla genera los mismos datos.
+
+    Las tablas grandes se cargan de a `tamano_lote` filas con COPY en
+    PostgreSQL o con bulk_create en otra base (o con `usar_copy=False`).
+    Las medidas (una cada AVANCES_POR_MEDIDA avances) y los reportes
+    anuales se derivan de la cantidad de avances. Las alertas salen de
+    evaluar las lecturas con las reglas de episodios críticos. Con
+    `agregados` se recalculan las tablas de series y de cumplimiento que
+    leen las vistas.
+    """
+    if usar_copy is None:
+        usar_copy = copy_disponible()
+    azar = random.Random(semilla)
+    hoy = timezone.localdate()
+    creados = {}
+
+    organismos = _organismos()
+    lista_ppdas = [fila for lote in _insertar(PPDA, _ppdas(ppdas, organismos, azar, hoy), tamano_lote, usar_copy)
+                   for fila in lote]
+    creados['ppdas'] = len(lista_ppdas)
+
+    # De medidas y avances solo se conserva lo necesario para las tablas que dependen de ellos
+    medidas = []
+    cantidad_medidas = max(avances // AVANCES_POR_MEDIDA, 1) if avances or actividades else 0
+    for lote in _insertar(Medida, _medidas(cantidad_medidas, lista_ppdas, organismos, azar), tamano_lote, usar_copy):
+        medidas += [(m['id'], m['nombre'], m['organismo_responsable_id']) for m in lote]
+    creados['medidas'] = len(medidas)
+
+    organismo_medida = {medida_id: organismo_id for medida_id, _, organismo_id in medidas}
+    con_reporte = []
+    creados['avances'] = 0
+    for lote in _insertar(MedidaAvance, _avances(avances, medidas, azar, hoy), tamano_lote, usar_copy):
+        creados['avances'] += len(lote)
+        con_reporte += [
+            (a['id'], organismo_medida[a['medida_id']], a['fecha_limite'])
+            for a in lote if azar.random() < REPORTES_POR_AVANCE
+        ]
+    creados['reportes_anuales'] = _cargar(
+        ReporteAnual, _reportes_anuales(con_reporte, azar), tamano_lote, usar_copy
+    )
+    creados['actividades'] = _cargar(Actividad, _actividades(actividades, medidas, azar, hoy), tamano_lote, usar_copy)
+
+    _reglas_alerta()
+    invalidar_cache_modelos(ReglaAlerta)
+    umbral_minimo = min(min(umbrales) for umbrales in EPISODIOS.values())
+    # Las lecturas se generan antes de la más antigua que exista, así sus claves de deduplicación no chocan
+    fin = timezone.now().replace(minute=0, second=0, microsecond=0)
+    primera = Indicador.objects.aggregate(primera=Min('fecha_medicion'))['primera']
+    if primera is not None:
+        fin = min(fin, primera - datetime.timedelta(hours=1))
+    creados['indicadores'] = creados['alertas'] = 0
+    lecturas = (vars(lectura) for lectura in _indicadores(indicadores, lista_ppdas, azar, fin))
+    for lote in _insertar(Indicador, lecturas, tamano_lote, usar_copy):
+        creados['indicadores'] += len(lote)
+        candidatas = [SimpleNamespace(**fila) for fila in lote if fila['valor'] > umbral_minimo]
+        creados['alertas'] += evaluar_lecturas(candidatas)
+
+    creados['ejecuciones'] = 0
+    dias = -(-indicadores // (len(lista_ppdas) * ESTACIONES_POR_PPDA * len(PARAMETROS) * 24)) if lista_ppdas else 0
+    for fuente in FUENTES:
+        EstadoIntegracion.objects.get_or_create(fuente=fuente, defaults={'ultima_medicion': fin})
+        creados['ejecuciones'] += _cargar(
+            EjecucionSincronizacion, _ejecuciones(fuente, dias, azar, fin), tamano_lote, usar_copy
+        )
+
+    if agregados:
+        creados['agregados'] = actualizar_agregados()
+        recalcular_snapshots()
+    # Las cargas masivas no emiten señales: se invalida a mano la cache de respuestas
+    invalidar_cache_modelos(*MODELOS_GENERADOS)
+    return creados
+
+
+def limpiar_datos():
+    """
+    Vacía las tablas que escribe generar_datos (salvo los organismos, que
+    referencian los perfiles de usuario) y los reportes consolidados. Las
+    reglas de alerta se vacían también porque referencian a los PPDA.
+    """
+    modelos = [m for m in MODELOS_GENERADOS if m is not OrganismoSectorial] + [ReporteConsolidado]
+    if connection.vendor == 'postgresql':
+        tablas = ', '.join(connection.ops.quote_name(modelo._meta.db_table) for modelo in modelos)
+        with connection.cursor() as cursor:
+            # Las FK diferidas de escrituras previas en la transacción impiden el TRUNCATE
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'TRUNCATE {tablas} RESTART IDENTITY')
+    else:
+        for modelo in reversed(modelos):
+            modelo.objects.all().delete()
+    invalidar_cache_modelos(*modelos)
+
+
+def analizar_tablas(modelos=MODELOS_GENERADOS):
+    """
+    Actualiza las estadísticas del planificador de las tablas de `modelos`,
+    para que los planes reflejen los datos recién cargados.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for modelo in modelos:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
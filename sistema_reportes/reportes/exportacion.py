@@ -0,0 +1,401 @@
+import csv
+import datetime
+import io
+import re
+import zipfile
+from decimal import Decimal
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework.exceptions import ValidationError
+
+from .models import Actividad, Indicador, MedidaAvance, ReporteAnual
+
+# Conjunto exportable: queryset base, columnas (ruta ORM, encabezado) y filtros
+# aceptados (parámetro de query → lookup)
+CONJUNTOS = {
+    'indicadores': {
+        'modelo': Indicador,
+        'orden': ('-fecha_medicion', '-id'),
+        'columnas': [
+            ('id', 'id'),
+            ('nombre', 'nombre'),
+            ('valor', 'valor'),
+            ('unidad', 'unidad'),
+            ('organismo_sectorial_id', 'organismo_id'),
+            ('organismo_sectorial__nombre', 'organismo'),
+            ('ppda_id', 'ppda_id'),
+            ('ppda__nombre', 'ppda'),
+            ('fuente', 'fuente'),
+            ('estacion', 'estacion'),
+            ('fecha_medicion', 'fecha_medicion'),
+            ('fecha_registro', 'fecha_registro'),
+        ],
+        'filtros': {
+            'nombre': 'nombre',
+            'organismo_id': 'organismo_sectorial_id',
+            'ppda_id': 'ppda_id',
+            'desde': 'fecha_medicion__gte',
+            'hasta': 'fecha_medicion__lte',
+        },
+    },
+    'medidas-avance': {
+        'modelo': MedidaAvance,
+        'orden': ('id',),
+        'columnas': [
+            ('id', 'id'),
+            ('medida_id', 'medida_id'),
+            ('medida__nombre', 'medida'),
+            ('medida__organismo_responsable__nombre', 'organismo'),
+            ('medida__ppda_id', 'ppda_id'),
+            ('descripcion', 'descripcion'),
+            ('fecha_limite', 'fecha_limite'),
+            ('avance', 'avance'),
+            ('estado', 'estado'),
+            ('observaciones', 'observaciones'),
+            ('fecha_actualizacion', 'fecha_actualizacion'),
+        ],
+        'filtros': {
+            'estado': 'estado',
+            'organismo_id': 'medida__organismo_responsable_id',
+            'ppda_id': 'medida__ppda_id',
+            'desde': 'fecha_limite__gte',
+            'hasta': 'fecha_limite__lte',
+        },
+    },
+    'actividades': {
+        'modelo': Actividad,
+        'orden': ('id',),
+        'columnas': [
+            ('id', 'id'),
+            ('nombre', 'nombre'),
+            ('descripcion', 'descripcion'),
+            ('fecha_inicio', 'fecha_inicio'),
+            ('fecha_termino', 'fecha_termino'),
+            ('medida_id', 'medida_id'),
+            ('medida__nombre', 'medida'),
+            ('organismo_responsable_id', 'organismo_id'),
+            ('organismo_responsable__nombre', 'organismo'),
+        ],
+        'filtros': {
+            'organismo_id': 'organismo_responsable_id',
+            'medida_id': 'medida_id',
+            'desde': 'fecha_inicio__gte',
+            'hasta': 'fecha_inicio__lte',
+        },
+    },
+    'reportes-anuales': {
+        'modelo': ReporteAnual,
+        'orden': ('periodo', 'id'),
+        'columnas': [
+            ('id', 'id'),
+            ('periodo', 'periodo'),
+            ('organismo_responsable_id', 'organismo_id'),
+            ('organismo_responsable__nombre', 'organismo'),
+            ('medida_id', 'medida_avance_id'),
+            ('medida__medida__nombre', 'medida'),
+            ('cumplimiento', 'cumplimiento'),
+            ('observaciones', 'observaciones'),
+        ],
+        'filtros': {
+            'organismo_id': 'organismo_responsable_id',
+            'desde': 'periodo__gte',
+            'hasta': 'periodo__lte',
+        },
+    },
+}
+
+TIPOS_CONTENIDO = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Tamaño aproximado (bytes) de cada trozo enviado al cliente
+TAMANO_TROZO = 64 * 1024
+
+
+def _valor_filtro(modelo, parametro, lookup, valor):
+    """
+    Convierte el valor de un filtro con el campo del modelo; un valor
+    inválido (o fuera del rango de la columna) responde 400.
+    """
+    ruta = lookup.removesuffix('__gte').removesuffix('__lte')
+    campo = _campo_de_ruta(modelo, ruta)
+    try:
+        valor = campo.to_python(valor)
+        campo.run_validators(valor)
+    except DjangoValidationError as exc:
+        raise ValidationError({parametro: exc.messages})
+    return valor
+
+
+def queryset_exportacion(conjunto, parametros):
+    definicion = CONJUNTOS[conjunto]
+    modelo = definicion['modelo']
+    queryset = modelo.objects.order_by(*definicion['orden'])
+    for parametro, lookup in definicion['filtros'].items():
+        valor = parametros.get(parametro)
+        if valor:
+            queryset = queryset.filter(**{lookup: _valor_filtro(modelo, parametro, lookup, valor)})
+    return queryset
+
+
+def iterar_filas(queryset, columnas, chunk_size=None):
+    """
+    Filas como tuplas leídas con un cursor del servidor, sin instanciar modelos.
+    """
+    chunk_size = chunk_size or settings.EXPORTACION_CHUNK_SIZE
+    return queryset.values_list(*[ruta for ruta, _ in columnas]).iterator(chunk_size=chunk_size)
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def exportar_csv(filas, encabezados):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+    for fila in filas:
+        escritor.writerow([_texto(valor) for valor in fila])
+        if buffer.tell() >= TAMANO_TROZO:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class Sumidero(io.RawIOBase):
+    """
+    Archivo de solo escritura y no posicionable: acumula lo escrito hasta que
+    el generador lo vacía, así el archivo nunca está completo en memoria.
+    """
+    def __init__(self):
+        self.partes = []
+        self.posicion = 0
+        self.pendiente = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        self.posicion += len(datos)
+        self.pendiente += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        self.pendiente = 0
+        return datos
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{hojas}'
+    '</Types>'
+)
+XLSX_CONTENT_TYPE_HOJA = (
+    '<Override PartName="/xl/worksheets/sheet{numero}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{hojas}</sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_HOJA = '<sheet name="{nombre}" sheetId="{numero}" r:id="rId{numero}"/>'
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{hojas}'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_REL_HOJA = (
+    '<Relationship Id="rId{numero}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{numero}.xml"/>'
+)
+XLSX_HOJA_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_HOJA_FIN = '</sheetData></worksheet>'
+
+# Caracteres de control que XML 1.0 no admite
+CARACTERES_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Caracteres que Excel no admite en el nombre de una hoja
+CARACTERES_INVALIDOS_HOJA = re.compile(r'[\[\]:*?/\\]')
+
+
+def _celda_xlsx(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c><v>{valor}</v></c>'
+    texto = escape(CARACTERES_INVALIDOS_XML.sub('', str(_texto(valor))))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xlsx(valores):
+    return '<row>' + ''.join(_celda_xlsx(valor) for valor in valores) + '</row>'
+
+
+def _nombre_hoja(nombre):
+    return escape(CARACTERES_INVALIDOS_HOJA.sub('-', nombre)[:31], {'"': '&quot;'})
+
+
+def escribir_xlsx(hojas):
+    """
+    Escribe un XLSX mínimo (celdas inline, sin estilos) directo a un zip en
+    stream, sin depender de openpyxl ni armar el libro en memoria. `hojas`
+    es una lista de (nombre, encabezados, filas); las filas pueden ser un
+    iterador.
+    """
+    numeros = range(1, len(hojas) + 1)
+    sumidero = Sumidero()
+    with zipfile.ZipFile(sumidero, 'w', compression=zipfile.ZIP_DEFLATED) as archivo:
+        archivo.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES.format(
+            hojas=''.join(XLSX_CONTENT_TYPE_HOJA.format(numero=n) for n in numeros)
+        ))
+        archivo.writestr('_rels/.rels', XLSX_RELS)
+        archivo.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(hojas=''.join(
+            XLSX_WORKBOOK_HOJA.format(nombre=_nombre_hoja(nombre), numero=n)
+            for n, (nombre, _, _) in zip(numeros, hojas)
+        )))
+        archivo.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS.format(
+            hojas=''.join(XLSX_WORKBOOK_REL_HOJA.format(numero=n) for n in numeros)
+        ))
+        for numero, (_, encabezados, filas) in zip(numeros, hojas):
+            with archivo.open(f'xl/worksheets/sheet{numero}.xml', 'w', force_zip64=True) as hoja_xml:
+                hoja_xml.write(XLSX_HOJA_INICIO.encode())
+                hoja_xml.write(_fila_xlsx(encabezados).encode())
+                for fila in filas:
+                    hoja_xml.write(_fila_xlsx(fila).encode())
+                    if sumidero.pendiente >= TAMANO_TROZO:
+                        yield sumidero.vaciar()
+                hoja_xml.write(XLSX_HOJA_FIN.encode())
+    yield sumidero.vaciar()
+
+
+def exportar_xlsx(filas, encabezados, hoja='Datos'):
+    return escribir_xlsx([(hoja, encabezados, filas)])
+
+
+def _campo_de_ruta(modelo, ruta):
+    """
+    Campo final de una ruta ORM; para una FK (o su attname) retorna el campo destino.
+    """
+    campo = None
+    for parte in ruta.split('__'):
+        campo = modelo._meta.get_field(parte)
+        if campo.is_relation:
+            modelo = campo.related_model
+    if isinstance(campo, models.ForeignKey):
+        return campo.target_field
+    return campo
+
+
+def _esquema_parquet(pa, modelo, columnas):
+    tipos = []
+    for ruta, encabezado in columnas:
+        campo = _campo_de_ruta(modelo, ruta)
+        if isinstance(campo, (models.AutoField, models.IntegerField)):
+            tipo = pa.int64()
+        elif isinstance(campo, (models.FloatField, models.DecimalField)):
+            tipo = pa.float64()
+        elif isinstance(campo, models.DateTimeField):
+            tipo = pa.timestamp('us', tz='UTC')
+        elif isinstance(campo, models.DateField):
+            tipo = pa.date32()
+        elif isinstance(campo, models.BooleanField):
+            tipo = pa.bool_()
+        else:
+            tipo = pa.string()
+        tipos.append(pa.field(encabezado, tipo))
+    return pa.schema(tipos)
+
+
+def parquet_disponible():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def exportar_parquet(filas, columnas, modelo, filas_por_grupo=None):
+    """
+    Escribe un row group por cada bloque de filas y envía los bytes
+    apenas se generan. Requiere pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    filas_por_grupo = filas_por_grupo or settings.EXPORTACION_CHUNK_SIZE
+    esquema = _esquema_parquet(pa, modelo, columnas)
+    sumidero = Sumidero()
+    escritor = pq.ParquetWriter(sumidero, esquema, compression='snappy')
+    try:
+        while True:
+            bloque = list(islice(filas, filas_por_grupo))
+            if not bloque:
+                break
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(columna, type=campo.type) for columna, campo in zip(zip(*bloque), esquema)],
+                schema=esquema
+            ))
+            yield sumidero.vaciar()
+    finally:
+        escritor.close()
+    yield sumidero.vaciar()
+
+
+def exportar(conjunto, formato, parametros):
+    """
+    Retorna el generador de bytes de la exportación pedida. Los filtros se
+    validan y la consulta se compila antes, para que un error responda
+    400 en vez de truncar el archivo después del 200.
+    """
+    definicion = CONJUNTOS[conjunto]
+    columnas = definicion['columnas']
+    encabezados = [encabezado for _, encabezado in columnas]
+    queryset = queryset_exportacion(conjunto, parametros)
+    str(queryset.query)
+    filas = iterar_filas(queryset, columnas)
+    if formato == 'csv':
+        return exportar_csv(filas, encabezados)
+    if formato == 'xlsx':
+        return exportar_xlsx(filas, encabezados, hoja=conjunto)
+    return exportar_parquet(filas, columnas, definicion['modelo'])
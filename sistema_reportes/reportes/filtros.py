@@ -0,0 +1,128 @@
+from django import forms
+from django_filters import rest_framework as filters
+from rest_framework import serializers
+
+from .alcance import alcance_de_request, filtrar_por_alcance
+from .cumplimiento import consultar_snapshots, filtrar_reportes
+from .models import PPDA, Actividad, Indicador, MedidaAvance, ReporteAnual, ReporteConsolidado
+from .series import TRUNCAMIENTOS, consultar_serie
+
+
+def leer_parametros(serializer_class, request):
+    """
+    Valida los parámetros de la query con un serializer y retorna sus
+    valores convertidos; un valor inválido responde 400. Los parámetros
+    vacíos se tratan como ausentes.
+    """
+    datos = {clave: valor for clave, valor in request.query_params.items() if valor != ''}
+    serializer = serializer_class(data=datos)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+class FiltroEntero(filters.NumberFilter):
+    """
+    NumberFilter que solo acepta enteros (ids y campos enteros).
+    """
+    field_class = forms.IntegerField
+
+
+class PPDAFilter(filters.FilterSet):
+    organismo_id = FiltroEntero(field_name='organismo_id')
+
+    class Meta:
+        model = PPDA
+        fields = []
+
+
+class MedidaAvanceFilter(filters.FilterSet):
+    estado = filters.CharFilter()
+    avance_min = FiltroEntero(field_name='avance', lookup_expr='gte')
+
+    class Meta:
+        model = MedidaAvance
+        fields = []
+
+
+class IndicadorFilter(filters.FilterSet):
+    nombre = filters.CharFilter()
+    organismo_id = FiltroEntero(field_name='organismo_sectorial_id')
+    ppda_id = FiltroEntero(field_name='ppda_id')
+    desde = filters.DateFilter(field_name='fecha_registro', lookup_expr='gte')
+    hasta = filters.DateFilter(field_name='fecha_registro', lookup_expr='lte')
+
+    class Meta:
+        model = Indicador
+        fields = []
+
+
+class ActividadFilter(filters.FilterSet):
+    medida_id = FiltroEntero(field_name='medida_id')
+
+    class Meta:
+        model = Actividad
+        fields = []
+
+
+class ReporteAnualFilter(filters.FilterSet):
+    periodo = filters.DateFilter()
+    organismo_id = FiltroEntero(field_name='organismo_responsable_id')
+
+    class Meta:
+        model = ReporteAnual
+        fields = []
+
+
+class ReporteConsolidadoFilter(filters.FilterSet):
+    organismo_id = FiltroEntero(field_name='organismo_responsable_id')
+    ppda_id = FiltroEntero(field_name='ppda_id')
+
+    class Meta:
+        model = ReporteConsolidado
+        fields = []
+
+
+class ResumenAnualParametrosSerializer(serializers.Serializer):
+    organismo_id = serializers.IntegerField(required=False)
+    anio_desde = serializers.IntegerField(required=False, min_value=1, max_value=9999)
+    anio_hasta = serializers.IntegerField(required=False, min_value=1, max_value=9999)
+
+
+class SerieParametrosSerializer(serializers.Serializer):
+    resolucion = serializers.ChoiceField(choices=list(TRUNCAMIENTOS), default='dia')
+    nombre = serializers.CharField(required=False)
+    organismo_id = serializers.IntegerField(required=False)
+    ppda_id = serializers.IntegerField(required=False)
+    desde = serializers.DateTimeField(required=False)
+    hasta = serializers.DateTimeField(required=False)
+
+
+def serie_de_request(request):
+    """
+    Serie de indicadores según los parámetros y el alcance de la request.
+    La usan series_indicadores y su versión async.
+    """
+    parametros = leer_parametros(SerieParametrosSerializer, request)
+    return consultar_serie(parametros.pop('resolucion'), alcance_de_request(request), **parametros)
+
+
+class SnapshotsParametrosSerializer(serializers.Serializer):
+    ppda_id = serializers.IntegerField(required=False)
+    organismo_id = serializers.IntegerField(required=False)
+    anio = serializers.IntegerField(required=False, min_value=1, max_value=9999)
+
+
+def snapshots_de_request(request):
+    """
+    Snapshots de cumplimiento según los parámetros y el alcance de la request.
+    """
+    parametros = leer_parametros(SnapshotsParametrosSerializer, request)
+    return consultar_snapshots(alcance_de_request(request), **parametros)
+
+
+def reportes_de_request(request):
+    """
+    ReporteAnual del alcance de la request con los filtros del resumen anual.
+    """
+    queryset = filtrar_por_alcance(request, ReporteAnual.objects.all(), 'organismo_responsable_id')
+    return filtrar_reportes(queryset, **leer_parametros(ResumenAnualParametrosSerializer, request))
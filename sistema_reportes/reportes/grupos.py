@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_GRUPOS_USUARIO = 'grupos_usuario:{}'
+CLAIM_GRUPOS = 'grupos'
+
+
+def _clave(user_id):
+    return CLAVE_GRUPOS_USUARIO.format(user_id)
+
+
+def grupos_de_usuario(user):
+    """
+    Retorna los nombres de grupo del usuario.
+
+    El resultado se memoriza en el objeto usuario (dura lo que dura la
+    request) y en la cache de Django, que se invalida desde signals.py
+    cuando cambian los grupos del usuario.
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    grupos = getattr(user, '_grupos_cache', None)
+    if grupos is None:
+        grupos = cache.get(_clave(user.pk))
+        if grupos is None:
+            grupos = frozenset(user.groups.values_list('name', flat=True))
+            cache.set(_clave(user.pk), grupos, getattr(settings, 'GRUPOS_CACHE_TIMEOUT', 300))
+        user._grupos_cache = grupos
+    return grupos
+
+
+def grupos_de_request(request):
+    """
+    Retorna los grupos del usuario de la request.
+
+    Si el token JWT trae el claim de grupos se usa directamente y no se
+    consulta la base de datos.
+    """
+    token = getattr(request, 'auth', None)
+    if token is not None and hasattr(token, 'get'):
+        grupos = token.get(CLAIM_GRUPOS)
+        if grupos is not None:
+            return frozenset(grupos)
+    return grupos_de_usuario(request.user)
+
+
+def tiene_grupo(request, *nombres):
+    return not grupos_de_request(request).isdisjoint(nombres)
+
+
+def invalidar_grupos(user_ids):
+    cache.delete_many([_clave(user_id) for user_id in user_ids])
@@ -0,0 +1,224 @@
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .alertas import evaluar_lecturas
+from .cache_respuestas import invalidar_cache_modelos
+from .models import Indicador
+
+logger = logging.getLogger(__name__)
+
+# Campos que no se validan por registro (las FK se resuelven una vez por lote)
+CAMPOS_SIN_VALIDAR = ['organismo_sectorial', 'ppda', 'medio_verificacion']
+
+
+CONTADORES = ('recibidos', 'insertados', 'actualizados', 'sin_cambios', 'rechazados', 'alertas')
+
+
+def nuevo_resultado():
+    resultado = dict.fromkeys(CONTADORES, 0)
+    # error_lote: primer lote que no se pudo guardar; la sincronización no
+    # debe avanzar su marca más allá de esas lecturas
+    resultado.update({'primera_medicion': None, 'ultima_medicion': None, 'errores': [], 'error_lote': None})
+    return resultado
+
+
+def _extender_rango(resultado, primera, ultima):
+    if primera is not None and (resultado['primera_medicion'] is None or primera < resultado['primera_medicion']):
+        resultado['primera_medicion'] = primera
+    if ultima is not None and (resultado['ultima_medicion'] is None or ultima > resultado['ultima_medicion']):
+        resultado['ultima_medicion'] = ultima
+
+
+def combinar_resultados(total, parcial):
+    for contador in CONTADORES:
+        total[contador] += parcial[contador]
+    _extender_rango(total, parcial['primera_medicion'], parcial['ultima_medicion'])
+    total['error_lote'] = total['error_lote'] or parcial['error_lote']
+    espacio = settings.INTEGRACION_MAX_ERRORES - len(total['errores'])
+    total['errores'].extend(parcial['errores'][:max(espacio, 0)])
+    return total
+
+
+def _registrar_error(resultado, mensaje):
+    resultado['rechazados'] += 1
+    if len(resultado['errores']) < settings.INTEGRACION_MAX_ERRORES:
+        resultado['errores'].append(mensaje)
+
+
+def _fecha_medicion(dato):
+    """
+    Fecha de la lectura informada por la fuente, o None si no viene.
+    """
+    valor = dato.get('fecha')
+    if not valor:
+        return None
+    fecha = parse_datetime(str(valor))
+    if fecha is None:
+        raise ValueError(f"Fecha inválida: {valor}")
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def _lectura(dato, **campos):
+    """
+    Construye el Indicador. Solo las lecturas con fecha informada por la
+    fuente llevan clave de deduplicación: sin fecha no hay forma de saber
+    si dos registros son la misma lectura.
+    """
+    fecha = _fecha_medicion(dato)
+    indicador = Indicador(
+        organismo_sectorial_id=settings.INTEGRACION_ORGANISMO_ID,
+        estacion=dato.get('estacion') or '',
+        **campos
+    )
+    if fecha is not None:
+        indicador.fecha_medicion = fecha
+        indicador.clave_deduplicacion = indicador.calcular_clave_deduplicacion()
+    return indicador
+
+
+def _lectura_snifa(dato):
+    if not isinstance(dato, dict) or not all(key in dato for key in ['parametro', 'valor']):
+        raise ValueError(f"Datos incompletos en SNIFA: {dato}")
+    return _lectura(dato, nombre=dato['parametro'], valor=dato['valor'], unidad="µg/m³", fuente="SNIFA")
+
+
+def _lectura_airecoo(dato):
+    if not isinstance(dato, dict) or not all(key in dato for key in ['nombre', 'valor', 'unidad']):
+        raise ValueError(f"Datos incompletos en Airecoo: {dato}")
+    return _lectura(dato, nombre=dato['nombre'], valor=dato['valor'], unidad=dato['unidad'], fuente="Airecoo")
+
+
+def _guardar_lote(lote, resultado):
+    """
+    Inserta o actualiza un lote por su clave de deduplicación y evalúa las
+    reglas de alerta sobre las lecturas escritas.
+
+    Las lecturas que ya existen con el mismo valor no se escriben, así que
+    repetir una descarga completa o solapada no genera escrituras. El
+    upsert (ON CONFLICT) cubre el caso de dos cargas concurrentes.
+    """
+    lecturas = {}
+    sin_clave = []
+    for indicador in lote:
+        if indicador.clave_deduplicacion:
+            lecturas[indicador.clave_deduplicacion] = indicador
+        else:
+            sin_clave.append(indicador)
+    repetidos = len(lote) - len(lecturas) - len(sin_clave)
+
+    existentes = {
+        clave: (valor, unidad)
+        for clave, valor, unidad in Indicador.objects.filter(
+            clave_deduplicacion__in=lecturas.keys()
+        ).values_list('clave_deduplicacion', 'valor', 'unidad')
+    }
+    nuevos = [i for clave, i in lecturas.items() if clave not in existentes]
+    cambiados = [
+        i for clave, i in lecturas.items()
+        if clave in existentes and existentes[clave] != (i.valor, i.unidad)
+    ]
+    escritos = nuevos + cambiados
+    if escritos or sin_clave:
+        with transaction.atomic():
+            if escritos:
+                Indicador.objects.bulk_create(
+                    escritos,
+                    update_conflicts=True,
+                    unique_fields=['clave_deduplicacion'],
+                    update_fields=['valor', 'unidad'],
+                )
+            if sin_clave:
+                Indicador.objects.bulk_create(sin_clave)
+            invalidar_cache_modelos(Indicador)
+
+    resultado['insertados'] += len(nuevos) + len(sin_clave)
+    resultado['actualizados'] += len(cambiados)
+    resultado['sin_cambios'] += len(lecturas) - len(escritos) + repetidos
+    fechas = [i.fecha_medicion for i in lecturas.values()]
+    if fechas:
+        _extender_rango(resultado, None, max(fechas))
+    escritos += sin_clave
+    if escritos:
+        _extender_rango(resultado, min(i.fecha_medicion for i in escritos), None)
+        _evaluar_alertas(escritos, resultado)
+
+
+def _evaluar_alertas(lecturas, resultado):
+    """
+    Evalúa las reglas de alerta sobre las lecturas recién escritas. Un error
+    aquí no revierte el lote, que ya quedó guardado.
+    """
+    try:
+        with transaction.atomic():
+            resultado['alertas'] += evaluar_lecturas(lecturas)
+    except DatabaseError as e:
+        logger.exception("Error al evaluar alertas del lote")
+        if len(resultado['errores']) < settings.INTEGRACION_MAX_ERRORES:
+            resultado['errores'].append(f"Error al evaluar alertas: {e}")
+
+
+def guardar_lecturas(datos, construir, tamano_lote=None):
+    """
+    Valida y guarda lecturas registro a registro, en lotes.
+
+    `datos` puede ser una lista o cualquier iterable (por ejemplo el stream
+    de una respuesta HTTP). Cada lote se inserta con bulk_create en su
+    propia transacción, así que la memoria usada depende del tamaño del
+    lote y no del total. Las lecturas se identifican por su clave de
+    deduplicación, por lo que volver a cargarlas no crea duplicados. Los
+    registros inválidos se cuentan como rechazados en el resultado en vez
+    de abortar la carga completa. Un lote que falla en la base se informa
+    además en `error_lote`: sus lecturas son válidas y hay que volver a
+    pedirlas.
+    """
+    if isinstance(datos, (str, bytes, dict)) or not hasattr(datos, '__iter__'):
+        raise ValueError("Los datos deben ser una lista")
+
+    tamano_lote = tamano_lote or settings.INTEGRACION_TAMANO_LOTE
+    resultado = nuevo_resultado()
+    datos = iter(datos)
+    posicion = 0
+    while True:
+        registros = list(islice(datos, tamano_lote))
+        if not registros:
+            break
+
+        lote = []
+        for dato in registros:
+            resultado['recibidos'] += 1
+            try:
+                indicador = construir(dato)
+                indicador.clean_fields(exclude=CAMPOS_SIN_VALIDAR)
+            except (ValueError, TypeError) as e:
+                _registrar_error(resultado, f"Registro {posicion}: {e}")
+            except ValidationError as e:
+                _registrar_error(resultado, f"Registro {posicion}: {'; '.join(e.messages)}")
+            else:
+                lote.append(indicador)
+            posicion += 1
+
+        try:
+            _guardar_lote(lote, resultado)
+        except DatabaseError as e:
+            logger.exception("Error al insertar lote de indicadores")
+            mensaje = f"Lote terminado en registro {posicion - 1}: {e}"
+            resultado['rechazados'] += len(lote)
+            resultado['errores'].append(mensaje)
+            resultado['error_lote'] = resultado['error_lote'] or mensaje
+    return resultado
+
+
+def guardar_datos_snifa(datos, tamano_lote=None):
+    return guardar_lecturas(datos, _lectura_snifa, tamano_lote)
+
+
+def guardar_datos_airecoo(datos, tamano_lote=None):
+    return guardar_lecturas(datos, _lectura_airecoo, tamano_lote)
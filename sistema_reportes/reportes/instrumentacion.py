@@ -0,0 +1,264 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+CLAVE_CANTIDAD_ENDPOINTS = 'sql_estadisticas:endpoints'
+CLAVE_ENDPOINT = 'sql_estadisticas:endpoint:{}'
+CLAVE_ESTADISTICA = 'sql_estadisticas:{}:{}'
+# Contadores (cache.incr) y detalle no atómico de cada endpoint
+CAMPOS = ('peticiones', 'consultas', 'tiempo_us', 'excedidas', 'detalle')
+DETALLE_VACIO = {'max_consultas': 0, 'max_tiempo_us': 0, 'presupuesto': None, 'lentas': []}
+LARGO_MAXIMO_SQL = 500
+
+
+class PresupuestoConsultasExcedido(Exception):
+    """
+    Una vista ejecutó más consultas que su presupuesto declarado.
+    """
+
+
+def presupuesto_consultas(cantidad):
+    """
+    Declara el presupuesto de consultas de una vista de función. Va sobre
+    @api_view. En los ViewSet se usa el atributo `presupuesto_consultas`,
+    que puede ser un entero o un dict por acción ('*' para el resto).
+    """
+    def decorador(vista):
+        vista.presupuesto_consultas = cantidad
+        return vista
+    return decorador
+
+
+def describir_vista(vista, request):
+    """
+    Retorna (endpoint, presupuesto) de la vista que atiende la request.
+    """
+    cls = getattr(vista, 'cls', None)
+    acciones = getattr(vista, 'actions', None) or {}
+    accion = acciones.get(request.method.lower())
+    nombre = cls.__name__ if cls is not None else vista.__name__
+    endpoint = f"{nombre}.{accion}" if accion else nombre
+
+    presupuesto = getattr(vista, 'presupuesto_consultas', None)
+    if presupuesto is None and cls is not None:
+        presupuesto = getattr(cls, 'presupuesto_consultas', None)
+    if isinstance(presupuesto, dict):
+        presupuesto = presupuesto.get(accion, presupuesto.get('*'))
+    return endpoint, presupuesto
+
+
+class RegistroConsultas:
+    """
+    Wrapper de ejecución que cuenta las consultas de la request y guarda
+    las más lentas.
+    """
+    def __init__(self, cantidad_lentas):
+        self.cantidad_lentas = cantidad_lentas
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo += duracion
+            self._registrar_lenta(sql, duracion)
+
+    def _registrar_lenta(self, sql, duracion):
+        if len(self.lentas) >= self.cantidad_lentas and duracion <= self.lentas[-1]['ms'] / 1000:
+            return
+        self.lentas.append({'sql': sql[:LARGO_MAXIMO_SQL], 'ms': round(duracion * 1000, 3)})
+        self.lentas.sort(key=lambda consulta: consulta['ms'], reverse=True)
+        del self.lentas[self.cantidad_lentas:]
+
+
+def _clave(endpoint, campo):
+    return CLAVE_ESTADISTICA.format(endpoint, campo)
+
+
+def _sumar(clave, valor, timeout):
+    """
+    Suma `valor` a un contador con cache.incr, atómico en Redis y locmem,
+    y retorna el nuevo valor.
+    """
+    try:
+        return cache.incr(clave, valor)
+    except ValueError:
+        cache.add(clave, 0, timeout)
+        return cache.incr(clave, valor)
+
+
+def _agregar_endpoint(endpoint, timeout):
+    """
+    Agrega el endpoint al índice: cada uno ocupa una clave numerada, así
+    que dos endpoints nuevos concurrentes no se pisan.
+    """
+    cache.set(CLAVE_ENDPOINT.format(_sumar(CLAVE_CANTIDAD_ENDPOINTS, 1, timeout)), endpoint, timeout)
+
+
+def _endpoints():
+    cantidad = cache.get(CLAVE_CANTIDAD_ENDPOINTS) or 0
+    claves = [CLAVE_ENDPOINT.format(indice) for indice in range(1, cantidad + 1)]
+    return sorted(set(cache.get_many(claves).values()))
+
+
+def registrar_estadisticas(endpoint, registro, presupuesto=None):
+    """
+    Acumula las métricas de una request en la cache. Los contadores se
+    suman con cache.incr; los máximos y las consultas lentas se actualizan
+    sin atomicidad y solo si cambian, lo que basta para diagnosticar.
+    """
+    timeout = settings.SQL_ESTADISTICAS_TIMEOUT
+    tiempo_us = round(registro.tiempo * 1_000_000)
+    excedida = presupuesto is not None and registro.consultas > presupuesto
+    # Solo la primera request del endpoint (o tras expirar) lo agrega al índice
+    if _sumar(_clave(endpoint, 'peticiones'), 1, timeout) == 1:
+        _agregar_endpoint(endpoint, timeout)
+    for campo, valor in (('consultas', registro.consultas), ('tiempo_us', tiempo_us), ('excedidas', int(excedida))):
+        if valor:
+            _sumar(_clave(endpoint, campo), valor, timeout)
+
+    clave = _clave(endpoint, 'detalle')
+    detalle = cache.get(clave) or DETALLE_VACIO
+    lentas = sorted(detalle['lentas'] + registro.lentas, key=lambda consulta: consulta['ms'], reverse=True)
+    nuevo = {
+        'max_consultas': max(detalle['max_consultas'], registro.consultas),
+        'max_tiempo_us': max(detalle['max_tiempo_us'], tiempo_us),
+        'presupuesto': presupuesto,
+        'lentas': lentas[:registro.cantidad_lentas],
+    }
+    if nuevo != detalle:
+        cache.set(clave, nuevo, timeout)
+
+
+def estadisticas_consultas():
+    """
+    Estadísticas acumuladas por endpoint, de mayor a menor promedio de
+    consultas. Con muestreo, `peticiones` cuenta solo las muestreadas.
+    """
+    endpoints = _endpoints()
+    valores = cache.get_many([_clave(endpoint, campo) for endpoint in endpoints for campo in CAMPOS])
+    data = []
+    for endpoint in endpoints:
+        peticiones = valores.get(_clave(endpoint, 'peticiones'))
+        if not peticiones:
+            continue
+        consultas = valores.get(_clave(endpoint, 'consultas'), 0)
+        tiempo_ms = valores.get(_clave(endpoint, 'tiempo_us'), 0) / 1000
+        detalle = valores.get(_clave(endpoint, 'detalle')) or DETALLE_VACIO
+        data.append({
+            'endpoint': endpoint,
+            'peticiones': peticiones,
+            'consultas': consultas,
+            'max_consultas': detalle['max_consultas'],
+            'tiempo_ms': round(tiempo_ms, 3),
+            'max_tiempo_ms': round(detalle['max_tiempo_us'] / 1000, 3),
+            'excedidas': valores.get(_clave(endpoint, 'excedidas'), 0),
+            'lentas': detalle['lentas'],
+            'presupuesto': detalle['presupuesto'],
+            'promedio_consultas': round(consultas / peticiones, 2),
+            'promedio_tiempo_ms': round(tiempo_ms / peticiones, 3),
+        })
+    return sorted(data, key=lambda fila: fila['promedio_consultas'], reverse=True)
+
+
+def reiniciar_estadisticas():
+    cantidad = cache.get(CLAVE_CANTIDAD_ENDPOINTS) or 0
+    cache.delete_many(
+        [_clave(endpoint, campo) for endpoint in _endpoints() for campo in CAMPOS]
+        + [CLAVE_ENDPOINT.format(indice) for indice in range(1, cantidad + 1)]
+        + [CLAVE_CANTIDAD_ENDPOINTS]
+    )
+
+
+def _agregar_wrapper(registro):
+    connection.execute_wrappers.append(registro)
+
+
+def _quitar_wrapper(registro):
+    connection.execute_wrappers.remove(registro)
+
+
+def _vista(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.func if resolver_match is not None else None
+
+
+class InstrumentacionSQLMiddleware:
+    """
+    Registra cantidad de consultas, tiempo total de SQL y las consultas más
+    lentas de cada vista y acción, para una fracción
+    SQL_ESTADISTICAS_MUESTREO de las requests. Si la vista declara un
+    presupuesto y se excede, en una request de lectura lanza
+    PresupuestoConsultasExcedido cuando SQL_PRESUPUESTO_ESTRICTO está activo
+    (tests); en el resto deja un warning, porque una escritura ya está
+    confirmada cuando se conoce el total y un 500 haría reintentarla.
+
+    Con ASGI funciona en modo async para no sacar a las vistas async del
+    event loop. Las consultas de una request async corren en el hilo
+    sincrónico de esa request, así que el wrapper se instala y se quita
+    desde ese hilo. La vista se toma de request.resolver_match y no de
+    process_view, que Django adaptaría con un salto de hilo más.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTACION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        registro = RegistroConsultas(settings.SQL_CONSULTAS_LENTAS)
+        with connection.execute_wrapper(registro):
+            response = self.get_response(request)
+        return self.registrar(request, registro, response)
+
+    async def __acall__(self, request):
+        registro = RegistroConsultas(settings.SQL_CONSULTAS_LENTAS)
+        await sync_to_async(_agregar_wrapper)(registro)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            await sync_to_async(_quitar_wrapper)(registro)
+            raise
+        return await sync_to_async(self.terminar)(request, registro, response)
+
+    def terminar(self, request, registro, response):
+        _quitar_wrapper(registro)
+        return self.registrar(request, registro, response)
+
+    def registrar(self, request, registro, response):
+        vista = _vista(request)
+        if vista is None:
+            return response
+        endpoint, presupuesto = describir_vista(vista, request)
+        if random.random() < settings.SQL_ESTADISTICAS_MUESTREO:
+            registrar_estadisticas(endpoint, registro, presupuesto)
+        if presupuesto is not None and registro.consultas > presupuesto:
+            mensaje = (
+                f"{endpoint} ejecutó {registro.consultas} consultas "
+                f"(presupuesto {presupuesto}): {request.method} {request.path}"
+            )
+            if settings.SQL_PRESUPUESTO_ESTRICTO and request.method in SAFE_METHODS:
+                raise PresupuestoConsultasExcedido(mensaje)
+            logger.warning(mensaje)
+        return response
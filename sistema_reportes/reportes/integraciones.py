@@ -0,0 +1,162 @@
+import codecs
+import json
+import logging
+import queue
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_sesiones = {}
+
+
+def obtener_sesion(fuente):
+    """
+    Retorna una sesión HTTP por fuente, reutilizada entre llamadas.
+
+    La sesión mantiene un pool de conexiones (keep-alive) y reintenta con
+    backoff exponencial ante errores de conexión y respuestas 429/5xx.
+    """
+    sesion = _sesiones.get(fuente)
+    if sesion is None:
+        reintentos = Retry(
+            total=settings.INTEGRACION_REINTENTOS,
+            backoff_factor=settings.INTEGRACION_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(max_retries=reintentos, pool_connections=4, pool_maxsize=4)
+        sesion = requests.Session()
+        sesion.mount('http://', adaptador)
+        sesion.mount('https://', adaptador)
+        _sesiones[fuente] = sesion
+    return sesion
+
+
+def iterar_respuesta(fuente, url, **kwargs):
+    """
+    Hace un GET en modo stream y entrega los elementos del arreglo JSON de
+    la respuesta a medida que se reciben. Levanta ValueError si la
+    respuesta no es 200 o no es un arreglo.
+    """
+    kwargs.setdefault('timeout', settings.INTEGRACION_TIMEOUT)
+    with obtener_sesion(fuente.lower()).get(url, stream=True, **kwargs) as response:
+        if response.status_code != 200:
+            raise ValueError(f"Error al obtener datos de {fuente}: {response.status_code}")
+        yield from iterar_json_array(response.iter_content(chunk_size=settings.INTEGRACION_TAMANO_CHUNK))
+
+
+def iterar_json_array(chunks):
+    """
+    Recorre un arreglo JSON que llega en trozos de bytes y entrega cada
+    elemento apenas está completo, sin cargar el cuerpo entero en memoria.
+    """
+    decodificador = json.JSONDecoder()
+    texto = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    fin_stream = False
+    inicio_arreglo = False
+
+    def leer():
+        nonlocal buffer, fin_stream
+        chunk = next(chunks, None)
+        if chunk is None:
+            buffer += texto.decode(b'', final=True)
+            fin_stream = True
+        else:
+            buffer += texto.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+    pos = 0
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (inicio_arreglo and buffer[pos] == ',')):
+            pos += 1
+        if pos == len(buffer):
+            if fin_stream:
+                raise ValueError("JSON incompleto" if inicio_arreglo else "Los datos deben ser una lista")
+            buffer, pos = buffer[pos:], 0
+            leer()
+            continue
+
+        if not inicio_arreglo:
+            if buffer[pos] != '[':
+                raise ValueError("Los datos deben ser una lista")
+            inicio_arreglo = True
+            pos += 1
+            continue
+        if buffer[pos] == ']':
+            return
+
+        try:
+            elemento, fin = decodificador.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            fin = None
+        if fin is None or (fin == len(buffer) and not fin_stream):
+            # Elemento incompleto: se necesitan más datos
+            if fin_stream:
+                raise ValueError(f"JSON inválido cerca de la posición {pos}")
+            buffer, pos = buffer[pos:], 0
+            leer()
+            continue
+        yield elemento
+        pos = fin
+
+
+def _producir(nombre, iterable, tamano_lote, cola, detener):
+    try:
+        lote = []
+        for registro in iterable:
+            if detener.is_set():
+                return
+            lote.append(registro)
+            if len(lote) >= tamano_lote:
+                cola.put((nombre, lote, None))
+                lote = []
+        if lote:
+            cola.put((nombre, lote, None))
+    except Exception as e:
+        cola.put((nombre, None, e))
+    finally:
+        cola.put((nombre, None, None))
+
+
+def iterar_lotes_concurrentes(fuentes, tamano_lote, max_lotes_en_cola=4):
+    """
+    Descarga varias fuentes en paralelo y entrega (fuente, lote, error) en
+    el hilo que llama, a medida que llegan.
+
+    `fuentes` asocia un nombre con una función que retorna un iterable de
+    registros. La cola es acotada, así que la memoria usada no depende del
+    tamaño de las respuestas, y la escritura en la base de datos queda en
+    el hilo que consume.
+    """
+    cola = queue.Queue(maxsize=max_lotes_en_cola)
+    detener = threading.Event()
+    hilos = [
+        threading.Thread(target=_producir, args=(nombre, obtener(), tamano_lote, cola, detener), daemon=True)
+        for nombre, obtener in fuentes.items()
+    ]
+    for hilo in hilos:
+        hilo.start()
+
+    pendientes = len(hilos)
+    try:
+        while pendientes:
+            nombre, lote, error = cola.get()
+            if lote is None and error is None:
+                pendientes -= 1
+                continue
+            yield nombre, lote, error
+    finally:
+        detener.set()
+        # Libera a los productores que puedan estar bloqueados en put()
+        while any(hilo.is_alive() for hilo in hilos):
+            try:
+                cola.get(timeout=0.1)
+            except queue.Empty:
+                pass
@@ -0,0 +1,101 @@
+import datetime
+
+from django.core.files.storage import default_storage
+from django.db.models import Case, CharField, F, Value, When
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .referencias import nombres_organismo_por_id
+
+
+def nombre_opcion(campo, opciones):
+    """
+    Equivalente SQL de get_FOO_display(): traduce el código a su etiqueta
+    con CASE/WHEN dentro de la misma consulta.
+    """
+    return Case(
+        *[When(**{campo: valor}, then=Value(str(etiqueta))) for valor, etiqueta in opciones],
+        default=F(campo),
+        output_field=CharField(),
+    )
+
+
+def valores_lista(queryset, campos):
+    """
+    Aplica .values() con los campos de salida. `campos` mapea la clave de
+    salida a una ruta ORM o a una expresión; las claves que coinciden con su
+    ruta se piden tal cual.
+    """
+    simples = [clave for clave, ruta in campos.items() if ruta == clave]
+    expresiones = {
+        clave: F(ruta) if isinstance(ruta, str) else ruta
+        for clave, ruta in campos.items() if ruta != clave
+    }
+    return queryset.prefetch_related(None).values(*simples, **expresiones)
+
+
+def _fecha_hora(valor):
+    """
+    Mismo formato que DateTimeField de DRF: hora local en ISO 8601.
+    """
+    if not isinstance(valor, datetime.datetime):
+        return valor
+    valor = timezone.localtime(valor).isoformat()
+    if valor.endswith('+00:00'):
+        valor = valor[:-6] + 'Z'
+    return valor
+
+
+def formatear_filas(filas, fechas_hora=(), archivos=(), request=None, organismos=None):
+    """
+    Ajusta en cada fila los valores que el serializer no entrega tal cual
+    (fechas con hora y URLs de archivos). `organismos` mapea una clave de
+    salida a la columna con el id del organismo; el nombre se toma de la
+    cache de referencias y la columna del id se quita de la fila.
+    """
+    if not fechas_hora and not archivos and not organismos:
+        return filas
+    nombres = nombres_organismo_por_id() if organismos else None
+    for fila in filas:
+        for clave, columna in (organismos or {}).items():
+            fila[clave] = nombres.get(fila.pop(columna))
+        for campo in fechas_hora:
+            fila[campo] = _fecha_hora(fila[campo])
+        for campo in archivos:
+            nombre = fila[campo]
+            if not nombre:
+                fila[campo] = None
+            else:
+                url = default_storage.url(nombre)
+                fila[campo] = request.build_absolute_uri(url) if request is not None else url
+    return filas
+
+
+class ListaValoresMixin:
+    """
+    Modo de solo lectura para `list`: lee exactamente las columnas de
+    `campos_lista` con .values() y entrega dicts, sin instanciar modelos ni
+    pasar por los campos del serializer. Create, update y retrieve siguen
+    usando el serializer del ViewSet. A diferencia del serializer, una
+    relación nula entrega la clave con null en vez de omitirla. Los nombres
+    de organismo (`campos_lista_organismo`) se resuelven sin JOIN.
+    """
+    campos_lista = None
+    campos_lista_fecha_hora = ()
+    campos_lista_archivo = ()
+    campos_lista_organismo = {}
+
+    def list(self, request, *args, **kwargs):
+        if not self.campos_lista:
+            return super().list(request, *args, **kwargs)
+        campos = {**self.campos_lista, **{columna: columna for columna in self.campos_lista_organismo.values()}}
+        filas = valores_lista(self.filter_queryset(self.get_queryset()), campos)
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(self._formatear(page, request))
+        return Response(self._formatear(list(filas), request))
+
+    def _formatear(self, filas, request):
+        return formatear_filas(
+            filas, self.campos_lista_fecha_hora, self.campos_lista_archivo, request, self.campos_lista_organismo
+        )
@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reportes.auditoria import auditar_consultas
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta EXPLAIN sobre los listados de cada ViewSet y marca los Seq Scan sobre tablas grandes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Usa EXPLAIN ANALYZE (ejecuta las consultas)')
+        parser.add_argument(
+            '--min-filas', type=int, default=1000, help='Filas desde las que un Seq Scan se considera un problema'
+        )
+        parser.add_argument('--json', action='store_true', help='Imprime los resultados en JSON')
+        parser.add_argument('--estricto', action='store_true', help='Termina con error si hay Seq Scan marcados')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('La auditoría de índices requiere PostgreSQL')
+
+        resultados = auditar_consultas(analizar=options['analyze'], min_filas=options['min_filas'])
+        marcados = [r for r in resultados if any(scan['marcado'] for scan in r['seq_scans'])]
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+        else:
+            for resultado in resultados:
+                parametros = '&'.join(f'{k}={v}' for k, v in resultado['parametros'].items()) or '-'
+                tiempo = f", {resultado['ms']} ms" if resultado['ms'] is not None else ''
+                linea = f"{resultado['vista']:<28} {parametros:<28} costo={resultado['costo']}{tiempo}"
+                self.stdout.write(self.style.ERROR(linea) if resultado in marcados else linea)
+                for scan in resultado['seq_scans']:
+                    estilo = self.style.ERROR if scan['marcado'] else self.style.WARNING
+                    filtro = f" filtro: {scan['filtro']}" if scan['filtro'] else ''
+                    filas = scan['filas_tabla'] if scan['filas_tabla'] is not None else '?'
+                    self.stdout.write(estilo(f"    Seq Scan {scan['tabla']} (~{filas} filas){filtro}"))
+
+        if marcados and options['estricto']:
+            raise CommandError(f'{len(marcados)} consultas con Seq Scan sobre tablas grandes')
@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.benchmarks import (
+    ESCENARIOS, ESCENARIOS_CON_DATOS, ESCENARIOS_CONCURRENTES, comparar_resultados, metadatos
+)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los benchmarks de rendimiento de la API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'escenarios', nargs='*', help=f"Escenarios a ejecutar: {', '.join(ESCENARIOS)} (todos por defecto)"
+        )
+        parser.add_argument(
+            '--filas', type=int, default=5000,
+            help='Filas por payload; en endpoints, indicadores generados (avances y actividades en proporción)'
+        )
+        parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por medición (se usa la mediana)')
+        parser.add_argument(
+            '--clientes', type=int, default=20,
+            help=f"En {', '.join(ESCENARIOS_CONCURRENTES)}, requests simultáneas por endpoint"
+        )
+        parser.add_argument(
+            '--datos-existentes', action='store_true',
+            help=f"En {', '.join(ESCENARIOS_CON_DATOS)}, mide la base de datos actual en vez de generar datos"
+        )
+        parser.add_argument('--json', action='store_true', help='Imprime los resultados en JSON')
+        parser.add_argument('--salida', help='Guarda los resultados y el contexto de la ejecución en un archivo JSON')
+        parser.add_argument('--comparar', help='Archivo JSON de una ejecución anterior contra el que comparar')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.2, help='Aumento relativo de tiempo considerado regresión'
+        )
+        parser.add_argument('--estricto', action='store_true', help='Termina con error si hay regresiones')
+
+    def handle(self, *args, **options):
+        desconocidos = set(options['escenarios']) - set(ESCENARIOS)
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+        base = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    base = json.load(archivo)['resultados']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"No se pudo leer {options['comparar']}: {e}")
+
+        resultados = {}
+        for escenario in options['escenarios'] or ESCENARIOS:
+            parametros = {'repeticiones': options['repeticiones']}
+            if escenario in ESCENARIOS_CONCURRENTES:
+                parametros['clientes'] = options['clientes']
+            else:
+                parametros['filas'] = options['filas']
+            if escenario in ESCENARIOS_CON_DATOS:
+                parametros['generar'] = not options['datos_existentes']
+            resultados[escenario] = ESCENARIOS[escenario](**parametros)
+
+        if options['salida']:
+            ejecucion = {
+                'metadatos': metadatos(),
+                'parametros': {
+                    clave: options[clave] for clave in ('filas', 'repeticiones', 'clientes', 'datos_existentes')
+                },
+                'resultados': resultados,
+            }
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(ejecucion, archivo, indent=2, ensure_ascii=False)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+        else:
+            for escenario, filas in resultados.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(escenario))
+                for fila in filas:
+                    self.stdout.write('  ' + ', '.join(f'{clave}={valor}' for clave, valor in fila.items()))
+
+        if base is None:
+            return
+        regresiones = comparar_resultados(base, resultados, options['tolerancia'])
+        for regresion in regresiones:
+            self.stderr.write(self.style.ERROR(
+                f"Regresión en {regresion['escenario']} [{regresion['fila']}] {regresion['metrica']}: "
+                f"{regresion['base']} -> {regresion['actual']}"
+            ))
+        if not regresiones:
+            self.stderr.write(self.style.SUCCESS(f"Sin regresiones respecto de {options['comparar']}"))
+        elif options['estricto']:
+            raise CommandError(f'{len(regresiones)} regresiones respecto de {options["comparar"]}')
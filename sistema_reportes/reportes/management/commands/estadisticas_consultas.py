@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from reportes.instrumentacion import estadisticas_consultas, reiniciar_estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Muestra las estadísticas de SQL por endpoint registradas por InstrumentacionSQLMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Imprime las estadísticas en JSON')
+        parser.add_argument('--lentas', action='store_true', help='Incluye las consultas más lentas')
+        parser.add_argument('--reiniciar', action='store_true', help='Borra las estadísticas acumuladas')
+
+    def handle(self, *args, **options):
+        if options['reiniciar']:
+            reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('Estadísticas reiniciadas'))
+            return
+
+        estadisticas = estadisticas_consultas()
+        if options['json']:
+            self.stdout.write(json.dumps(estadisticas, indent=2, ensure_ascii=False))
+            return
+        if not estadisticas:
+            self.stdout.write(self.style.WARNING('No hay estadísticas registradas'))
+            return
+
+        self.stdout.write(
+            f"{'Endpoint':<45} {'Peticiones':>10} {'Prom. SQL':>10} {'Máx. SQL':>9} "
+            f"{'Prom. ms':>10} {'Presup.':>8} {'Excedidas':>10}"
+        )
+        for fila in estadisticas:
+            linea = (
+                f"{fila['endpoint']:<45} {fila['peticiones']:>10} {fila['promedio_consultas']:>10} "
+                f"{fila['max_consultas']:>9} {fila['promedio_tiempo_ms']:>10} "
+                f"{fila['presupuesto'] if fila['presupuesto'] is not None else '-':>8} {fila['excedidas']:>10}"
+            )
+            self.stdout.write(self.style.ERROR(linea) if fila['excedidas'] else linea)
+            if options['lentas']:
+                for consulta in fila['lentas']:
+                    self.stdout.write(f"    {consulta['ms']:>9} ms  {consulta['sql']}")
@@ -0,0 +1,106 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from reportes.consolidado import generar_reporte_consolidado
+from reportes.datos_sinteticos import (
+    TAMANO_LOTE, VOLUMENES_PRODUCCION, analizar_tablas, copy_disponible, generar_datos, limpiar_datos
+)
+from reportes.models import MedidaAvance, OrganismoSectorial, PerfilUsuario
+
+
+class Command(BaseCommand):
+    help = 'Carga datos de prueba realistas y escalables en todos los modelos de reportes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--indicadores', type=int, default=100_000, help='Lecturas de indicadores a generar')
+        parser.add_argument('--avances', type=int, default=10_000, help='Avances de medidas (una medida cada 10)')
+        parser.add_argument('--actividades', type=int, default=5_000, help='Actividades a generar')
+        parser.add_argument('--ppdas', type=int, default=12, help='Planes PPDA a generar')
+        parser.add_argument(
+            '--produccion', action='store_true',
+            help=f"Usa los volúmenes de producción ({', '.join(f'{v:,} {k}' for k, v in VOLUMENES_PRODUCCION.items())})"
+        )
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por lote de carga')
+        parser.add_argument('--semilla', type=int, default=0, help='Semilla del generador (mismos datos)')
+        parser.add_argument('--limpiar', action='store_true', help='Vacía las tablas de reportes antes de cargar')
+        parser.add_argument('--sin-copy', action='store_true', help='Carga con bulk_create en vez de COPY')
+        parser.add_argument(
+            '--password', help='Contraseña de los usuarios de prueba; sin ella quedan sin contraseña utilizable'
+        )
+        parser.add_argument(
+            '--sin-consolidados', action='store_true', help='No genera los reportes consolidados del último año'
+        )
+
+    def handle(self, *args, **options):
+        volumenes = {clave: options[clave] for clave in ('indicadores', 'avances', 'actividades')}
+        if options['produccion']:
+            volumenes = dict(VOLUMENES_PRODUCCION)
+        if any(cantidad < 0 for cantidad in volumenes.values()) or options['ppdas'] < 1 or options['lote'] < 1:
+            raise CommandError('Las cantidades deben ser positivas y se necesita al menos un PPDA')
+        usar_copy = copy_disponible() and not options['sin_copy']
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            if options['limpiar']:
+                limpiar_datos()
+            creados = generar_datos(
+                **volumenes, ppdas=options['ppdas'], tamano_lote=options['lote'], semilla=options['semilla'],
+                usar_copy=usar_copy
+            )
+            creados['usuarios'] = self.crear_usuarios(options['password'])
+            if not options['sin_consolidados']:
+                creados['reportes_consolidados'] = self.generar_consolidados()
+        analizar_tablas()
+
+        for tabla, cantidad in creados.items():
+            self.stdout.write(f'  {tabla:<22} {cantidad:>10,}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos cargados con {'COPY' if usar_copy else 'bulk_create'} en {time.perf_counter() - inicio:.1f} s"
+        ))
+
+    def crear_usuarios(self, password):
+        """
+        Un administrador, un auditor y un usuario por organismo (con el
+        organismo en su perfil). Los que ya existen no se modifican.
+        """
+        usuarios = [('admin_seed', 'admin', None), ('auditor_seed', 'auditor', None)] + [
+            (f'usuario_{nombre.lower()}', 'user', organismo_id)
+            for organismo_id, nombre in OrganismoSectorial.objects.order_by('id').values_list('id', 'nombre')
+        ]
+        creados = 0
+        for username, grupo, organismo_id in usuarios:
+            user, creado = User.objects.get_or_create(username=username, defaults={'email': f'{username}@example.cl'})
+            if not creado:
+                continue
+            if password:
+                user.set_password(password)
+            else:
+                user.set_unusable_password()
+            user.save()
+            user.groups.add(Group.objects.get_or_create(name=grupo)[0])
+            PerfilUsuario.objects.filter(user=user).update(rol=grupo, organismo_id=organismo_id)
+            creados += 1
+        return creados
+
+    def generar_consolidados(self):
+        """
+        Reporte consolidado del último año completo de cada organismo con
+        avances en ese año, con el mismo generador que usa la API.
+        """
+        anio = timezone.localdate().year - 1
+        organismos = (
+            MedidaAvance.objects.filter(fecha_limite__year=anio)
+            .values_list('medida__organismo_responsable_id', flat=True).distinct().order_by()
+        )
+        generados = 0
+        for organismo_id in organismos:
+            generar_reporte_consolidado(organismo_id, anio)
+            generados += 1
+        if generados:
+            self.stdout.write(f'Reportes consolidados {anio} guardados en {settings.MEDIA_ROOT}')
+        return generados
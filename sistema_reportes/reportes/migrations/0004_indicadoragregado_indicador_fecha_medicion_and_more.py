@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:37
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def copiar_fecha_registro(apps, schema_editor):
+    # Las lecturas existentes solo tienen la fecha de registro
+    Indicador = apps.get_model('reportes', 'Indicador')
+    Indicador.objects.update(fecha_medicion=models.F('fecha_registro'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0003_organismosectorial_fecha_actualizacion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicadorAgregado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolucion', models.CharField(choices=[('hora', 'Hora'), ('dia', 'Día'), ('mes', 'Mes')], max_length=4)),
+                ('periodo', models.DateTimeField()),
+                ('nombre', models.CharField(max_length=255)),
+                ('unidad', models.CharField(blank=True, max_length=50)),
+                ('promedio', models.FloatField()),
+                ('minimo', models.FloatField()),
+                ('maximo', models.FloatField()),
+                ('cantidad', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='indicador',
+            name='fecha_medicion',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copiar_fecha_registro, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='indicador',
+            index=models.Index(fields=['nombre', 'fecha_medicion'], name='reportes_in_nombre_ff2038_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicador',
+            index=models.Index(fields=['organismo_sectorial', 'fecha_medicion'], name='reportes_in_organis_f925ac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicador',
+            index=models.Index(fields=['ppda', 'fecha_medicion'], name='reportes_in_ppda_id_78ff86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicador',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['fecha_medicion'], name='indicador_medicion_brin'),
+        ),
+        migrations.AddField(
+            model_name='indicadoragregado',
+            name='organismo_sectorial',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reportes.organismosectorial'),
+        ),
+        migrations.AddField(
+            model_name='indicadoragregado',
+            name='ppda',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reportes.ppda'),
+        ),
+        migrations.AddIndex(
+            model_name='indicadoragregado',
+            index=models.Index(fields=['resolucion', 'nombre', 'periodo'], name='reportes_in_resoluc_922702_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicadoragregado',
+            index=models.Index(fields=['resolucion', 'periodo'], name='reportes_in_resoluc_198000_idx'),
+        ),
+    ]
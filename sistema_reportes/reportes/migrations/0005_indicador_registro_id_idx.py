@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0004_indicadoragregado_indicador_fecha_medicion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='indicador',
+            index=models.Index(fields=['-fecha_registro', '-id'], name='indicador_registro_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0005_indicador_registro_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indicador',
+            name='fuente',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
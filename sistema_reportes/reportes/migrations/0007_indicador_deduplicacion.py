@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0006_indicador_fuente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoIntegracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fuente', models.CharField(max_length=20, unique=True)),
+                ('ultima_medicion', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='indicador',
+            name='clave_deduplicacion',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='indicador',
+            name='estacion',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:43
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0007_indicador_deduplicacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionSincronizacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fuente', models.CharField(max_length=20)),
+                ('estado', models.CharField(choices=[('en_curso', 'En curso'), ('exitosa', 'Exitosa'), ('fallida', 'Fallida'), ('omitida', 'Omitida')], default='en_curso', max_length=10)),
+                ('inicio', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fin', models.DateTimeField(blank=True, null=True)),
+                ('duracion', models.FloatField(blank=True, help_text='Segundos', null=True)),
+                ('cursor', models.DateTimeField(blank=True, help_text='Marca de agua usada para pedir datos', null=True)),
+                ('filas_obtenidas', models.PositiveIntegerField(default=0)),
+                ('filas_insertadas', models.PositiveIntegerField(default=0)),
+                ('filas_actualizadas', models.PositiveIntegerField(default=0)),
+                ('filas_rechazadas', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fuente', '-inicio'], name='reportes_ej_fuente_6f52f4_idx')],
+            },
+        ),
+    ]
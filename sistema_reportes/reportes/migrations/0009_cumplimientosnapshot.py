@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0008_ejecucionsincronizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medida',
+            name='ppda',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='reportes.ppda'),
+        ),
+        migrations.CreateModel(
+            name='CumplimientoSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('avance_promedio', models.FloatField(blank=True, null=True)),
+                ('total_avances', models.PositiveIntegerField(default=0)),
+                ('pendientes', models.PositiveIntegerField(default=0)),
+                ('en_progreso', models.PositiveIntegerField(default=0)),
+                ('completados', models.PositiveIntegerField(default=0)),
+                ('retrasados', models.PositiveIntegerField(default=0)),
+                ('vencidos', models.PositiveIntegerField(default=0, help_text='Avances no completados con fecha límite pasada')),
+                ('cumplimiento_promedio', models.FloatField(blank=True, null=True)),
+                ('total_reportes', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('organismo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reportes.organismosectorial')),
+                ('ppda', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reportes.ppda')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organismo', 'anio'], name='reportes_cu_organis_7b60f1_idx'), models.Index(fields=['anio'], name='reportes_cu_anio_97b911_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cumplimientosnapshot',
+            constraint=models.UniqueConstraint(condition=models.Q(('ppda__isnull', False)), fields=('ppda', 'organismo', 'anio'), name='snapshot_ppda_organismo_anio'),
+        ),
+        migrations.AddConstraint(
+            model_name='cumplimientosnapshot',
+            constraint=models.UniqueConstraint(condition=models.Q(('ppda__isnull', True)), fields=('organismo', 'anio'), name='snapshot_organismo_anio_sin_ppda'),
+        ),
+    ]
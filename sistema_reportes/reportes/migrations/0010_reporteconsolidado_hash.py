@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0009_cumplimientosnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporteconsolidado',
+            name='fecha_generacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reporteconsolidado',
+            name='hash_entradas',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 de los datos usados; si no cambia, el archivo se reutiliza', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='reporteconsolidado',
+            index=models.Index(fields=['organismo_responsable', 'ppda', 'periodo'], name='reportes_re_organis_b2fb72_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0010_reporteconsolidado_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='organismosectorial',
+            name='reportes_or_nombre_ca5e1c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='perfilusuario',
+            name='reportes_pe_rol_579c61_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ppda',
+            name='reportes_pp_nombre_77b573_idx',
+        ),
+        migrations.AlterField(
+            model_name='organismosectorial',
+            name='nombre',
+            field=models.CharField(choices=[('SEA', 'Servicio de Evaluación Ambiental'), ('SEC', 'Superintendencia de Electricidad y Combustible'), ('IRV', 'Intendencia Regional de Valparaíso'), ('DGTM', 'Dirección General del Territorio Marítimo y de Marina Mercante'), ('CONAF', 'Corporación Nacional Forestal'), ('SAG', 'Servicio Agrícola y Ganadero')], max_length=5, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='ppda',
+            name='fecha_inicio',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['-fecha_inicio'], name='actividad_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['organismo_responsable', '-fecha_inicio'], name='actividad_organismo_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertacritica',
+            index=models.Index(fields=['estado', '-fecha_alerta'], name='alerta_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertacritica',
+            index=models.Index(condition=models.Q(('estado', 'pendiente')), fields=['-fecha_alerta'], name='alerta_pendientes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medidaavance',
+            index=models.Index(fields=['-fecha_actualizacion'], name='avance_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medidaavance',
+            index=models.Index(fields=['estado', '-fecha_actualizacion'], name='avance_estado_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medidaavance',
+            index=models.Index(condition=models.Q(('estado', 'C'), _negated=True), fields=['fecha_limite'], name='avance_abiertos_limite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ppda',
+            index=models.Index(fields=['-fecha_creacion'], name='ppda_creacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporteanual',
+            index=models.Index(fields=['-periodo'], name='reporte_periodo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporteanual',
+            index=models.Index(fields=['organismo_responsable', '-periodo'], name='reporte_organismo_periodo_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Tabla → (columna, peso) que alimentan el vector de búsqueda. Copia congelada
+# de reportes.busqueda.CAMPOS_BUSQUEDA al momento de esta migración.
+CAMPOS = {
+    'reportes_ppda': [('nombre', 'A'), ('descripcion', 'B')],
+    'reportes_medida': [('nombre', 'A'), ('descripcion', 'B')],
+    'reportes_medidaavance': [('descripcion', 'A'), ('observaciones', 'B')],
+    'reportes_actividad': [('nombre', 'A'), ('descripcion', 'B')],
+}
+
+
+def _vector(campos, prefijo=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('pg_catalog.spanish', coalesce({prefijo}{columna}, '')), '{peso}')"
+        for columna, peso in campos
+    )
+
+
+def _crear_trigger(tabla, campos):
+    columnas = ', '.join(columna for columna, _ in campos)
+    return f"""
+        CREATE FUNCTION {tabla}_busqueda() RETURNS trigger AS $$
+        BEGIN
+            NEW.busqueda := {_vector(campos, 'NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        CREATE TRIGGER {tabla}_busqueda BEFORE INSERT OR UPDATE OF {columnas} ON {tabla}
+            FOR EACH ROW EXECUTE FUNCTION {tabla}_busqueda();
+        UPDATE {tabla} SET busqueda = {_vector(campos)};
+    """
+
+
+def _eliminar_trigger(tabla):
+    return f"""
+        DROP TRIGGER IF EXISTS {tabla}_busqueda ON {tabla};
+        DROP FUNCTION IF EXISTS {tabla}_busqueda();
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0011_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actividad',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='medida',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='medidaavance',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ppda',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='actividad_busqueda_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='medida',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='medida_busqueda_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='medidaavance',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='avance_busqueda_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='ppda',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='ppda_busqueda_gin'),
+        ),
+    ] + [
+        migrations.RunSQL(_crear_trigger(tabla, campos), _eliminar_trigger(tabla))
+        for tabla, campos in CAMPOS.items()
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0012_busqueda_texto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertacritica',
+            name='clave_deduplicacion',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='alertacritica',
+            name='estacion',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='alertacritica',
+            name='fecha_medicion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertacritica',
+            name='valor',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReglaAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Parámetro del indicador, ej: PM2.5', max_length=255)),
+                ('unidad', models.CharField(blank=True, help_text='Vacío aplica a cualquier unidad', max_length=50)),
+                ('umbral', models.FloatField(help_text='Se genera una alerta cuando el valor lo supera')),
+                ('ventana_horas', models.PositiveSmallIntegerField(blank=True, help_text='Si se indica, se compara el promedio móvil de esas horas', null=True)),
+                ('descripcion', models.CharField(blank=True, max_length=255)),
+                ('activa', models.BooleanField(default=True)),
+                ('ppda', models.ForeignKey(blank=True, help_text='Vacío aplica a lecturas de cualquier PPDA', null=True, on_delete=django.db.models.deletion.CASCADE, to='reportes.ppda')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='alertacritica',
+            name='regla',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='reportes.reglaalerta'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0014_perfil_organismo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='indicador',
+            name='ppda',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='indicadores', to='reportes.ppda'),
+        ),
+        migrations.AlterField(
+            model_name='medida',
+            name='ppda',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='medidas', to='reportes.ppda'),
+        ),
+    ]
@@ -1,4 +1,9 @@
+import hashlib
+from datetime import timezone as dt_timezone
+
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
@@ -8,14 +13,13 @@ from django.utils import timezone
 class PerfilUsuario(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='perfil')
     rol = models.CharField(max_length=50, db_index=True)
+    # Organismo cuyos datos ve el usuario; sin organismo ve todos (ver alcance.py)
+    organismo = models.ForeignKey(
+        'OrganismoSectorial', on_delete=models.SET_NULL, null=True, blank=True, related_name='perfiles'
+    )
     fecha_creacion = models.DateTimeField(default=timezone.now)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
-    class Meta:
-        indexes = [
-            models.Index(fields=['rol']),
-        ]
-
     def __str__(self):
         return f"{self.user.username} - {self.rol}"
 
@@ -36,17 +40,12 @@ class OrganismoSectorial(models.Model):
         ('CONAF', 'Corporación Nacional Forestal'),
         ('SAG', 'Servicio Agrícola y Ganadero'),
     ]
-    nombre = models.CharField(max_length=5, choices=TIPOS_ORGANISMO, unique=True, db_index=True)
+    nombre = models.CharField(max_length=5, choices=TIPOS_ORGANISMO, unique=True)  # unique ya crea el índice
     contacto = models.EmailField(null=True, blank=True)
     telefono = models.CharField(max_length=15, null=True, blank=True)
     fecha_creacion = models.DateTimeField(default=timezone.now)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
-    class Meta:
-        indexes = [
-            models.Index(fields=['nombre']),
-        ]
-
     def __str__(self):
         return self.get_nombre_display()
 
@@ -54,17 +53,20 @@ class OrganismoSectorial(models.Model):
 class PPDA(models.Model):
     nombre = models.CharField(max_length=200, db_index=True)
     descripcion = models.TextField(blank=True, default='')
-    fecha_inicio = models.DateField(db_index=True)
+    fecha_inicio = models.DateField()  # cubierto por el índice (fecha_inicio, fecha_termino)
     fecha_termino = models.DateField(db_index=True)
     organismo = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE, related_name='ppdas', null=True, blank=True)
     fecha_creacion = models.DateTimeField(default=timezone.now)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Vector de búsqueda (nombre y descripción); lo mantiene un trigger, ver busqueda.py
+    busqueda = SearchVectorField(null=True, editable=False)
 
     class Meta:
         indexes = [
-            models.Index(fields=['nombre']),
             models.Index(fields=['fecha_inicio', 'fecha_termino']),
+            models.Index(fields=['-fecha_creacion'], name='ppda_creacion_idx'),
+            GinIndex(fields=['busqueda'], name='ppda_busqueda_gin'),
         ]
 
     def clean(self):
@@ -93,6 +95,13 @@ class Medida(models.Model):
     fecha_termino = models.DateField()
     prioridad = models.CharField(max_length=10, choices=PRIORIDADES, default='media')
     organismo_responsable = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
+    ppda = models.ForeignKey(PPDA, on_delete=models.SET_NULL, null=True, blank=True, related_name='medidas')
+    busqueda = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['busqueda'], name='medida_busqueda_gin'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_display()})"
@@ -115,6 +124,7 @@ class MedidaAvance(models.Model):
     estado = models.CharField(max_length=1, choices=ESTADOS, default='P')
     observaciones = models.TextField(blank=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
+    busqueda = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return f"{self.medida.nombre} - {self.descripcion[:50]}"
@@ -122,6 +132,14 @@ class MedidaAvance(models.Model):
     class Meta:
         verbose_name = 'Medida de Avance'
         verbose_name_plural = 'Medidas de Avance'
+        indexes = [
+            # Orden por defecto del listado, con y sin filtro por estado
+            models.Index(fields=['-fecha_actualizacion'], name='avance_actualizacion_idx'),
+            models.Index(fields=['estado', '-fecha_actualizacion'], name='avance_estado_act_idx'),
+            # Avances abiertos por fecha límite (vencidos del cumplimiento)
+            models.Index(fields=['fecha_limite'], condition=~models.Q(estado='C'), name='avance_abiertos_limite_idx'),
+            GinIndex(fields=['busqueda'], name='avance_busqueda_gin'),
+        ]
 
 # Modelo Indicador
 class Indicador(models.Model):
@@ -130,13 +148,113 @@ class Indicador(models.Model):
     valor = models.FloatField()
     unidad = models.CharField(max_length=50, blank=True)  # Ejemplo: "µg/m³"
     fecha_registro = models.DateField(auto_now_add=True)
+    fecha_medicion = models.DateTimeField(default=timezone.now)  # Momento de la lectura
+    fuente = models.CharField(max_length=20, blank=True, default='')  # Ejemplo: "SNIFA", "Airecoo"
+    estacion = models.CharField(max_length=100, blank=True, default='')
+    # Identifica una lectura de una fuente externa; nulo en los ingresos manuales
+    clave_deduplicacion = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     organismo_sectorial = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
-    ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True)
+    ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True, related_name='indicadores')
     medio_verificacion = models.FileField(upload_to='medios_verificacion/', null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_registro', '-id'], name='indicador_registro_id_idx'),
+            models.Index(fields=['nombre', 'fecha_medicion']),
+            models.Index(fields=['organismo_sectorial', 'fecha_medicion']),
+            models.Index(fields=['ppda', 'fecha_medicion']),
+            BrinIndex(fields=['fecha_medicion'], name='indicador_medicion_brin'),
+        ]
+
     def __str__(self):
         return f"{self.nombre} - {self.valor} {self.unidad}"
 
+    def calcular_clave_deduplicacion(self):
+        fecha = self.fecha_medicion.astimezone(dt_timezone.utc).isoformat()
+        partes = [self.fuente, self.nombre, self.estacion, str(self.organismo_sectorial_id), fecha]
+        return hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+# Modelo EstadoIntegracion (marca de agua por fuente externa)
+class EstadoIntegracion(models.Model):
+    fuente = models.CharField(max_length=20, unique=True)
+    ultima_medicion = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.fuente} - {self.ultima_medicion}"
+
+# Modelo EjecucionSincronizacion (una fila por corrida de integración)
+class EjecucionSincronizacion(models.Model):
+    ESTADOS = [
+        ('en_curso', 'En curso'),
+        ('exitosa', 'Exitosa'),
+        ('fallida', 'Fallida'),
+        ('omitida', 'Omitida'),
+    ]
+    fuente = models.CharField(max_length=20)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='en_curso')
+    inicio = models.DateTimeField(default=timezone.now)
+    fin = models.DateTimeField(null=True, blank=True)
+    duracion = models.FloatField(null=True, blank=True, help_text="Segundos")
+    cursor = models.DateTimeField(null=True, blank=True, help_text="Marca de agua usada para pedir datos")
+    filas_obtenidas = models.PositiveIntegerField(default=0)
+    filas_insertadas = models.PositiveIntegerField(default=0)
+    filas_actualizadas = models.PositiveIntegerField(default=0)
+    filas_rechazadas = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fuente', '-inicio']),
+        ]
+
+    def __str__(self):
+        return f"{self.fuente} {self.inicio:%Y-%m-%d %H:%M} ({self.get_estado_display()})"
+
+# Modelo IndicadorAgregado (resúmenes por hora, día y mes de Indicador)
+class IndicadorAgregado(models.Model):
+    RESOLUCIONES = [
+        ('hora', 'Hora'),
+        ('dia', 'Día'),
+        ('mes', 'Mes'),
+    ]
+    resolucion = models.CharField(max_length=4, choices=RESOLUCIONES)
+    periodo = models.DateTimeField()
+    nombre = models.CharField(max_length=255)
+    unidad = models.CharField(max_length=50, blank=True)
+    organismo_sectorial = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
+    ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True)
+    promedio = models.FloatField()
+    minimo = models.FloatField()
+    maximo = models.FloatField()
+    cantidad = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resolucion', 'nombre', 'periodo']),
+            models.Index(fields=['resolucion', 'periodo']),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} {self.resolucion} {self.periodo}: {self.promedio}"
+
+# Modelo ReglaAlerta (umbral por parámetro, unidad y PPDA que genera alertas críticas)
+class ReglaAlerta(models.Model):
+    nombre = models.CharField(max_length=255, help_text="Parámetro del indicador, ej: PM2.5")
+    unidad = models.CharField(max_length=50, blank=True, help_text="Vacío aplica a cualquier unidad")
+    ppda = models.ForeignKey(
+        PPDA, on_delete=models.CASCADE, null=True, blank=True, help_text="Vacío aplica a lecturas de cualquier PPDA"
+    )
+    umbral = models.FloatField(help_text="Se genera una alerta cuando el valor lo supera")
+    ventana_horas = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Si se indica, se compara el promedio móvil de esas horas"
+    )
+    descripcion = models.CharField(max_length=255, blank=True)  # Ejemplo: "Preemergencia PM2.5"
+    activa = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.descripcion or f"{self.nombre} > {self.umbral} {self.unidad}"
+
 # Modelo AlertaCritica
 class AlertaCritica(models.Model):
     descripcion = models.TextField()
@@ -144,6 +262,22 @@ class AlertaCritica(models.Model):
     estado = models.CharField(max_length=50, choices=[('pendiente', 'Pendiente'), ('resuelta', 'Resuelta')])
     organismo_sectorial = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
     ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True)
+    # Origen de las alertas generadas por reglas; nulos en las creadas a mano
+    regla = models.ForeignKey(ReglaAlerta, on_delete=models.SET_NULL, null=True, blank=True)
+    estacion = models.CharField(max_length=100, blank=True, default='')
+    valor = models.FloatField(null=True, blank=True)
+    fecha_medicion = models.DateTimeField(null=True, blank=True)
+    # Una alerta por regla, serie y día; ver alertas.py
+    clave_deduplicacion = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', '-fecha_alerta'], name='alerta_estado_fecha_idx'),
+            # Bandeja de alertas pendientes: la fracción pequeña que se consulta siempre
+            models.Index(
+                fields=['-fecha_alerta'], condition=models.Q(estado='pendiente'), name='alerta_pendientes_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.descripcion
@@ -156,9 +290,52 @@ class ReporteAnual(models.Model):
     cumplimiento = models.FloatField(help_text="Porcentaje de cumplimiento")
     observaciones = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-periodo'], name='reporte_periodo_idx'),
+            models.Index(fields=['organismo_responsable', '-periodo'], name='reporte_organismo_periodo_idx'),
+        ]
+
     def __str__(self):
         return f"Reporte {self.periodo} - {self.organismo_responsable}"
 
+# Modelo CumplimientoSnapshot (cumplimiento precalculado por PPDA, organismo y año)
+class CumplimientoSnapshot(models.Model):
+    ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True)
+    organismo = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
+    anio = models.PositiveSmallIntegerField()
+    avance_promedio = models.FloatField(null=True, blank=True)
+    total_avances = models.PositiveIntegerField(default=0)
+    pendientes = models.PositiveIntegerField(default=0)
+    en_progreso = models.PositiveIntegerField(default=0)
+    completados = models.PositiveIntegerField(default=0)
+    retrasados = models.PositiveIntegerField(default=0)
+    vencidos = models.PositiveIntegerField(default=0, help_text="Avances no completados con fecha límite pasada")
+    cumplimiento_promedio = models.FloatField(null=True, blank=True)
+    total_reportes = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ppda', 'organismo', 'anio'],
+                condition=models.Q(ppda__isnull=False),
+                name='snapshot_ppda_organismo_anio'
+            ),
+            models.UniqueConstraint(
+                fields=['organismo', 'anio'],
+                condition=models.Q(ppda__isnull=True),
+                name='snapshot_organismo_anio_sin_ppda'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['organismo', 'anio']),
+            models.Index(fields=['anio']),
+        ]
+
+    def __str__(self):
+        return f"Cumplimiento {self.anio} - {self.organismo} - {self.ppda or 'Sin PPDA'}"
+
 # Modelo ReporteConsolidado
 class ReporteConsolidado(models.Model):
     organismo_responsable = models.ForeignKey(OrganismoSectorial, on_delete=models.CASCADE)
@@ -167,6 +344,16 @@ class ReporteConsolidado(models.Model):
     archivo_reporte = models.FileField(upload_to='reportes_anuales/')
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     ppda = models.ForeignKey(PPDA, on_delete=models.CASCADE, null=True, blank=True)
+    hash_entradas = models.CharField(
+        max_length=64, blank=True, default='',
+        help_text="SHA-256 de los datos usados; si no cambia, el archivo se reutiliza"
+    )
+    fecha_generacion = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organismo_responsable', 'ppda', 'periodo']),
+        ]
 
     def __str__(self):
         return f"Reporte Consolidado {self.periodo} - {self.organismo_responsable}"
@@ -178,6 +365,14 @@ class Actividad(models.Model):
     fecha_termino = models.DateField()
     medida = models.ForeignKey('Medida', on_delete=models.CASCADE, related_name='actividades')
     organismo_responsable = models.ForeignKey('OrganismoSectorial', on_delete=models.CASCADE)
+    busqueda = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_inicio'], name='actividad_inicio_idx'),
+            models.Index(fields=['organismo_responsable', '-fecha_inicio'], name='actividad_organismo_inicio_idx'),
+            GinIndex(fields=['busqueda'], name='actividad_busqueda_gin'),
+        ]
 
     def __str__(self):
         return self.nombre
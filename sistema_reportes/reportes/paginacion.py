@@ -0,0 +1,132 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, F, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class FilaMenor(Func):
+    """
+    Comparación de filas de PostgreSQL: (a, b) < (x, y). A diferencia de
+    (a < x) OR (a = x AND b < y), el planner la usa como condición del
+    índice sobre (a, b), así que no recorre y descarta las filas previas.
+    """
+    output_field = BooleanField()
+    conditional = True
+
+    def __init__(self, campos, valores):
+        super().__init__(*[F(campo) for campo in campos], *[Value(valor) for valor in valores])
+
+    def as_sql(self, compiler, connection):
+        partes, params = [], []
+        for expresion in self.get_source_expressions():
+            sql, parametros = compiler.compile(expresion)
+            partes.append(sql)
+            params.extend(parametros)
+        mitad = len(partes) // 2
+        return f"({', '.join(partes[:mitad])}) < ({', '.join(partes[mitad:])})", params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por keyset (seek) en orden descendente.
+
+    En vez de OFFSET y COUNT(*) se filtra por la última clave entregada,
+    de modo que una página profunda cuesta lo mismo que la primera. La
+    vista debe ordenar el queryset por `campos_cursor` en forma descendente.
+    """
+    campos_cursor = ('fecha_registro', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 20
+        if self.page_size_query_param in request.query_params:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.filtro_posterior(self.decodificar_cursor(cursor, queryset.model)))
+
+        resultados = list(queryset[:self.page_size + 1])
+        self.hay_siguiente = len(resultados) > self.page_size
+        resultados = resultados[:self.page_size]
+        self.ultimo = resultados[-1] if resultados else None
+        return resultados
+
+    def filtro_posterior(self, valores):
+        """
+        Filas posteriores al cursor en el orden descendente: (a, b) < (x, y).
+        """
+        return FilaMenor(self.campos_cursor, valores)
+
+    def valores_cursor(self, item):
+        if isinstance(item, dict):
+            return [item[campo] for campo in self.campos_cursor]
+        return [getattr(item, campo) for campo in self.campos_cursor]
+
+    def codificar_cursor(self, valores):
+        valores = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+    def decodificar_cursor(self, cursor, modelo):
+        """
+        Valores del cursor convertidos con el campo del modelo de cada clave.
+        Un cursor mal formado o con valores del tipo equivocado responde 404.
+        """
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, TypeError):
+            raise NotFound('Cursor inválido.')
+        if not isinstance(valores, list) or len(valores) != len(self.campos_cursor):
+            raise NotFound('Cursor inválido.')
+        return [self._parsear_valor(modelo, campo, v) for campo, v in zip(self.campos_cursor, valores)]
+
+    def _parsear_valor(self, modelo, campo, valor):
+        if valor is None or isinstance(valor, (bool, float, list, dict)):
+            raise NotFound('Cursor inválido.')
+        try:
+            return modelo._meta.get_field(campo).to_python(valor)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound('Cursor inválido.')
+
+    def get_next_link(self):
+        if not self.hay_siguiente or self.ultimo is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.codificar_cursor(self.valores_cursor(self.ultimo)))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+
+from .cache_respuestas import versiones_modelos
+from .models import OrganismoSectorial
+
+# Código de organismo → nombre para mostrar (equivalente a get_nombre_display)
+NOMBRES_ORGANISMO = dict(OrganismoSectorial.TIPOS_ORGANISMO)
+
+CLAVE_ORGANISMOS = 'referencias:organismos:{}'
+CLAVE_PERMISOS_USUARIO = 'referencias:permisos:{}:{}:{}'
+
+
+def _timeout():
+    return getattr(settings, 'REFERENCIAS_CACHE_TIMEOUT', 86400)
+
+
+def organismos():
+    """
+    Lista de organismos sectoriales ordenada por código, desde la cache.
+    La clave lleva la versión del modelo, que cambia con cada save/delete.
+    """
+    clave = CLAVE_ORGANISMOS.format(*versiones_modelos((OrganismoSectorial,)))
+    datos = cache.get(clave)
+    if datos is None:
+        datos = [
+            {**fila, 'nombre_display': NOMBRES_ORGANISMO.get(fila['nombre'], fila['nombre'])}
+            for fila in OrganismoSectorial.objects.order_by('nombre').values(
+                'id', 'nombre', 'contacto', 'telefono', 'fecha_actualizacion'
+            )
+        ]
+        cache.set(clave, datos, _timeout())
+    return datos
+
+
+def nombres_organismo_por_id():
+    """
+    Retorna {id: nombre para mostrar} de todos los organismos.
+    """
+    return {organismo['id']: organismo['nombre_display'] for organismo in organismos()}
+
+
+def permisos_de_usuario(user):
+    """
+    Permisos 'app.codename' del usuario (directos y por grupo) desde la
+    cache. La clave lleva las versiones de Group y Permission, que cambian
+    desde signals.py cuando se modifica una asignación.
+    """
+    clave = CLAVE_PERMISOS_USUARIO.format(user.pk, *versiones_modelos((Group, Permission)))
+    permisos = cache.get(clave)
+    if permisos is None:
+        permisos = frozenset(ModelBackend().get_all_permissions(user))
+        cache.set(clave, permisos, _timeout())
+    return permisos
+
+
+class PermisosCacheBackend(ModelBackend):
+    """
+    ModelBackend que resuelve has_perm con la cache de referencias en vez de
+    consultar permisos de usuario y de grupo en cada request.
+    """
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            if user_obj.is_superuser:
+                return super().get_all_permissions(user_obj)
+            user_obj._perm_cache = set(permisos_de_usuario(user_obj))
+        return user_obj._perm_cache
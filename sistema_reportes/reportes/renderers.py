@@ -0,0 +1,122 @@
+import datetime
+import re
+import uuid
+from decimal import Decimal
+from functools import lru_cache
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.render import CamelCaseBrowsableAPIRenderer
+from djangorestframework_camel_case.util import camelize_re, underscore_to_camel
+from rest_framework.renderers import BaseRenderer
+from rest_framework.serializers import ListSerializer
+
+
+@lru_cache(maxsize=4096)
+def camelizar_clave(clave):
+    """
+    Misma conversión que djangorestframework_camel_case, memorizada por clave.
+    """
+    if '_' not in clave:
+        return clave
+    return re.sub(camelize_re, underscore_to_camel, clave)
+
+
+# Mapa campo → clave camelCase por clase de serializer
+_MAPAS_CAMPOS = {}
+
+
+def mapa_campos(serializer):
+    """
+    Retorna {campo: claveCamelCase} de los campos legibles del serializer.
+    Se calcula una vez por clase.
+    """
+    cls = type(serializer)
+    mapa = _MAPAS_CAMPOS.get(cls)
+    if mapa is None:
+        mapa = {
+            campo.field_name: camelizar_clave(campo.field_name)
+            for campo in serializer.fields.values() if not campo.write_only
+        }
+        _MAPAS_CAMPOS[cls] = mapa
+    return mapa
+
+
+def _camelizar_fila(fila, mapa):
+    resultado = {}
+    for clave, valor in fila.items():
+        if isinstance(valor, (dict, list)):
+            valor = camelizar(valor)
+        resultado[mapa.get(clave) or camelizar_clave(clave)] = valor
+    return resultado
+
+
+def camelizar(data):
+    """
+    Convierte las claves a camelCase. Las listas producidas por un
+    ListSerializer se recorren con el mapa precalculado del serializer hijo
+    y solo se desciende en los valores que son dict o list.
+    """
+    serializer = getattr(data, 'serializer', None)
+    if isinstance(data, list):
+        if isinstance(serializer, ListSerializer):
+            mapa = mapa_campos(serializer.child)
+            return [_camelizar_fila(fila, mapa) if isinstance(fila, dict) else camelizar(fila) for fila in data]
+        return [camelizar(item) for item in data]
+    if isinstance(data, dict):
+        if serializer is not None and not isinstance(serializer, ListSerializer):
+            return _camelizar_fila(data, mapa_campos(serializer))
+        return {
+            camelizar_clave(force_str(clave)) if isinstance(clave, (str, Promise)) else clave: camelizar(valor)
+            for clave, valor in data.items()
+        }
+    if isinstance(data, Promise):
+        return force_str(data)
+    return data
+
+
+def _por_defecto(valor):
+    """
+    Tipos que orjson no serializa, con la misma salida que el encoder de DRF.
+    """
+    if isinstance(valor, Promise):
+        return force_str(valor)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, datetime.timedelta):
+        return str(valor.total_seconds())
+    if isinstance(valor, (set, frozenset, tuple)):
+        return list(valor)
+    if isinstance(valor, uuid.UUID):
+        return str(valor)
+    if isinstance(valor, bytes):
+        return valor.decode()
+    if hasattr(valor, 'tolist'):
+        return valor.tolist()
+    if hasattr(valor, '__iter__'):
+        return list(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+class CamelCaseORJSONRenderer(BaseRenderer):
+    """
+    Renderer JSON camelCase para listas grandes: re-escribe las claves con
+    mapas precalculados por serializer (sin regex por fila) y codifica con
+    orjson. Se activa por ViewSet con `renderer_classes = RENDERERS_RAPIDOS`.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            camelizar(data),
+            default=_por_defecto,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
+
+
+RENDERERS_RAPIDOS = [CamelCaseORJSONRenderer, CamelCaseBrowsableAPIRenderer]
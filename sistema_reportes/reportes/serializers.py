@@ -1,8 +1,39 @@
 from rest_framework import serializers
-from .models import OrganismoSectorial, PPDA, MedidaAvance, Medida, Indicador, Actividad, ReporteAnual
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.models import User
+from .alcance import CLAIM_ORGANISMO, organismo_de_usuario
+from .cache_respuestas import invalidar_cache_modelos
+from .cumplimiento import clave_snapshot_avance, programar_recalculo
+from .grupos import CLAIM_GRUPOS, grupos_de_usuario
+from .referencias import nombres_organismo_por_id
+from .models import (
+    OrganismoSectorial, PPDA, MedidaAvance, Medida, Indicador, Actividad, ReporteAnual, CumplimientoSnapshot,
+    ReporteConsolidado
+)
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils import timezone
 
+class NombreOrganismoField(serializers.ReadOnlyField):
+    """
+    Nombre para mostrar del organismo de la FK `source`. Si la relación no
+    está cargada se resuelve por id con la cache de referencias, sin JOIN
+    ni consulta por fila.
+    """
+    def get_attribute(self, instance):
+        campo = instance._meta.get_field(self.source)
+        if campo.is_cached(instance):
+            organismo = getattr(instance, self.source)
+            return organismo.get_nombre_display() if organismo is not None else None
+        organismo_id = getattr(instance, campo.attname)
+        if organismo_id is None:
+            return None
+        if not hasattr(self, '_nombres'):
+            self._nombres = nombres_organismo_por_id()
+        return self._nombres.get(organismo_id)
+
 class OrganismoSectorialSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrganismoSectorial
@@ -10,7 +41,7 @@ class OrganismoSectorialSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 class PPDASerializer(serializers.ModelSerializer):
-    organismo_nombre = serializers.CharField(source='organismo.get_nombre_display', read_only=True)
+    organismo_nombre = NombreOrganismoField(source='organismo')
     
     class Meta:
         model = PPDA
@@ -36,20 +67,75 @@ class PPDASerializer(serializers.ModelSerializer):
             raise ValidationError("La fecha de inicio no puede ser posterior a la fecha de término.")
         return data
 
+class MedidaRelacionadaField(serializers.PrimaryKeyRelatedField):
+    """
+    Usa las medidas resueltas por MedidaAvanceListSerializer cuando existen,
+    en vez de consultar cada id por separado.
+    """
+    def to_internal_value(self, data):
+        medidas = self.context.get('medidas_resueltas')
+        if medidas is None:
+            return super().to_internal_value(data)
+        try:
+            medida = medidas.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if medida is None:
+            self.fail('does_not_exist', pk_value=data)
+        return medida
+
+class MedidaAvanceListSerializer(serializers.ListSerializer):
+    """
+    Creación y actualización parcial en lote. Todas las medidas referenciadas
+    se resuelven con una consulta y la escritura es un bulk_create o
+    bulk_update dentro de una transacción.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = {item.get('medida') for item in data if isinstance(item, dict)}
+            ids = [i for i in ids if isinstance(i, int) or (isinstance(i, str) and i.isdigit())]
+            self.context['medidas_resueltas'] = Medida.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        avances = [MedidaAvance(**datos) for datos in validated_data]
+        with transaction.atomic():
+            MedidaAvance.objects.bulk_create(avances)
+            programar_recalculo(*[clave_snapshot_avance(avance) for avance in avances])
+            invalidar_cache_modelos(MedidaAvance)
+        return avances
+
+    def update(self, instance, validated_data):
+        """
+        `instance` es la lista de avances en el mismo orden que los datos.
+        """
+        claves = [clave_snapshot_avance(avance) for avance in instance]
+        campos = {'fecha_actualizacion'}
+        ahora = timezone.now()
+        for avance, datos in zip(instance, validated_data):
+            for campo, valor in datos.items():
+                setattr(avance, campo, valor)
+            avance.fecha_actualizacion = ahora
+            campos.update(datos)
+        with transaction.atomic():
+            MedidaAvance.objects.bulk_update(instance, sorted(campos))
+            programar_recalculo(*claves, *[clave_snapshot_avance(avance) for avance in instance])
+            invalidar_cache_modelos(MedidaAvance)
+        return instance
+
 class MedidaAvanceSerializer(serializers.ModelSerializer):
+    medida = MedidaRelacionadaField(queryset=Medida.objects.all(), write_only=True)
     medida_nombre = serializers.CharField(source='medida.nombre', read_only=True)
     medida_tipo = serializers.CharField(source='medida.get_tipo_display', read_only=True)
     
     class Meta:
         model = MedidaAvance
+        list_serializer_class = MedidaAvanceListSerializer
         fields = [
             'id', 'medida', 'medida_nombre', 'medida_tipo', 'descripcion',
             'fecha_limite', 'avance', 'estado', 'observaciones', 'fecha_actualizacion'
         ]
         read_only_fields = ['id', 'medida_nombre', 'medida_tipo', 'fecha_actualizacion']
-        extra_kwargs = {
-            'medida': {'write_only': True}
-        }
 
     def validate_avance(self, value):
         if value < 0 or value > 100:
@@ -58,7 +144,7 @@ class MedidaAvanceSerializer(serializers.ModelSerializer):
 
 
 class IndicadorSerializer(serializers.ModelSerializer):
-    organismo_nombre = serializers.CharField(source='organismo_sectorial.get_nombre_display', read_only=True)
+    organismo_nombre = NombreOrganismoField(source='organismo_sectorial')
     ppda_nombre = serializers.CharField(source='ppda.nombre', read_only=True)
     
     class Meta:
@@ -66,7 +152,7 @@ class IndicadorSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'nombre', 'descripcion', 'valor', 'unidad',
             'organismo_sectorial', 'organismo_nombre', 'ppda', 'ppda_nombre',
-            'fecha_registro', 'medio_verificacion'
+            'fecha_registro', 'fecha_medicion', 'medio_verificacion'
         ]
         read_only_fields = ['id', 'organismo_nombre', 'ppda_nombre', 'fecha_registro']
         extra_kwargs = {
@@ -81,7 +167,7 @@ class IndicadorSerializer(serializers.ModelSerializer):
         
         
 class ReporteAnualSerializer(serializers.ModelSerializer):
-    organismo_nombre = serializers.CharField(source='organismo_responsable.get_nombre_display', read_only=True)
+    organismo_nombre = NombreOrganismoField(source='organismo_responsable')
     medida_nombre = serializers.CharField(source='medida.medida.nombre', read_only=True)
     
     class Meta:
@@ -91,8 +177,9 @@ class ReporteAnualSerializer(serializers.ModelSerializer):
             'medida', 'medida_nombre', 'cumplimiento', 'observaciones'
         ]
         read_only_fields = ['id', 'organismo_nombre', 'medida_nombre']
+        # Lo fija la vista según el alcance del usuario (ver alcance.py)
         extra_kwargs = {
-            'organismo_responsable': {'write_only': True},
+            'organismo_responsable': {'write_only': True, 'required': False},
             'medida': {'write_only': True}
         }
 
@@ -103,7 +190,7 @@ class ReporteAnualSerializer(serializers.ModelSerializer):
         
         
 class ActividadSerializer(serializers.ModelSerializer):
-    organismo_nombre = serializers.CharField(source='organismo_responsable.get_nombre_display', read_only=True)
+    organismo_nombre = NombreOrganismoField(source='organismo_responsable')
     medida_nombre = serializers.CharField(source='medida.nombre', read_only=True)
     
     class Meta:
@@ -115,7 +202,7 @@ class ActividadSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'medida_nombre', 'organismo_nombre']
         extra_kwargs = {
             'medida': {'write_only': True},
-            'organismo_responsable': {'write_only': True}
+            'organismo_responsable': {'write_only': True, 'required': False}
         }
 
     def validate(self, data):
@@ -125,3 +212,101 @@ class ActividadSerializer(serializers.ModelSerializer):
         if fecha_inicio and fecha_termino and fecha_inicio > fecha_termino:
             raise ValidationError("La fecha de inicio no puede ser posterior a la fecha de término.")
         return data
+
+
+class MedidaSerializer(serializers.ModelSerializer):
+    organismo_nombre = NombreOrganismoField(source='organismo_responsable')
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = Medida
+        fields = [
+            'id', 'nombre', 'tipo', 'tipo_display', 'descripcion', 'fecha_inicio', 'fecha_termino',
+            'prioridad', 'organismo_nombre'
+        ]
+        read_only_fields = fields
+
+
+class MedidaArbolSerializer(MedidaSerializer):
+    avances = MedidaAvanceSerializer(many=True, read_only=True)
+    actividades = ActividadSerializer(many=True, read_only=True)
+
+    class Meta(MedidaSerializer.Meta):
+        fields = MedidaSerializer.Meta.fields + ['avances', 'actividades']
+        read_only_fields = fields
+
+
+class PPDAArbolSerializer(PPDASerializer):
+    """
+    PPDA con sus medidas (cada una con avances y actividades) e indicadores.
+    Espera las relaciones precargadas con prefetch (ver arbol.py).
+    """
+    medidas = MedidaArbolSerializer(many=True, read_only=True)
+    indicadores = IndicadorSerializer(source='indicadores_recientes', many=True, read_only=True)
+
+    class Meta(PPDASerializer.Meta):
+        fields = PPDASerializer.Meta.fields + ['medidas', 'indicadores']
+
+
+class CumplimientoSnapshotSerializer(serializers.ModelSerializer):
+    organismo_nombre = NombreOrganismoField(source='organismo')
+    ppda_nombre = serializers.CharField(source='ppda.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = CumplimientoSnapshot
+        fields = [
+            'ppda', 'ppda_nombre', 'organismo', 'organismo_nombre', 'anio',
+            'avance_promedio', 'total_avances', 'pendientes', 'en_progreso', 'completados',
+            'retrasados', 'vencidos', 'cumplimiento_promedio', 'total_reportes', 'fecha_actualizacion'
+        ]
+        read_only_fields = fields
+
+
+class ReporteConsolidadoSerializer(serializers.ModelSerializer):
+    organismo_nombre = NombreOrganismoField(source='organismo_responsable')
+    ppda_nombre = serializers.CharField(source='ppda.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = ReporteConsolidado
+        fields = [
+            'id', 'organismo_responsable', 'organismo_nombre', 'ppda', 'ppda_nombre', 'periodo',
+            'resumen_actividades', 'archivo_reporte', 'hash_entradas', 'fecha_generacion', 'fecha_creacion'
+        ]
+        read_only_fields = fields
+
+
+class GenerarReporteConsolidadoSerializer(serializers.Serializer):
+    organismo = serializers.PrimaryKeyRelatedField(queryset=OrganismoSectorial.objects.all())
+    ppda = serializers.PrimaryKeyRelatedField(queryset=PPDA.objects.all(), required=False, allow_null=True)
+    anio = serializers.IntegerField(min_value=2000, max_value=2100)
+    forzar = serializers.BooleanField(default=False)
+
+
+class TokenConGruposSerializer(TokenObtainPairSerializer):
+    """
+    Incluye los grupos y el organismo del usuario en el token para que los
+    permisos y el alcance no consulten la base de datos.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[CLAIM_GRUPOS] = sorted(grupos_de_usuario(user))
+        token[CLAIM_ORGANISMO] = organismo_de_usuario(user)
+        return token
+
+
+class TokenRefreshConGruposSerializer(TokenRefreshSerializer):
+    """
+    Recalcula los claims de grupos y organismo al refrescar, para que un
+    cambio se refleje a más tardar al vencer el access token.
+    """
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = RefreshToken(data.get('refresh', attrs['refresh']), verify=False)
+        user = User(pk=refresh[jwt_settings.USER_ID_CLAIM])
+        access = refresh.access_token
+        access[CLAIM_GRUPOS] = sorted(grupos_de_usuario(user))
+        access[CLAIM_ORGANISMO] = organismo_de_usuario(user)
+        data['access'] = str(access)
+        return data
+
@@ -0,0 +1,102 @@
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth
+from django.utils import timezone
+
+from .models import Indicador, IndicadorAgregado
+
+TRUNCAMIENTOS = {
+    'hora': TruncHour,
+    'dia': TruncDay,
+    'mes': TruncMonth,
+}
+
+CAMPOS_AGRUPACION = ['nombre', 'unidad', 'organismo_sectorial_id', 'ppda_id']
+
+# Advisory lock de PostgreSQL que serializa las actualizaciones de agregados
+# (sincronizacion.py usa 7331 y cumplimiento.py 7332)
+BLOQUEO_AGREGADOS = (7333, 0)
+
+
+def _inicio_periodo(resolucion, fecha):
+    """
+    Retorna el inicio del periodo de la resolución que contiene a `fecha`.
+    """
+    if resolucion == 'hora':
+        return fecha.replace(minute=0, second=0, microsecond=0)
+    inicio = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolucion == 'mes':
+        inicio = inicio.replace(day=1)
+    return inicio
+
+
+def actualizar_agregados(desde=None, resoluciones=None):
+    """
+    Recalcula los agregados de Indicador a partir de `desde`.
+
+    Solo se recalculan los periodos que contienen a `desde` o son
+    posteriores, así que cada ingesta paga por los datos nuevos y no por
+    toda la tabla. Sin `desde` se reconstruye todo.
+
+    La tabla no tiene clave única: dos actualizaciones concurrentes (por
+    ejemplo SNIFA y Airecoo) insertarían filas duplicadas. Por eso el
+    cálculo y el reemplazo de cada resolución corren bajo un advisory lock
+    global, y el cálculo ve lo que confirmó la actualización anterior.
+    """
+    total = 0
+    for resolucion in resoluciones or TRUNCAMIENTOS:
+        truncar = TRUNCAMIENTOS[resolucion]
+        lecturas = Indicador.objects.all()
+        agregados = IndicadorAgregado.objects.filter(resolucion=resolucion)
+        if desde is not None:
+            inicio = _inicio_periodo(resolucion, timezone.localtime(desde))
+            lecturas = lecturas.filter(fecha_medicion__gte=inicio)
+            agregados = agregados.filter(periodo__gte=inicio)
+
+        filas = (
+            lecturas
+            .annotate(periodo=truncar('fecha_medicion'))
+            .values('periodo', *CAMPOS_AGRUPACION)
+            .annotate(
+                promedio=Avg('valor'),
+                minimo=Min('valor'),
+                maximo=Max('valor'),
+                cantidad=Count('id'),
+            )
+            .order_by()
+        )
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', BLOQUEO_AGREGADOS)
+            nuevos = [IndicadorAgregado(resolucion=resolucion, **fila) for fila in filas]
+            agregados.delete()
+            IndicadorAgregado.objects.bulk_create(nuevos, batch_size=1000)
+        total += len(nuevos)
+    return total
+
+
+def consultar_serie(resolucion, alcance, nombre=None, organismo_id=None, ppda_id=None, desde=None, hasta=None):
+    """
+    Lee la serie desde la tabla de agregados de la resolución pedida.
+    `alcance` es el organismo al que se restringe la lectura (None para
+    todos) y se aplica además del filtro `organismo_id`.
+    """
+    queryset = IndicadorAgregado.objects.filter(resolucion=resolucion)
+    if alcance is not None:
+        queryset = queryset.filter(organismo_sectorial_id=alcance)
+    if nombre:
+        queryset = queryset.filter(nombre=nombre)
+    if organismo_id:
+        queryset = queryset.filter(organismo_sectorial_id=organismo_id)
+    if ppda_id:
+        queryset = queryset.filter(ppda_id=ppda_id)
+    if desde:
+        queryset = queryset.filter(periodo__gte=desde)
+    if hasta:
+        queryset = queryset.filter(periodo__lte=hasta)
+    # Los desempates hacen el orden estable entre consultas (con o sin cursor de servidor)
+    return queryset.order_by('nombre', 'periodo', 'organismo_sectorial_id', 'ppda_id', 'unidad').values(
+        'periodo', 'nombre', 'unidad', 'organismo_sectorial_id', 'ppda_id',
+        'promedio', 'minimo', 'maximo', 'cantidad'
+    )
@@ -1,7 +1,14 @@
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import PerfilUsuario
+from .alcance import invalidar_organismo
+from .cache_respuestas import invalidar_cache_modelos
+from .cumplimiento import clave_snapshot_avance, programar_recalculo
+from .grupos import invalidar_grupos
+from .models import (
+    Actividad, Indicador, Medida, MedidaAvance, OrganismoSectorial, PerfilUsuario, PPDA, ReglaAlerta, ReporteAnual,
+    ReporteConsolidado
+)
 
 @receiver(post_save, sender=User)
 def crear_perfil_usuario(sender, instance, created, **kwargs):
@@ -12,3 +19,125 @@ def crear_perfil_usuario(sender, instance, created, **kwargs):
 def guardar_perfil_usuario(sender, instance, **kwargs):
     if hasattr(instance, 'perfil'):
         instance.perfil.save()
+
+@receiver(post_save, sender=PerfilUsuario)
+@receiver(post_delete, sender=PerfilUsuario)
+def invalidar_cache_organismo(sender, instance, **kwargs):
+    invalidar_organismo([instance.user_id])
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_cache_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Al limpiar desde el grupo se pierde pk_set, se guardan los usuarios antes
+        instance._usuarios_previos = list(instance.user_set.values_list('id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidar_grupos([instance.pk])
+    elif action == 'post_clear':
+        invalidar_grupos(getattr(instance, '_usuarios_previos', []))
+    else:
+        invalidar_grupos(pk_set or [])
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidar_cache_grupo_modificado(sender, instance, **kwargs):
+    if not kwargs.get('created'):
+        invalidar_grupos(instance.user_set.values_list('id', flat=True))
+
+# Snapshots de cumplimiento: se recalculan solo las claves (ppda, organismo, año) afectadas
+
+def _clave_avance(fila):
+    if fila is None:
+        return None
+    return (fila['medida__ppda_id'], fila['medida__organismo_responsable_id'], fila['fecha_limite'].year)
+
+def _clave_reporte(fila):
+    if fila is None:
+        return None
+    return (fila['medida__medida__ppda_id'], fila['organismo_responsable_id'], fila['periodo'].year)
+
+@receiver(pre_save, sender=MedidaAvance)
+def guardar_clave_avance_previa(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._clave_snapshot = _clave_avance(
+            MedidaAvance.objects.filter(pk=instance.pk)
+            .values('medida__ppda_id', 'medida__organismo_responsable_id', 'fecha_limite').first()
+        )
+
+@receiver(post_save, sender=MedidaAvance)
+@receiver(post_delete, sender=MedidaAvance)
+def actualizar_snapshot_avance(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    programar_recalculo(getattr(instance, '_clave_snapshot', None), clave_snapshot_avance(instance))
+
+@receiver(pre_save, sender=ReporteAnual)
+def guardar_clave_reporte_previa(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._clave_snapshot = _clave_reporte(
+            ReporteAnual.objects.filter(pk=instance.pk)
+            .values('medida__medida__ppda_id', 'organismo_responsable_id', 'periodo').first()
+        )
+
+@receiver(post_save, sender=ReporteAnual)
+@receiver(post_delete, sender=ReporteAnual)
+def actualizar_snapshot_reporte(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Solo el ppda de la medida, en una consulta y sin cargar el avance ni la medida
+    ppda_id = MedidaAvance.objects.filter(pk=instance.medida_id).values_list('medida__ppda_id', flat=True).first()
+    programar_recalculo(
+        getattr(instance, '_clave_snapshot', None),
+        (ppda_id, instance.organismo_responsable_id, instance.periodo.year),
+    )
+
+@receiver(pre_save, sender=Medida)
+def guardar_clave_medida_previa(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._clave_snapshot = Medida.objects.filter(pk=instance.pk).values_list(
+            'ppda_id', 'organismo_responsable_id'
+        ).first()
+
+@receiver(post_save, sender=Medida)
+def actualizar_snapshot_medida(sender, instance, raw=False, **kwargs):
+    """
+    Cambiar el PPDA o el organismo de una medida mueve todos sus avances y
+    reportes de clave, por lo que se recalculan la clave anterior y la nueva.
+    """
+    anterior = getattr(instance, '_clave_snapshot', None)
+    actual = (instance.ppda_id, instance.organismo_responsable_id)
+    if raw or anterior is None or anterior == actual:
+        return
+    anios = [fecha.year for fecha in instance.avances.dates('fecha_limite', 'year')]
+    reportes = set(
+        ReporteAnual.objects.filter(medida__medida=instance)
+        .values_list('organismo_responsable_id', 'periodo__year')
+    )
+    claves = []
+    for ppda_id, organismo_id in (anterior, actual):
+        claves += [(ppda_id, organismo_id, anio) for anio in anios]
+        claves += [(ppda_id, organismo_r, anio) for organismo_r, anio in reportes]
+    programar_recalculo(*claves)
+
+# Cache de respuestas y de referencias: cualquier escritura cambia la versión del modelo
+
+MODELOS_CON_CACHE = (
+    OrganismoSectorial, PPDA, Medida, MedidaAvance, Indicador, ReporteAnual, Actividad, ReporteConsolidado,
+    ReglaAlerta, Group, Permission,
+)
+
+def invalidar_cache_respuestas(sender, raw=False, **kwargs):
+    if not raw:
+        invalidar_cache_modelos(sender)
+
+for modelo in MODELOS_CON_CACHE:
+    post_save.connect(invalidar_cache_respuestas, sender=modelo, dispatch_uid=f'respuestas_save_{modelo.__name__}')
+    post_delete.connect(invalidar_cache_respuestas, sender=modelo, dispatch_uid=f'respuestas_delete_{modelo.__name__}')
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_cache_permisos(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidar_cache_modelos(Permission)
@@ -0,0 +1,223 @@
+import logging
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from .airecoo_integration import iterar_datos_airecoo
+from .ingesta import combinar_resultados, guardar_datos_airecoo, guardar_datos_snifa, nuevo_resultado
+from .integraciones import iterar_lotes_concurrentes
+from .models import EjecucionSincronizacion, EstadoIntegracion
+from .series import actualizar_agregados
+from .snifa_integration import iterar_datos_snifa
+
+logger = logging.getLogger(__name__)
+
+FUENTES = {
+    'snifa': (iterar_datos_snifa, guardar_datos_snifa),
+    'airecoo': (iterar_datos_airecoo, guardar_datos_airecoo),
+}
+
+# Primera clave de los advisory locks de sincronización; la segunda es hashtext(fuente)
+ESPACIO_BLOQUEO = 7331
+
+
+def adquirir_bloqueo(fuente):
+    """
+    Intenta tomar el bloqueo de la fuente con un advisory lock de sesión de
+    PostgreSQL, compartido por todos los procesos que usan la base. Retorna
+    False si otra conexión ya la está sincronizando. Si el worker muere,
+    PostgreSQL libera el bloqueo al cerrarse su conexión.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s, hashtext(%s))', [ESPACIO_BLOQUEO, fuente])
+        return cursor.fetchone()[0]
+
+
+def liberar_bloqueo(fuente):
+    # Solo la conexión que tomó el bloqueo puede liberarlo
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_unlock(%s, hashtext(%s))', [ESPACIO_BLOQUEO, fuente])
+
+
+def fuentes_en_curso():
+    """
+    Fuentes cuyo bloqueo tiene tomado alguna conexión, en una consulta a pg_locks.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT fuente FROM unnest(%s::text[]) AS fuente
+            WHERE EXISTS (
+                SELECT 1 FROM pg_locks
+                WHERE locktype = 'advisory' AND objsubid = 2 AND classid = %s
+                    AND objid = hashtext(fuente)::oid
+                    AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+            )
+            """,
+            [list(FUENTES), ESPACIO_BLOQUEO]
+        )
+        return {fila[0] for fila in cursor.fetchall()}
+
+
+def _cerrar_ejecucion(ejecucion, resultado, error=''):
+    ejecucion.fin = timezone.now()
+    ejecucion.duracion = (ejecucion.fin - ejecucion.inicio).total_seconds()
+    ejecucion.filas_obtenidas = resultado['recibidos']
+    ejecucion.filas_insertadas = resultado['insertados']
+    ejecucion.filas_actualizadas = resultado['actualizados']
+    ejecucion.filas_rechazadas = resultado['rechazados']
+    ejecucion.error = error
+    ejecucion.estado = 'fallida' if error else 'exitosa'
+    ejecucion.save()
+
+
+def sincronizar(*nombres):
+    """
+    Descarga las fuentes indicadas en paralelo (en stream) y guarda sus
+    lotes a medida que llegan. Cada fuente pide solo lo posterior a su
+    última sincronización exitosa y queda registrada en una
+    EjecucionSincronizacion. Las fuentes que otro worker está
+    sincronizando se omiten. Retorna el resultado de cada fuente.
+    """
+    resultados = {}
+    ejecuciones = {}
+    estados = {}
+    bloqueadas = []
+    for nombre in nombres:
+        if not adquirir_bloqueo(nombre):
+            logger.info("Sincronización de %s omitida: otra ejecución está en curso", nombre)
+            EjecucionSincronizacion.objects.create(fuente=nombre, estado='omitida', fin=timezone.now(), duracion=0)
+            resultados[nombre] = {'omitida': True}
+            continue
+        bloqueadas.append(nombre)
+        estados[nombre] = EstadoIntegracion.objects.get_or_create(fuente=nombre)[0]
+        ejecuciones[nombre] = EjecucionSincronizacion.objects.create(
+            fuente=nombre, cursor=estados[nombre].ultima_medicion
+        )
+        resultados[nombre] = nuevo_resultado()
+
+    errores = {}
+    try:
+        obtenedores = {
+            nombre: partial(FUENTES[nombre][0], desde=estados[nombre].ultima_medicion)
+            for nombre in bloqueadas
+        }
+        for nombre, lote, error in iterar_lotes_concurrentes(obtenedores, settings.INTEGRACION_TAMANO_LOTE):
+            if error is not None:
+                logger.error("Error al integrar %s: %s", nombre, error)
+                resultados[nombre]['errores'].append(str(error))
+                errores[nombre] = str(error)
+                continue
+            combinar_resultados(resultados[nombre], FUENTES[nombre][1](lote))
+            if resultados[nombre]['error_lote']:
+                # Lecturas válidas que no se guardaron: la marca no avanza para
+                # volver a pedirlas y la ejecución queda fallida
+                errores.setdefault(nombre, resultados[nombre]['error_lote'])
+    except Exception as e:
+        for nombre in bloqueadas:
+            errores.setdefault(nombre, str(e))
+        raise
+    finally:
+        for nombre in bloqueadas:
+            resultado = resultados[nombre]
+            estado = estados[nombre]
+            ultima = resultado['ultima_medicion']
+            if nombre not in errores and ultima and (estado.ultima_medicion is None or ultima > estado.ultima_medicion):
+                estado.ultima_medicion = ultima
+                estado.save(update_fields=['ultima_medicion', 'fecha_actualizacion'])
+            _cerrar_ejecucion(ejecuciones[nombre], resultado, errores.get(nombre, ''))
+            liberar_bloqueo(nombre)
+
+    primeras = [resultados[n]['primera_medicion'] for n in bloqueadas if resultados[n]['primera_medicion']]
+    if primeras:
+        actualizar_agregados(desde=min(primeras))
+
+    for nombre in bloqueadas:
+        for campo in ('primera_medicion', 'ultima_medicion'):
+            if resultados[nombre][campo]:
+                resultados[nombre][campo] = resultados[nombre][campo].isoformat()
+    return resultados
+
+
+def _ejecuciones(fuente, ventana):
+    """
+    Consultas de una fuente: la última ejecución no omitida y los ids de
+    las últimas `ventana` exitosas.
+    """
+    ejecuciones = EjecucionSincronizacion.objects.filter(fuente=fuente).order_by('-inicio')
+    return (
+        ejecuciones.exclude(estado='omitida'),
+        ejecuciones.filter(estado='exitosa').values_list('id', flat=True)[:ventana],
+    )
+
+
+def _estado_fuente(fuente, marca, ultima, totales, en_curso, ahora):
+    return {
+        'fuente': fuente,
+        'ultima_medicion': marca,
+        'rezago_segundos': (ahora - marca).total_seconds() if marca else None,
+        'en_curso': en_curso,
+        'throughput_filas_segundo': (
+            round(totales['filas'] / totales['duracion'], 2) if totales['duracion'] else None
+        ),
+        'ultima_ejecucion': {
+            'estado': ultima.estado,
+            'inicio': ultima.inicio,
+            'fin': ultima.fin,
+            'duracion': ultima.duracion,
+            'filas_obtenidas': ultima.filas_obtenidas,
+            'filas_insertadas': ultima.filas_insertadas,
+            'filas_actualizadas': ultima.filas_actualizadas,
+            'filas_rechazadas': ultima.filas_rechazadas,
+            'error': ultima.error,
+        } if ultima else None,
+    }
+
+
+def estado_integraciones(ventana=10):
+    """
+    Métricas por fuente: última ejecución, rezago respecto de la última
+    lectura sincronizada y throughput (filas/s) de las últimas `ventana`
+    ejecuciones exitosas.
+    """
+    ahora = timezone.now()
+    marcas = dict(EstadoIntegracion.objects.values_list('fuente', 'ultima_medicion'))
+    en_curso = fuentes_en_curso()
+    data = []
+    for fuente in FUENTES:
+        ultimas, exitosas = _ejecuciones(fuente, ventana)
+        totales = EjecucionSincronizacion.objects.filter(id__in=list(exitosas)).aggregate(
+            filas=Sum('filas_obtenidas'), duracion=Sum('duracion')
+        )
+        data.append(_estado_fuente(
+            fuente, marcas.get(fuente), ultimas.first(), totales, fuente in en_curso, ahora
+        ))
+    return data
+
+
+async def aestado_integraciones(ventana=10):
+    """
+    Versión async de estado_integraciones, con las mismas consultas. Son
+    pocas filas: se leen con `async for` (un salto de hilo por consulta)
+    y no con aiterator, que usa un cursor de servidor y dos saltos.
+    """
+    ahora = timezone.now()
+    marcas = {
+        fuente: marca async for fuente, marca in EstadoIntegracion.objects.values_list('fuente', 'ultima_medicion')
+    }
+    en_curso = await sync_to_async(fuentes_en_curso)()
+    data = []
+    for fuente in FUENTES:
+        ultimas, exitosas = _ejecuciones(fuente, ventana)
+        ids = [id_ async for id_ in exitosas]
+        totales = await EjecucionSincronizacion.objects.filter(id__in=ids).aaggregate(
+            filas=Sum('filas_obtenidas'), duracion=Sum('duracion')
+        )
+        data.append(_estado_fuente(
+            fuente, marcas.get(fuente), await ultimas.afirst(), totales, fuente in en_curso, ahora
+        ))
+    return data
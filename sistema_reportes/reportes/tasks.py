@@ -1,16 +1,47 @@
 from celery import shared_task
-from .snifa_integration import obtener_datos_snifa
-from .airecoo_integration import obtener_datos_airecoo
-from .views import guardar_datos_snifa, guardar_datos_airecoo
+from django.utils.dateparse import parse_datetime
+from .alertas import evaluar_periodo
+from .consolidado import generar_reporte_consolidado
+from .cumplimiento import recalcular_snapshots
+from .series import actualizar_agregados
+from .sincronizacion import sincronizar
 
 @shared_task
 def tarea_integrar_snifa():
-    datos_snifa = obtener_datos_snifa()
-    if datos_snifa:
-        guardar_datos_snifa(datos_snifa)
+    return sincronizar('snifa')
 
 @shared_task
 def tarea_integrar_airecoo():
-    datos_airecoo = obtener_datos_airecoo()
-    if datos_airecoo:
-        guardar_datos_airecoo(datos_airecoo)
\ No newline at end of file
+    return sincronizar('airecoo')
+
+@shared_task
+def tarea_integrar_fuentes():
+    return sincronizar('snifa', 'airecoo')
+
+@shared_task
+def tarea_actualizar_agregados_indicadores(desde=None):
+    if isinstance(desde, str):
+        desde = parse_datetime(desde)
+    return actualizar_agregados(desde=desde)
+
+@shared_task
+def tarea_evaluar_alertas(desde=None, hasta=None):
+    if isinstance(desde, str):
+        desde = parse_datetime(desde)
+    if isinstance(hasta, str):
+        hasta = parse_datetime(hasta)
+    return evaluar_periodo(desde=desde, hasta=hasta)
+
+@shared_task
+def tarea_recalcular_snapshots_cumplimiento():
+    return recalcular_snapshots()
+
+@shared_task
+def tarea_generar_reporte_consolidado(organismo_id, anio, ppda_id=None, forzar=False):
+    reporte, regenerado = generar_reporte_consolidado(organismo_id, anio, ppda_id=ppda_id, forzar=forzar)
+    return {
+        'reporte_id': reporte.id,
+        'regenerado': regenerado,
+        'hash_entradas': reporte.hash_entradas,
+        'archivo': reporte.archivo_reporte.name,
+    }
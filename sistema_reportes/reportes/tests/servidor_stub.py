@@ -0,0 +1,52 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorStub:
+    """
+    Servidor HTTP local que imita las APIs de SNIFA y Airecoo.
+
+    `rutas` asocia cada path con la lista que se devuelve como JSON y
+    `demora` agrega una latencia fija (segundos) a cada respuesta, lo que
+    permite medir concurrencia y throughput sin salir a internet.
+    """
+    def __init__(self, rutas, demora=0):
+        self.rutas = rutas
+        self.demora = demora
+        self.solicitudes = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.solicitudes.append(self.path)
+                time.sleep(servidor.demora)
+                ruta = self.path.split('?', 1)[0]
+                if ruta not in servidor.rutas:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                cuerpo = json.dumps(servidor.rutas[ruta]).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, ruta):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}{ruta}'
+
+    def __enter__(self):
+        self.hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,244 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.alcance import organismo_de_usuario
+from reportes.cumplimiento import recalcular_snapshots
+from reportes.models import OrganismoSectorial, Medida, MedidaAvance, Indicador, Actividad, PerfilUsuario, ReporteAnual
+from reportes.series import actualizar_agregados
+import datetime
+
+User = get_user_model()
+
+
+class OrganismoDeUsuarioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG')
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=cls.sea)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_memorizado_en_usuario_y_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(organismo_de_usuario(self.user), self.sea.id)
+            organismo_de_usuario(self.user)
+        otra_instancia = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(organismo_de_usuario(otra_instancia), self.sea.id)
+
+    def test_sin_organismo_tambien_se_cachea(self):
+        sin_organismo = User.objects.create_user(username='central', password='testpass123')
+        self.assertIsNone(organismo_de_usuario(sin_organismo))
+        otra_instancia = User.objects.get(pk=sin_organismo.pk)
+        with self.assertNumQueries(0):
+            self.assertIsNone(organismo_de_usuario(otra_instancia))
+
+    def test_invalidacion_al_guardar_perfil(self):
+        organismo_de_usuario(self.user)
+        perfil = PerfilUsuario.objects.get(user=self.user)
+        perfil.organismo = self.sag
+        perfil.save()
+        self.assertEqual(organismo_de_usuario(User.objects.get(pk=self.user.pk)), self.sag.id)
+
+
+class AlcanceViewSetsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        grupo_user = Group.objects.create(name='user')
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG')
+        cls.medidas = {}
+        for organismo in (cls.sea, cls.sag):
+            medida = Medida.objects.create(
+                nombre=f'Medida {organismo.nombre}', tipo='no_regulatoria', descripcion='Recambio de leña',
+                fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+                organismo_responsable=organismo
+            )
+            cls.medidas[organismo.nombre] = medida
+            MedidaAvance.objects.create(medida=medida, descripcion='Avance', fecha_limite=datetime.date(2024, 1, 1))
+            Indicador.objects.create(nombre='PM2.5', valor=1, organismo_sectorial=organismo)
+            Actividad.objects.create(
+                nombre='Charla', fecha_inicio=datetime.date(2024, 1, 1), fecha_termino=datetime.date(2024, 2, 1),
+                medida=medida, organismo_responsable=organismo
+            )
+
+        cls.analista = User.objects.create_user(username='analista', password='testpass123')
+        cls.analista.groups.add(grupo_user)
+        PerfilUsuario.objects.filter(user=cls.analista).update(organismo=cls.sea)
+        cls.central = User.objects.create_user(username='central', password='testpass123')
+        cls.central.groups.add(grupo_user)
+        cls.auditor = User.objects.create_user(username='auditor', password='testpass123')
+        cls.auditor.groups.add(grupo_user, Group.objects.create(name='auditor'))
+        PerfilUsuario.objects.filter(user=cls.auditor).update(organismo=cls.sag)
+
+    def setUp(self):
+        cache.clear()
+
+    def autenticar(self, user):
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+
+    def organismos_listados(self, nombre_url, campo='organismoNombre'):
+        response = self.client.get(reverse(nombre_url))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(fila[campo] for fila in response.json()['results'])
+
+    def test_listados_filtrados_por_organismo(self):
+        self.autenticar(self.analista)
+        sea = 'Servicio de Evaluación Ambiental'
+        self.assertEqual(self.organismos_listados('indicador-list'), [sea])
+        self.assertEqual(self.organismos_listados('actividad-list'), [sea])
+        self.assertEqual(self.organismos_listados('medida-avance-list', 'medidaNombre'), ['Medida SEA'])
+
+    def test_sin_alcance(self):
+        # Solo los grupos sin alcance ven todos los organismos; un perfil sin organismo no ve ninguno
+        self.autenticar(self.auditor)
+        self.assertEqual(len(self.organismos_listados('actividad-list')), 2)
+        self.autenticar(self.central)
+        self.assertEqual(self.organismos_listados('actividad-list'), [])
+
+    def test_perfil_sin_organismo_no_lee_ni_escribe(self):
+        ReporteAnual.objects.create(
+            organismo_responsable=self.sea, periodo=datetime.date(2024, 12, 31), cumplimiento=50,
+            medida=MedidaAvance.objects.get(medida=self.medidas['SEA'])
+        )
+        actualizar_agregados()
+        recalcular_snapshots()
+        self.autenticar(self.central)
+        for nombre_url in ('indicador-list', 'actividad-list', 'medida-avance-list', 'reporte-consolidado-list'):
+            self.assertEqual(self.client.get(reverse(nombre_url)).json()['results'], [], nombre_url)
+        for nombre_url in ('indicadores-series', 'dashboard-cumplimiento', 'reporte-anual-resumen-anual'):
+            self.assertEqual(self.client.get(reverse(nombre_url)).json(), [], nombre_url)
+        self.assertEqual(self.client.get(reverse('buscar'), {'q': 'leña'}).json()['resultados'], [])
+
+        escrituras = (
+            ('actividad-list', {
+                'nombre': 'Taller', 'fechaInicio': '2024-03-01', 'fechaTermino': '2024-03-02',
+                'medida': self.medidas['SEA'].id, 'organismoResponsable': self.sea.id,
+            }),
+            ('medida-avance-list', {'medida': self.medidas['SEA'].id, 'descripcion': 'Sin', 'fechaLimite': '2024-05-01'}),
+            ('indicador-list', {'nombre': 'SO2', 'valor': 1, 'organismoSectorial': self.sea.id}),
+            ('reporte-consolidado-generar', {'organismo': self.sea.id, 'anio': 2024}),
+        )
+        for nombre_url, datos in escrituras:
+            response = self.client.post(reverse(nombre_url), datos, format='json')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, nombre_url)
+        self.assertFalse(Actividad.objects.filter(nombre='Taller').exists())
+        self.assertFalse(Indicador.objects.filter(nombre='SO2').exists())
+
+    def test_token_sin_organismo_no_ve_datos(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'central',
+            'password': 'testpass123'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.organismos_listados('actividad-list'), [])
+
+    def test_un_predicado_y_cache_por_organismo(self):
+        self.autenticar(self.auditor)
+        self.assertEqual(len(self.organismos_listados('indicador-list')), 2)
+        self.autenticar(self.analista)
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(len(self.organismos_listados('indicador-list')), 1)
+        listado = [c['sql'] for c in consultas.captured_queries if 'FROM "reportes_indicador"' in c['sql']]
+        self.assertIn(f'"reportes_indicador"."organismo_sectorial_id" = {self.sea.id}', listado[-1])
+
+    def test_detalle_de_otro_organismo(self):
+        self.autenticar(self.analista)
+        actividad = Actividad.objects.get(organismo_responsable=self.sag)
+        self.assertEqual(
+            self.client.get(reverse('actividad-detail', args=[actividad.id])).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.delete(reverse('actividad-detail', args=[actividad.id])).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+    def test_crear_actividad_fija_el_organismo(self):
+        datos = {
+            'nombre': 'Taller', 'fechaInicio': '2024-03-01', 'fechaTermino': '2024-03-02',
+            'medida': self.medidas['SEA'].id, 'organismoResponsable': self.sag.id,
+        }
+        self.autenticar(self.analista)
+        response = self.client.post(reverse('actividad-list'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Actividad.objects.get(id=response.json()['id']).organismo_responsable, self.sea)
+
+        # Sin alcance el organismo es obligatorio
+        self.autenticar(self.auditor)
+        datos.pop('organismoResponsable')
+        response = self.client.post(reverse('actividad-list'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('organismoResponsable', response.json())
+
+    def test_crear_indicador_fija_el_organismo(self):
+        self.autenticar(self.analista)
+        response = self.client.post(
+            reverse('indicador-list'), {'nombre': 'SO2', 'valor': 3, 'organismoSectorial': self.sag.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Indicador.objects.get(id=response.json()['id']).organismo_sectorial, self.sea)
+
+    def test_avances_de_medidas_de_otro_organismo(self):
+        self.autenticar(self.analista)
+        datos = [{'medida': self.medidas['SAG'].id, 'descripcion': 'Ajeno', 'fechaLimite': '2024-05-01'}]
+        response = self.client.post(reverse('medida-avance-lote'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(reverse('medida-avance-list'), datos[0], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(MedidaAvance.objects.filter(descripcion='Ajeno').exists())
+
+        ajeno = MedidaAvance.objects.get(medida=self.medidas['SAG'])
+        response = self.client.patch(reverse('medida-avance-lote'), [{'id': ajeno.id, 'avance': 50}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_series_dashboard_y_resumen_de_otro_organismo(self):
+        for organismo in (self.sea, self.sag):
+            ReporteAnual.objects.create(
+                organismo_responsable=organismo, periodo=datetime.date(2024, 12, 31), cumplimiento=50,
+                medida=MedidaAvance.objects.get(medida__organismo_responsable=organismo)
+            )
+        actualizar_agregados()
+        recalcular_snapshots()
+        consultas = (
+            ('indicadores-series', 'organismoSectorialId', lambda data: data),
+            ('dashboard-cumplimiento', 'organismo', lambda data: data),
+            ('reporte-anual-resumen-anual', 'organismoId', lambda data: data[0]['organismos'] if data else []),
+        )
+        for nombre_url, campo, filas in consultas:
+            self.autenticar(self.analista)
+            for params in ({}, {'organismo_id': self.sag.id}):
+                response = self.client.get(reverse(nombre_url), params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                organismos = {fila[campo] for fila in filas(response.json())}
+                self.assertEqual(organismos, set() if params else {self.sea.id}, (nombre_url, params))
+
+            self.autenticar(self.auditor)
+            response = self.client.get(reverse(nombre_url))
+            self.assertEqual({fila[campo] for fila in filas(response.json())}, {self.sea.id, self.sag.id})
+
+    def test_busqueda_filtrada(self):
+        self.autenticar(self.analista)
+        response = self.client.get(reverse('buscar'), {'q': 'leña'})
+        self.assertEqual([r['titulo'] for r in response.json()['resultados']], ['Medida SEA'])
+
+    def test_token_con_organismo_evita_consulta(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'analista',
+            'password': 'testpass123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cache.clear()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(len(self.organismos_listados('actividad-list')), 1)
+        self.assertFalse(any('reportes_perfilusuario' in q['sql'] for q in contexto.captured_queries))
@@ -0,0 +1,115 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from reportes.alertas import evaluar_lecturas, evaluar_periodo, reglas_compiladas
+from reportes.ingesta import guardar_datos_airecoo
+from reportes.models import AlertaCritica, Indicador, OrganismoSectorial, PPDA, ReglaAlerta
+import datetime
+
+
+def lecturas(valores, estacion='Quintero', dia='2024-06-10', nombre='PM2.5', unidad='µg/m³'):
+    return [
+        {'nombre': nombre, 'valor': valor, 'unidad': unidad, 'estacion': estacion, 'fecha': f'{dia}T{hora:02d}:00'}
+        for hora, valor in enumerate(valores)
+    ]
+
+
+class ReglasAlertaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.ppda = PPDA.objects.create(
+            nombre='PPDA Quintero', fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.ajustes = override_settings(INTEGRACION_ORGANISMO_ID=self.organismo.id)
+        self.ajustes.enable()
+        self.addCleanup(self.ajustes.disable)
+
+    def test_umbral_una_alerta_por_serie_y_dia(self):
+        ReglaAlerta.objects.create(nombre='PM2.5', unidad='µg/m³', umbral=80, descripcion='Alerta PM2.5')
+        resultado = guardar_datos_airecoo(
+            lecturas([50, 90, 120, 85]) + lecturas([95], estacion='Ventanas')
+            + lecturas([200], unidad='ppb') + lecturas([300], nombre='PM10')
+        )
+
+        self.assertEqual(resultado['alertas'], 2)
+        alertas = {a.estacion: a for a in AlertaCritica.objects.all()}
+        self.assertEqual(set(alertas), {'Quintero', 'Ventanas'})
+        self.assertEqual(alertas['Quintero'].valor, 120)
+        self.assertEqual(alertas['Quintero'].estado, 'pendiente')
+        self.assertEqual(alertas['Quintero'].organismo_sectorial, self.organismo)
+        self.assertTrue(alertas['Quintero'].descripcion.startswith('Alerta PM2.5: lectura de 120.00'))
+
+        # Recargar o corregir lecturas del mismo día no duplica alertas
+        self.assertEqual(guardar_datos_airecoo(lecturas([50, 150, 120, 85]))['alertas'], 0)
+        self.assertEqual(guardar_datos_airecoo(lecturas([99], dia='2024-06-11'))['alertas'], 1)
+        self.assertEqual(AlertaCritica.objects.count(), 3)
+
+    def test_promedio_movil(self):
+        regla = ReglaAlerta.objects.create(nombre='PM2.5', umbral=50, ventana_horas=3)
+        guardar_datos_airecoo(lecturas([40, 45]))
+        self.assertFalse(AlertaCritica.objects.exists())
+
+        # El promedio usa las lecturas de cargas anteriores
+        resultado = guardar_datos_airecoo(lecturas([40, 45, 70, 20]))
+        self.assertEqual(resultado['alertas'], 1)
+        alerta = AlertaCritica.objects.get()
+        self.assertEqual(alerta.regla, regla)
+        self.assertAlmostEqual(alerta.valor, (40 + 45 + 70) / 3)
+        self.assertIn('promedio 3 h', alerta.descripcion)
+
+    def test_regla_por_ppda(self):
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=10, ppda=self.ppda)
+        guardar_datos_airecoo(lecturas([50]))
+        self.assertFalse(AlertaCritica.objects.exists())
+
+        indicador = Indicador.objects.get()
+        indicador.ppda = self.ppda
+        self.assertEqual(evaluar_lecturas([indicador]), 1)
+        self.assertEqual(AlertaCritica.objects.get().ppda, self.ppda)
+
+    def test_reglas_desde_cache(self):
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=10)
+        reglas_compiladas()
+        with self.assertNumQueries(0):
+            self.assertEqual([r.umbral for r in reglas_compiladas()['PM2.5']], [10])
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=20, activa=False)
+        ReglaAlerta.objects.create(nombre='PM10', umbral=30)
+        self.assertEqual(set(reglas_compiladas()), {'PM2.5', 'PM10'})
+
+    def test_costo_por_lote(self):
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=80)
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=60, ventana_horas=6)
+        guardar_datos_airecoo(lecturas(range(0, 200, 10), estacion='Otra'))
+        guardar_datos_airecoo(lecturas([70, 90]))
+        lote = list(Indicador.objects.filter(estacion='Quintero'))
+        AlertaCritica.objects.all().delete()
+        # Historial de las series del lote, alertas existentes e inserción
+        with self.assertNumQueries(3):
+            self.assertEqual(evaluar_lecturas(lote), 2)
+
+    def test_sin_reglas(self):
+        guardar_datos_airecoo(lecturas([500]))
+        lote = list(Indicador.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual(evaluar_lecturas(lote), 0)
+
+    def test_evaluar_periodo(self):
+        guardar_datos_airecoo(lecturas([90]) + lecturas([90], dia='2024-06-12'))
+        ReglaAlerta.objects.create(nombre='PM2.5', umbral=80)
+        self.assertEqual(evaluar_periodo(desde=datetime.datetime(2024, 6, 11, tzinfo=datetime.timezone.utc)), 1)
+        self.assertEqual(evaluar_periodo(tamano_lote=1), 1)
+        self.assertEqual(AlertaCritica.objects.count(), 2)
+
+    def test_error_en_alertas_no_revierte_el_lote(self):
+        with mock.patch('reportes.ingesta.evaluar_lecturas', side_effect=DatabaseError('sin conexión')), \
+                self.assertLogs('reportes.ingesta', 'ERROR'):
+            resultado = guardar_datos_airecoo(lecturas([90, 95]))
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual(resultado['rechazados'], 0)
+        self.assertEqual(resultado['errores'], ['Error al evaluar alertas: sin conexión'])
+        self.assertEqual(Indicador.objects.count(), 2)
@@ -0,0 +1,112 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, PPDA, Medida, MedidaAvance, Indicador, Actividad
+import datetime
+
+User = get_user_model()
+
+
+@override_settings(RESPUESTAS_CACHE=True)
+class ArbolPPDATests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='testpass123')
+        cls.admin.groups.add(Group.objects.create(name='admin'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.ppda = cls.crear_ppda('PPDA Temuco', medidas=2)
+        cls.otro = cls.crear_ppda('PPDA Coyhaique', medidas=6)
+
+    @classmethod
+    def crear_ppda(cls, nombre, medidas):
+        ppda = PPDA.objects.create(
+            nombre=nombre, fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+            organismo=cls.sea
+        )
+        for i in range(medidas):
+            medida = Medida.objects.create(
+                nombre=f'{nombre} medida {i}', tipo='regulatoria', descripcion='Recambio',
+                fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+                organismo_responsable=cls.sea, ppda=ppda
+            )
+            for j in range(3):
+                MedidaAvance.objects.create(
+                    medida=medida, descripcion=f'Avance {j}', fecha_limite=datetime.date(2024, 1, j + 1)
+                )
+            for j in range(2):
+                Actividad.objects.create(
+                    nombre=f'Actividad {j}', fecha_inicio=datetime.date(2024, 1, j + 1),
+                    fecha_termino=datetime.date(2024, 2, 1), medida=medida, organismo_responsable=cls.sea
+                )
+            Indicador.objects.create(nombre='PM2.5', valor=i, organismo_sectorial=cls.sea, ppda=ppda)
+        return ppda
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.admin.pk))
+
+    def url(self, ppda):
+        return reverse('ppda-arbol', args=[ppda.id])
+
+    def test_arbol_completo(self):
+        response = self.client.get(self.url(self.ppda))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        arbol = response.json()
+        self.assertEqual(arbol['nombre'], 'PPDA Temuco')
+        self.assertEqual([m['nombre'] for m in arbol['medidas']], ['PPDA Temuco medida 0', 'PPDA Temuco medida 1'])
+        medida = arbol['medidas'][0]
+        self.assertEqual(medida['tipoDisplay'], 'Regulatoria')
+        self.assertEqual([a['descripcion'] for a in medida['avances']], ['Avance 0', 'Avance 1', 'Avance 2'])
+        self.assertEqual([a['nombre'] for a in medida['actividades']], ['Actividad 0', 'Actividad 1'])
+        self.assertEqual(medida['actividades'][0]['medidaNombre'], medida['nombre'])
+        self.assertEqual(len(arbol['indicadores']), 2)
+        self.assertEqual({i['ppdaNombre'] for i in arbol['indicadores']}, {'PPDA Temuco'})
+
+    def test_consultas_fijas_sin_importar_el_tamano(self):
+        conteos = []
+        for ppda in (self.ppda, self.otro):
+            cache.clear()
+            self.client.force_authenticate(user=User.objects.get(pk=self.admin.pk))
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.get(self.url(ppda)).status_code, status.HTTP_200_OK)
+            conteos.append(len(consultas))
+        self.assertEqual(conteos[0], conteos[1])
+
+    def test_cache_e_invalidacion(self):
+        self.client.get(self.url(self.ppda))
+        with CaptureQueriesContext(connection) as consultas:
+            etag = self.client.get(self.url(self.ppda))['ETag']
+        self.assertFalse(any('reportes_medidaavance' in c['sql'] for c in consultas.captured_queries))
+
+        response = self.client.get(self.url(self.ppda), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        avance = MedidaAvance.objects.filter(medida__ppda=self.ppda).order_by('id').first()
+        avance.avance = 40
+        avance.save()
+        response = self.client.get(self.url(self.ppda), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['medidas'][0]['avances'][0]['avance'], 40)
+
+    @override_settings(PPDA_ARBOL_MAX_INDICADORES=3)
+    def test_indicadores_mas_recientes(self):
+        indicadores = self.client.get(self.url(self.otro)).json()['indicadores']
+        self.assertEqual([i['valor'] for i in indicadores], [5, 4, 3])
+
+    def test_ppda_inexistente(self):
+        self.assertEqual(self.client.get(reverse('ppda-arbol', args=[0])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_medidas(self):
+        response = self.client.get(reverse('ppda-medidas', args=[self.ppda.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(m['nombre'], m['organismoNombre']) for m in response.json()],
+            [('PPDA Temuco medida 0', 'Servicio de Evaluación Ambiental'),
+             ('PPDA Temuco medida 1', 'Servicio de Evaluación Ambiental')]
+        )
@@ -0,0 +1,52 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from reportes.auditoria import CONSULTAS_AUDITORIA, auditar_consultas, recorrer_plan
+from reportes.models import OrganismoSectorial, MedidaAvance
+
+
+class AuditoriaIndicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        OrganismoSectorial.objects.create(nombre='SEA')
+
+    def test_recorrer_plan(self):
+        plan = {
+            'Node Type': 'Limit',
+            'Plans': [{'Node Type': 'Nested Loop', 'Plans': [
+                {'Node Type': 'Seq Scan', 'Relation Name': 'reportes_medida'},
+                {'Node Type': 'Index Scan', 'Relation Name': 'reportes_medidaavance'},
+            ]}],
+        }
+        self.assertEqual(
+            [nodo['Node Type'] for nodo in recorrer_plan(plan)], ['Limit', 'Nested Loop', 'Seq Scan', 'Index Scan']
+        )
+
+    def test_audita_cada_listado(self):
+        resultados = auditar_consultas(min_filas=10 ** 9)
+        self.assertEqual(len(resultados), sum(len(variantes) for _, variantes in CONSULTAS_AUDITORIA))
+        self.assertEqual(
+            {r['vista'] for r in resultados}, {vista.__name__ for vista, _ in CONSULTAS_AUDITORIA}
+        )
+        self.assertFalse(any(scan['marcado'] for r in resultados for scan in r['seq_scans']))
+
+    def test_indice_por_estado_y_actualizacion(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        resultados = auditar_consultas()
+        avances = [r for r in resultados if r['vista'] == 'MedidaAvanceViewSet' and r['parametros'] == {'estado': 'P'}]
+        self.assertEqual(
+            [scan for scan in avances[0]['seq_scans'] if scan['tabla'] == MedidaAvance._meta.db_table], []
+        )
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('auditar_indices', '--json', '--analyze', stdout=salida)
+        resultados = json.loads(salida.getvalue())
+        self.assertTrue(all(r['ms'] is not None for r in resultados))
+
+        with self.assertRaises(CommandError):
+            call_command('auditar_indices', '--min-filas', '0', '--estricto', stdout=StringIO())
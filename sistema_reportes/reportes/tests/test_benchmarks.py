@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+from reportes.benchmarks import (
+    ENDPOINTS_ASGI, benchmark_asgi, benchmark_endpoints, benchmark_ingesta, comparar_resultados
+)
+from reportes.datos_sinteticos import generar_datos
+from reportes.models import (
+    Actividad, CumplimientoSnapshot, Indicador, IndicadorAgregado, Medida, MedidaAvance, OrganismoSectorial, PPDA,
+    PRIORIDADES, ReporteAnual
+)
+
+
+class GenerarDatosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_volumenes_y_valores_validos(self):
+        creados = generar_datos(indicadores=300, avances=100, actividades=50, ppdas=3, tamano_lote=40)
+        self.assertEqual(creados['indicadores'], Indicador.objects.count())
+        self.assertEqual((creados['avances'], creados['actividades']), (100, 50))
+        self.assertEqual(MedidaAvance.objects.count(), 100)
+        self.assertEqual(Actividad.objects.count(), 50)
+        self.assertEqual(Medida.objects.count(), 10)
+        self.assertEqual(PPDA.objects.count(), 3)
+        self.assertEqual(ReporteAnual.objects.count(), creados['reportes_anuales'])
+        self.assertEqual(OrganismoSectorial.objects.count(), len(OrganismoSectorial.TIPOS_ORGANISMO))
+
+        self.assertTrue(set(Medida.objects.values_list('tipo', flat=True)) <= {t for t, _ in Medida.TIPOS_MEDIDA})
+        self.assertTrue(set(Medida.objects.values_list('prioridad', flat=True)) <= {p for p, _ in PRIORIDADES})
+        for avance in MedidaAvance.objects.all():
+            avance.full_clean()
+        self.assertFalse(Indicador.objects.filter(clave_deduplicacion__isnull=True).exists())
+        self.assertTrue(IndicadorAgregado.objects.exists())
+        self.assertTrue(CumplimientoSnapshot.objects.exists())
+
+    def test_repetible_con_la_misma_semilla(self):
+        generar_datos(avances=20, ppdas=2, agregados=False)
+        primera = list(MedidaAvance.objects.order_by('id').values_list('avance', 'estado', 'fecha_limite'))
+        MedidaAvance.objects.all().delete()
+        generar_datos(avances=20, ppdas=2, agregados=False)
+        segunda = list(MedidaAvance.objects.order_by('id').values_list('avance', 'estado', 'fecha_limite'))
+        self.assertEqual(primera, segunda)
+
+
+class BenchmarksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_endpoints(self):
+        resultados = benchmark_endpoints(filas=40, repeticiones=1)
+        endpoints = {fila['endpoint']: fila for fila in resultados}
+        self.assertIn('ppda-arbol', endpoints)
+        self.assertIn('reporte-anual-resumen-anual', endpoints)
+        self.assertEqual({fila['estado'] for fila in resultados}, {200})
+        self.assertLessEqual(endpoints['indicador-list']['cache_consultas'], endpoints['indicador-list']['consultas'])
+        # Los datos generados se revierten
+        self.assertFalse(Indicador.objects.exists())
+
+    def test_ingesta(self):
+        resultados = benchmark_ingesta(filas=30, repeticiones=2)
+        self.assertEqual(
+            [(f['ruta'], f['carga'], f['insertadas']) for f in resultados],
+            [('snifa', 'nuevas', 30), ('snifa', 'repetidas', 0), ('airecoo', 'nuevas', 30), ('airecoo', 'repetidas', 0)]
+        )
+        self.assertFalse(Indicador.objects.exists())
+
+    def test_comparar_resultados(self):
+        base = {'endpoints': [
+            {'endpoint': 'indicador-list', 'estado': 200, 'ms': 10.0, 'p95_ms': 12.0, 'consultas': 2},
+            {'endpoint': 'ppda-list', 'estado': 200, 'ms': 10.0, 'p95_ms': 12.0, 'consultas': 2},
+        ]}
+        actual = {'endpoints': [
+            {'endpoint': 'indicador-list', 'estado': 200, 'ms': 11.0, 'p95_ms': 40.0, 'consultas': 3},
+            {'endpoint': 'ppda-list', 'estado': 200, 'ms': 15.0, 'p95_ms': 12.0, 'consultas': 2},
+            {'endpoint': 'nuevo', 'estado': 200, 'ms': 99.0, 'p95_ms': 99.0, 'consultas': 9},
+        ]}
+        regresiones = comparar_resultados(base, actual, tolerancia=0.2)
+        self.assertEqual(
+            [(r['fila'], r['metrica']) for r in regresiones], [('indicador-list', 'consultas'), ('ppda-list', 'ms')]
+        )
+
+    def test_comando_guarda_y_compara(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            salida = os.path.join(directorio, 'base.json')
+            call_command('benchmark', 'ingesta', filas=10, repeticiones=1, salida=salida, stdout=StringIO())
+            with open(salida, encoding='utf-8') as archivo:
+                ejecucion = json.load(archivo)
+            self.assertEqual(set(ejecucion), {'metadatos', 'parametros', 'resultados'})
+            self.assertEqual(len(ejecucion['resultados']['ingesta']), 4)
+
+            for fila in ejecucion['resultados']['ingesta']:
+                fila['consultas'] = 0
+            with open(salida, 'w', encoding='utf-8') as archivo:
+                json.dump(ejecucion, archivo)
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark', 'ingesta', filas=10, repeticiones=1, comparar=salida, estricto=True,
+                    stdout=StringIO(), stderr=StringIO()
+                )
+
+
+class BenchmarkAsgiTests(TransactionTestCase):
+    """
+    Con ASGI cada request usa su propio hilo y conexión, así que los datos
+    deben estar confirmados.
+    """
+    def setUp(self):
+        cache.clear()
+        generar_datos(indicadores=200, avances=40, actividades=10, ppdas=2)
+
+    def test_wsgi_y_asgi(self):
+        resultados = benchmark_asgi(repeticiones=2, clientes=3)
+        self.assertEqual(
+            [(fila['endpoint'], fila['servidor']) for fila in resultados],
+            [(endpoint, servidor) for endpoint, *_ in ENDPOINTS_ASGI for servidor in ('wsgi', 'asgi')]
+        )
+        self.assertEqual({fila['estado'] for fila in resultados}, {200})
+        self.assertTrue(all(fila['total_ms'] >= fila['ms'] for fila in resultados))
+        self.assertFalse(User.objects.filter(username__startswith='benchmark-').exists())
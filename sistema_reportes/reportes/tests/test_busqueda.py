@@ -0,0 +1,116 @@
+from django.urls import reverse
+from django.db.models import F
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, PPDA, Medida, MedidaAvance, Actividad, PerfilUsuario
+from reportes.busqueda import CAMPOS_BUSQUEDA, buscar, vector_busqueda
+import datetime
+
+User = get_user_model()
+
+
+def crear_datos(cls):
+    cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+    cls.ppda = PPDA.objects.create(
+        nombre='PPDA Temuco', descripcion='Plan de descontaminación por calefacción a leña',
+        fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31), organismo=cls.sea
+    )
+    cls.medida = Medida.objects.create(
+        nombre='Recambio de calefactores a leña', tipo='no_regulatoria',
+        descripcion='Subsidio para reducir emisiones de material particulado',
+        fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+        organismo_responsable=cls.sea, ppda=cls.ppda
+    )
+    cls.avance = MedidaAvance.objects.create(
+        medida=cls.medida, descripcion='Fiscalización industrial', observaciones='Se reportan emisiones',
+        fecha_limite=datetime.date(2024, 1, 1)
+    )
+    cls.actividad = Actividad.objects.create(
+        nombre='Charlas comunitarias', descripcion=None, fecha_inicio=datetime.date(2024, 1, 1),
+        fecha_termino=datetime.date(2024, 2, 1), medida=cls.medida, organismo_responsable=cls.sea
+    )
+
+
+class BusquedaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        crear_datos(cls)
+
+    def test_trigger_coincide_con_vector(self):
+        for modelo in CAMPOS_BUSQUEDA:
+            for fila in modelo.objects.annotate(esperado=vector_busqueda(modelo)).values('busqueda', 'esperado'):
+                self.assertEqual(fila['busqueda'], fila['esperado'])
+
+    def test_trigger_en_update_y_bulk(self):
+        Actividad.objects.filter(pk=self.actividad.pk).update(descripcion='Educación ambiental')
+        self.assertEqual([r['id'] for r in buscar('educación', ['actividad'])], [self.actividad.pk])
+
+        self.avance.observaciones = 'Sin novedades'
+        MedidaAvance.objects.bulk_update([self.avance], ['observaciones'])
+        self.assertEqual(buscar('novedades', ['avance'])[0]['titulo'], self.medida.nombre)
+
+        MedidaAvance.objects.filter(pk=self.avance.pk).update(avance=F('avance') + 10)
+        self.assertEqual(len(buscar('novedades', ['avance'])), 1)
+
+    def test_ordena_por_relevancia_con_pesos(self):
+        resultados = buscar('leña')
+        # El nombre pesa más que la descripción
+        self.assertEqual(
+            [(r['modelo'], r['id']) for r in resultados], [('medida', self.medida.pk), ('ppda', self.ppda.pk)]
+        )
+        self.assertGreater(resultados[0]['rango'], resultados[1]['rango'])
+
+    def test_sintaxis_web(self):
+        self.assertEqual(
+            {r['modelo'] for r in buscar('emisión')}, {'medida', 'avance'}
+        )
+        self.assertEqual([r['modelo'] for r in buscar('emisiones -industrial')], ['medida'])
+        self.assertEqual(buscar('"calefacción a leña"', ['ppda'])[0]['resumen'], self.ppda.descripcion)
+
+    def test_una_consulta(self):
+        with self.assertNumQueries(1):
+            buscar('leña', limite=1)
+
+
+class BuscarEndpointTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        crear_datos(cls)
+        cls.usuario = User.objects.create_user(username='analista', password='testpass123')
+        cls.usuario.groups.add(Group.objects.create(name='user'))
+        PerfilUsuario.objects.filter(user=cls.usuario).update(organismo=cls.sea)
+
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.get(pk=self.usuario.pk))
+
+    def test_busqueda(self):
+        response = self.client.get(reverse('buscar'), {'q': 'leña', 'modelos': 'ppda,actividad'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['consulta'], 'leña')
+        self.assertEqual([(r['modelo'], r['id']) for r in response.json()['resultados']], [('ppda', self.ppda.pk)])
+
+    def test_parametros_invalidos(self):
+        for parametros in ({}, {'q': ' '}, {'q': 'leña', 'modelos': 'indicador'}, {'q': 'leña', 'limite': 'x'},
+                           {'q': 'leña', 'limite': '0'}):
+            self.assertEqual(self.client.get(reverse('buscar'), parametros).status_code, 400)
+
+    def test_requiere_autenticacion(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse('buscar'), {'q': 'leña'}).status_code, 401)
+
+
+class AdminBusquedaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        crear_datos(cls)
+        cls.admin = User.objects.create_superuser(username='admin', password='testpass123')
+
+    def test_admin_usa_vector(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:reportes_medida_changelist'), {'q': 'emisiones'})
+        self.assertEqual(list(response.context['cl'].queryset), [self.medida])
+        self.assertIn('busqueda', str(response.context['cl'].queryset.query))
+        response = self.client.get(reverse('admin:reportes_ppda_changelist'), {'q': 'subsidio'})
+        self.assertEqual(list(response.context['cl'].queryset), [])
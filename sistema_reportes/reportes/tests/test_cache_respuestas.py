@@ -0,0 +1,154 @@
+import time
+from unittest import mock
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, PPDA, Medida, MedidaAvance, Indicador, PerfilUsuario
+from reportes.cache_respuestas import verificar_cache_compartida
+from reportes.ingesta import guardar_lecturas
+import datetime
+
+User = get_user_model()
+
+
+@override_settings(RESPUESTAS_CACHE=True)
+class CacheRespuestasTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='testpass123')
+        cls.admin.groups.add(Group.objects.create(name='admin'))
+        cls.usuario = User.objects.create_user(username='analista', password='testpass123')
+        cls.usuario.groups.add(Group.objects.create(name='user'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.usuario).update(organismo=cls.sea)
+        cls.ppda = PPDA.objects.create(
+            nombre='PPDA Coyhaique', fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31), organismo=cls.sea
+        )
+        cls.medida = Medida.objects.create(
+            nombre='Recambio', tipo='regulatoria', descripcion='Recambio',
+            fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=cls.sea
+        )
+        cls.avance = MedidaAvance.objects.create(
+            medida=cls.medida, descripcion='Avance', fecha_limite=datetime.date(2024, 6, 30)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.autenticar(self.usuario)
+
+    def autenticar(self, user):
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+
+    def test_etag_sin_last_modified(self):
+        response = self.client.get(reverse('medida-avance-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_304_con_if_none_match(self):
+        url = reverse('medida-avance-detail', args=[self.avance.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_no_da_304_tras_eliminar(self):
+        url = reverse('ppda-list')
+        self.autenticar(self.admin)
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            PPDA.objects.filter(pk=self.ppda.pk).delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_respuesta_cacheada_evita_la_serializacion(self):
+        url = reverse('medida-avance-list')
+        primera = self.client.get(url)
+        # Con cache solo queda la consulta agregada de los validadores
+        with self.assertNumQueries(1):
+            segunda = self.client.get(url)
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertEqual(segunda['ETag'], primera['ETag'])
+
+    def test_escritura_invalida(self):
+        url = reverse('medida-avance-list')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('medida-avance-detail', args=[self.avance.pk]), {'avance': 40}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['avance'], 40)
+
+    def test_cambio_en_modelo_relacionado_invalida(self):
+        url = reverse('medida-avance-list')
+        etag = self.client.get(url)['ETag']
+        Medida.objects.filter(pk=self.medida.pk).update(nombre='Recambio de calefactores')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.medida.nombre = 'Recambio de calefactores'
+        self.medida.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['medidaNombre'], 'Recambio de calefactores')
+
+    def test_lote_invalida(self):
+        url = reverse('medida-avance-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.patch(
+            reverse('medida-avance-lote'), [{'id': self.avance.pk, 'estado': 'C'}], format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['estado'], 'C')
+
+    def test_ingesta_invalida(self):
+        url = reverse('indicador-list')
+        etag = self.client.get(url)['ETag']
+        lectura = Indicador(nombre='PM2.5', valor=10, organismo_sectorial=self.sea)
+        guardar_lecturas([lectura], lambda dato: dato)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_parametros_y_alcance_en_la_clave(self):
+        url = reverse('medida-avance-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'estado': 'P'})['ETag'], etag)
+        admin = User.objects.get(pk=self.admin.pk)
+        admin.groups.add(Group.objects.get(name='user'))
+        self.autenticar(admin)
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_detalle_inexistente(self):
+        self.assertEqual(self.client.get(reverse('medida-avance-detail', args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('medida-avance-detail', args=['abc'])).status_code, 404)
+        self.assertFalse([clave for clave in cache._cache if 'respuesta:' in clave])
+
+    @override_settings(RESPUESTAS_CACHE=False)
+    def test_desactivado(self):
+        with mock.patch('reportes.cache_respuestas.validadores') as validadores:
+            response = self.client.get(reverse('medida-avance-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        validadores.assert_not_called()
+
+
+class CacheCompartidaCheckTests(SimpleTestCase):
+    def test_cache_de_respuestas_requiere_cache_compartida(self):
+        # Los tests usan LocMemCache, que es por proceso
+        with override_settings(RESPUESTAS_CACHE=True):
+            self.assertEqual([error.id for error in verificar_cache_compartida(None)], ['reportes.E001'])
+        with override_settings(RESPUESTAS_CACHE=False):
+            self.assertEqual(verificar_cache_compartida(None), [])
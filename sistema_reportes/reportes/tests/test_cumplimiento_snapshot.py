@@ -0,0 +1,156 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, PPDA, Medida, MedidaAvance, ReporteAnual, CumplimientoSnapshot
+from reportes.cumplimiento import clave_snapshot_avance, recalcular_snapshots
+import datetime
+
+User = get_user_model()
+
+
+class SnapshotBase:
+    @classmethod
+    def setUpTestData(cls):
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG')
+        cls.ppda = PPDA.objects.create(
+            nombre='PPDA Coyhaique',
+            descripcion='Plan de descontaminación',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo=cls.sea
+        )
+        cls.medida = Medida.objects.create(
+            nombre='Recambio de calefactores',
+            tipo='regulatoria',
+            descripcion='Recambio de calefactores a leña',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=cls.sea,
+            ppda=cls.ppda
+        )
+
+    def crear_avance(self, estado, avance, fecha_limite):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MedidaAvance.objects.create(
+                medida=self.medida,
+                descripcion='Avance',
+                fecha_limite=fecha_limite,
+                avance=avance,
+                estado=estado
+            )
+
+    def crear_reporte(self, avance, cumplimiento, periodo=datetime.date(2020, 12, 31)):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ReporteAnual.objects.create(
+                organismo_responsable=self.sea,
+                periodo=periodo,
+                medida=avance,
+                cumplimiento=cumplimiento
+            )
+
+
+class SnapshotIncrementalTests(SnapshotBase, TestCase):
+    def test_snapshot_se_actualiza_con_senales(self):
+        vencido = self.crear_avance('E', 40, datetime.date(2020, 6, 30))
+        self.crear_avance('C', 100, datetime.date(2020, 3, 31))
+        self.crear_avance('P', 10, datetime.date(2020, 9, 30))
+        self.crear_reporte(vencido, 60)
+        self.crear_reporte(vencido, 80)
+
+        snapshot = CumplimientoSnapshot.objects.get(ppda=self.ppda, organismo=self.sea, anio=2020)
+        self.assertEqual(snapshot.avance_promedio, 50)
+        self.assertEqual(snapshot.total_avances, 3)
+        self.assertEqual((snapshot.pendientes, snapshot.en_progreso, snapshot.completados), (1, 1, 1))
+        self.assertEqual(snapshot.vencidos, 2)
+        self.assertEqual(snapshot.cumplimiento_promedio, 70)
+        self.assertEqual(snapshot.total_reportes, 2)
+
+    def test_guardar_no_carga_avance_ni_medida(self):
+        avance = self.crear_avance('P', 10, datetime.date(2020, 6, 30))
+        reporte = self.crear_reporte(avance, 50)
+        avance = MedidaAvance.objects.get(pk=avance.pk)
+        reporte = ReporteAnual.objects.get(pk=reporte.pk)
+        avance.avance = 20
+        reporte.cumplimiento = 60
+        with CaptureQueriesContext(connection) as consultas:
+            avance.save()
+            reporte.save()
+        for columna in ('"reportes_medida"."nombre"', '"reportes_medidaavance"."descripcion"'):
+            self.assertFalse(any(
+                c['sql'].startswith('SELECT') and columna in c['sql'] for c in consultas.captured_queries
+            ), columna)
+        self.assertEqual(clave_snapshot_avance(avance), (self.ppda.id, self.sea.id, 2020))
+
+    def test_cambio_de_anio_recalcula_ambas_claves(self):
+        avance = self.crear_avance('P', 10, datetime.date(2020, 6, 30))
+        avance.fecha_limite = datetime.date(2021, 6, 30)
+        with self.captureOnCommitCallbacks(execute=True):
+            avance.save()
+
+        self.assertFalse(CumplimientoSnapshot.objects.filter(anio=2020).exists())
+        self.assertEqual(CumplimientoSnapshot.objects.get(anio=2021).total_avances, 1)
+
+    def test_cambio_de_organismo_en_medida(self):
+        self.crear_avance('P', 10, datetime.date(2020, 6, 30))
+        self.medida.organismo_responsable = self.sag
+        with self.captureOnCommitCallbacks(execute=True):
+            self.medida.save()
+
+        self.assertEqual(list(CumplimientoSnapshot.objects.values_list('organismo_id', flat=True)), [self.sag.id])
+
+    def test_eliminar_ultimo_avance_elimina_snapshot(self):
+        avance = self.crear_avance('P', 10, datetime.date(2020, 6, 30))
+        with self.captureOnCommitCallbacks(execute=True):
+            avance.delete()
+        self.assertFalse(CumplimientoSnapshot.objects.exists())
+
+    def test_reconstruccion_completa_coincide_con_incremental(self):
+        avance = self.crear_avance('E', 40, datetime.date(2020, 6, 30))
+        self.crear_avance('R', 20, datetime.date(2021, 6, 30))
+        self.crear_reporte(avance, 55)
+        campos = ['ppda_id', 'organismo_id', 'anio', 'avance_promedio', 'total_avances',
+                  'vencidos', 'cumplimiento_promedio', 'total_reportes']
+        incremental = list(CumplimientoSnapshot.objects.order_by('anio').values(*campos))
+
+        self.assertEqual(recalcular_snapshots(), 2)
+        self.assertEqual(list(CumplimientoSnapshot.objects.order_by('anio').values(*campos)), incremental)
+
+
+class DashboardCumplimientoTests(SnapshotBase, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        # Sin alcance por organismo: las pruebas filtran entre organismos
+        cls.user.groups.add(Group.objects.get_or_create(name='auditor')[0])
+
+    def test_dashboard_lee_snapshots_en_una_consulta(self):
+        for anio in (2020, 2021, 2022):
+            self.crear_avance('P', 10, datetime.date(anio, 6, 30))
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        self.client.get(reverse('dashboard-cumplimiento'))
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(reverse('dashboard-cumplimiento'), {'ppda_id': self.ppda.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['anio'] for s in response.data], [2022, 2021, 2020])
+        self.assertEqual(response.data[0]['ppda_nombre'], 'PPDA Coyhaique')
+        self.assertEqual(len(contexto.captured_queries), 1)
+
+        response = self.client.get(reverse('dashboard-cumplimiento'), {'anio': 2021})
+        self.assertEqual(len(response.data), 1)
+
+    def test_parametros_invalidos(self):
+        self.client.force_authenticate(user=self.user)
+        for params in ({'anio': 'abc'}, {'ppda_id': 'x'}, {'organismo_id': '1.5'}):
+            response = self.client.get(reverse('dashboard-cumplimiento'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,131 @@
+import csv
+import io
+import unittest
+import zipfile
+from unittest import mock
+from django.urls import reverse
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Indicador, Medida, MedidaAvance, ReporteAnual
+from reportes.exportacion import parquet_disponible
+import datetime
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+User = get_user_model()
+
+
+class ExportacionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.auditor = User.objects.create_user(username='auditor', password='testpass123')
+        cls.auditor.groups.add(Group.objects.create(name='auditor'))
+        cls.usuario = User.objects.create_user(username='analista', password='testpass123')
+        cls.usuario.groups.add(Group.objects.create(name='user'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.base = base = timezone.make_aware(datetime.datetime(2024, 5, 10, 8, 0))
+        Indicador.objects.bulk_create([
+            Indicador(
+                nombre='PM2.5', valor=i, unidad='µg/m³', organismo_sectorial=cls.sea,
+                fecha_medicion=base + datetime.timedelta(hours=i)
+            )
+            for i in range(50)
+        ])
+        medida = Medida.objects.create(
+            nombre='Recambio de calefactores',
+            tipo='regulatoria',
+            descripcion='Recambio de calefactores a leña',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=cls.sea
+        )
+        avance = MedidaAvance.objects.create(
+            medida=medida, descripcion='Avance "anual", con comas', fecha_limite=datetime.date(2024, 12, 31)
+        )
+        ReporteAnual.objects.create(
+            organismo_responsable=cls.sea, periodo=datetime.date(2024, 12, 31), medida=avance, cumplimiento=75
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.auditor.pk))
+
+    def descargar(self, conjunto, **params):
+        response = self.client.get(reverse('exportar', args=[conjunto]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv(self):
+        response, contenido = self.descargar('medidas-avance')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        filas = list(csv.reader(io.StringIO(contenido.decode('utf-8-sig'))))
+        self.assertEqual(filas[0][:3], ['id', 'medida_id', 'medida'])
+        self.assertEqual(filas[1][5], 'Avance "anual", con comas')
+        self.assertEqual(filas[1][6], '2024-12-31')
+
+    def test_csv_filtros_y_trozos(self):
+        hasta = (self.base + datetime.timedelta(hours=16)).isoformat()
+        with mock.patch('reportes.exportacion.TAMANO_TROZO', 256):
+            response = self.client.get(reverse('exportar', args=['indicadores']), {'hasta': hasta})
+            trozos = list(response.streaming_content)
+        self.assertGreater(len(trozos), 1)
+        filas = list(csv.reader(io.StringIO(b''.join(trozos).decode('utf-8-sig'))))
+        self.assertEqual(len(filas), 1 + 17)
+
+    def test_xlsx_es_zip_valido(self):
+        _, contenido = self.descargar('reportes-anuales', formato='xlsx')
+        archivo = zipfile.ZipFile(io.BytesIO(contenido))
+        self.assertIsNone(archivo.testzip())
+        self.assertIn('xl/worksheets/sheet1.xml', archivo.namelist())
+
+    @unittest.skipIf(openpyxl is None, 'openpyxl no está instalado')
+    def test_xlsx_legible(self):
+        _, contenido = self.descargar('indicadores', formato='xlsx')
+        hoja = openpyxl.load_workbook(io.BytesIO(contenido), read_only=True).active
+        filas = list(hoja.values)
+        self.assertEqual(filas[0][:3], ('id', 'nombre', 'valor'))
+        self.assertEqual(len(filas), 51)
+        self.assertEqual(filas[1][2], 49)
+
+    @unittest.skipUnless(parquet_disponible(), 'pyarrow no está instalado')
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        with self.settings(EXPORTACION_CHUNK_SIZE=20):
+            _, contenido = self.descargar('indicadores', formato='parquet')
+        archivo = pq.ParquetFile(io.BytesIO(contenido))
+        self.assertEqual(archivo.metadata.num_rows, 50)
+        self.assertEqual(archivo.metadata.num_row_groups, 3)
+        tabla = archivo.read()
+        self.assertEqual(str(tabla.schema.field('fecha_medicion').type), 'timestamp[us, tz=UTC]')
+        self.assertEqual(tabla.column('organismo').to_pylist()[0], 'SEA')
+
+    def test_validaciones(self):
+        response = self.client.get(reverse('exportar', args=['usuarios']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('exportar', args=['indicadores']), {'formato': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtros_invalidos_responden_400(self):
+        for conjunto, params in (
+            ('indicadores', {'desde': 'abc'}),
+            ('indicadores', {'organismo_id': 'abc'}),
+            ('medidas-avance', {'ppda_id': '1.5'}),
+            ('actividades', {'medida_id': '99999999999999999999'}),
+            ('reportes-anuales', {'hasta': '2024-13-01'}),
+        ):
+            response = self.client.get(reverse('exportar', args=[conjunto]), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (conjunto, params))
+            self.assertFalse(response.streaming)
+
+    def test_solo_admin_o_auditor(self):
+        self.client.force_authenticate(user=User.objects.get(pk=self.usuario.pk))
+        response = self.client.get(reverse('exportar', args=['indicadores']))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
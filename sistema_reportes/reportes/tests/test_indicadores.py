@@ -0,0 +1,97 @@
+import base64
+import json
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Indicador
+
+User = get_user_model()
+
+
+class IndicadorViewSetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        # Sin alcance por organismo: las pruebas filtran entre organismos
+        cls.user.groups.add(Group.objects.get_or_create(name='auditor')[0])
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG')
+        Indicador.objects.bulk_create([
+            Indicador(
+                nombre='PM2.5' if i % 2 else 'SO2',
+                valor=i,
+                unidad='µg/m³',
+                organismo_sectorial=cls.sea if i % 3 else cls.sag
+            )
+            for i in range(45)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def recorrer(self, params):
+        ids = []
+        url = reverse('indicador-list')
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url, params = response.data['next'], None
+        return ids
+
+    def test_paginacion_keyset_recorre_todo_sin_repetir(self):
+        ids = self.recorrer({'page_size': 10})
+        esperados = list(Indicador.objects.order_by('-fecha_registro', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperados)
+
+    def test_paginas_profundas_sin_count_ni_offset(self):
+        primera = self.client.get(reverse('indicador-list'), {'page_size': 10})
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get(primera.data['next'])
+        sql = ' '.join(q['sql'] for q in contexto.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_cursor_es_condicion_del_indice(self):
+        primera = self.client.get(reverse('indicador-list'), {'page_size': 10})
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get(primera.data['next'])
+        pagina = next(q['sql'] for q in contexto.captured_queries if 'FROM "reportes_indicador"' in q['sql'])
+        with connection.cursor() as cursor:
+            # Con pocas filas el planner preferiría leer la tabla completa
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {pagina}')
+            plan = '\n'.join(fila[0] for fila in cursor.fetchall())
+        self.assertIn('indicador_registro_id_idx', plan)
+        self.assertRegex(plan, r'Index Cond: \(ROW\(("?reportes_indicador"?\.)?fecha_registro, id\) < ROW\(')
+        self.assertNotRegex(plan, r'Filter: .*fecha_registro')
+
+    def test_filtros(self):
+        ids = self.recorrer({'nombre': 'SO2', 'organismo_id': self.sag.id})
+        esperados = Indicador.objects.filter(nombre='SO2', organismo_sectorial=self.sag)
+        esperados = set(esperados.values_list('id', flat=True))
+        self.assertEqual(set(ids), esperados)
+
+    def test_cursor_invalido(self):
+        response = self.client.get(reverse('indicador-list'), {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_con_valores_de_otro_tipo(self):
+        for valores in (['abc', 1], ['2024-01-01', 'x'], [None, 1], [1.5, 2], ['2024-01-01', [1]]):
+            cursor = base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+            response = self.client.get(reverse('indicador-list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, valores)
+
+    def test_filtros_invalidos(self):
+        for params in ({'organismo_id': 'abc'}, {'ppda_id': '1.5'}, {'desde': 'ayer'}, {'hasta': '2024-02-30'}):
+            response = self.client.get(reverse('indicador-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        response = self.client.get(reverse('indicador-list'), {'desde': '2000-01-01', 'organismo_id': ''})
+        self.assertEqual(len(response.data['results']), 20)
@@ -0,0 +1,95 @@
+import json
+from unittest import mock
+from django.test import TestCase, override_settings
+from reportes.models import OrganismoSectorial, Indicador
+from reportes.ingesta import guardar_datos_snifa, guardar_datos_airecoo
+from reportes.integraciones import iterar_json_array
+
+
+def en_trozos(texto, tamano):
+    datos = texto.encode()
+    return (datos[i:i + tamano] for i in range(0, len(datos), tamano))
+
+
+class IterarJsonArrayTests(TestCase):
+    def test_elementos_partidos_entre_trozos(self):
+        registros = [{'nombre': 'PM2.5', 'valor': 12.5, 'unidad': 'µg/m³'}, {'n': [1, 2, {'x': 'a,]'}]}, 123, 'á']
+        texto = json.dumps(registros, ensure_ascii=False)
+        for tamano in (1, 2, 3, 7, 1000):
+            self.assertEqual(list(iterar_json_array(en_trozos(texto, tamano))), registros)
+
+    def test_arreglo_vacio_y_errores(self):
+        self.assertEqual(list(iterar_json_array([b' [ ] '])), [])
+        with self.assertRaises(ValueError):
+            list(iterar_json_array([b'{"a": 1}']))
+        with self.assertRaises(ValueError):
+            list(iterar_json_array([b'[{"a": 1}, {"b"']))
+
+
+class GuardarLecturasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+
+    def test_rechazados_no_abortan_la_carga(self):
+        datos = [
+            {'nombre': 'PM2.5', 'valor': 10, 'unidad': 'µg/m³'},
+            {'nombre': 'PM2.5', 'valor': 'no-numerico', 'unidad': 'µg/m³'},
+            {'nombre': 'PM10', 'unidad': 'µg/m³'},
+            {'nombre': 'x' * 300, 'valor': 1, 'unidad': 'µg/m³'},
+            {'nombre': 'PM10', 'valor': 20, 'unidad': 'µg/m³'},
+        ]
+        with override_settings(INTEGRACION_ORGANISMO_ID=self.organismo.id):
+            resultado = guardar_datos_airecoo(datos, tamano_lote=2)
+
+        self.assertEqual(resultado['recibidos'], 5)
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual(resultado['rechazados'], 3)
+        self.assertEqual(len(resultado['errores']), 3)
+        self.assertEqual(Indicador.objects.count(), 2)
+
+    def test_stream_se_consume_por_lotes(self):
+        consumidos = []
+
+        def stream():
+            for i in range(25):
+                consumidos.append(i)
+                yield {'parametro': 'PM10', 'valor': i}
+
+        tamanos = []
+        bulk_create = Indicador.objects.bulk_create
+
+        def espiar(objs, *args, **kwargs):
+            # Al insertar un lote no se ha leído más allá de ese lote
+            tamanos.append((len(objs), len(consumidos)))
+            return bulk_create(objs, *args, **kwargs)
+
+        with override_settings(INTEGRACION_ORGANISMO_ID=self.organismo.id):
+            with mock.patch.object(Indicador.objects, 'bulk_create', side_effect=espiar):
+                resultado = guardar_datos_snifa(stream(), tamano_lote=10)
+
+        self.assertEqual(resultado['insertados'], 25)
+        self.assertEqual(tamanos, [(10, 10), (10, 20), (5, 25)])
+
+    def test_recarga_idempotente(self):
+        datos = [
+            {'nombre': 'PM2.5', 'valor': i, 'unidad': 'µg/m³', 'estacion': 'Quintero', 'fecha': f'2024-05-10T{i:02d}'}
+            for i in range(10)
+        ]
+        with override_settings(INTEGRACION_ORGANISMO_ID=self.organismo.id):
+            primero = guardar_datos_airecoo(datos)
+            with mock.patch.object(Indicador.objects, 'bulk_create') as bulk_create:
+                repetido = guardar_datos_airecoo(datos + datos[:3])
+            datos[0]['valor'] = 99
+            corregido = guardar_datos_airecoo(datos[:5])
+
+        self.assertEqual(primero['insertados'], 10)
+        self.assertEqual((repetido['insertados'], repetido['sin_cambios']), (0, 13))
+        bulk_create.assert_not_called()
+        self.assertEqual((corregido['insertados'], corregido['actualizados'], corregido['sin_cambios']), (0, 1, 4))
+        self.assertEqual(Indicador.objects.count(), 10)
+        self.assertEqual(Indicador.objects.filter(valor=99).count(), 1)
+
+    def test_datos_que_no_son_lista(self):
+        with self.assertRaises(ValueError):
+            guardar_datos_snifa({'parametro': 'PM10', 'valor': 1})
@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Medida, Actividad, PerfilUsuario
+from reportes.instrumentacion import PresupuestoConsultasExcedido, estadisticas_consultas
+from reportes.views import ActividadViewSet, ReporteAnualViewSet
+import datetime
+
+User = get_user_model()
+
+
+class InstrumentacionSQLTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        cls.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=cls.organismo)
+
+    def setUp(self):
+        cache.clear()
+
+    def consultar(self, user, url, **params):
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+        return self.client.get(url, params)
+
+    def test_registra_estadisticas_por_vista_y_accion(self):
+        for _ in range(2):
+            self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+        self.consultar(self.user, reverse('indicadores-series'))
+
+        estadisticas = {fila['endpoint']: fila for fila in estadisticas_consultas()}
+        resumen = estadisticas['ReporteAnualViewSet.resumen_anual']
+        self.assertEqual(resumen['peticiones'], 2)
+        self.assertEqual(resumen['presupuesto'], 4)
+        self.assertEqual(resumen['excedidas'], 0)
+        self.assertGreater(resumen['consultas'], 0)
+        self.assertTrue(any('reportes_reporteanual' in c['sql'] for c in resumen['lentas']))
+        self.assertEqual(estadisticas['series_indicadores']['peticiones'], 1)
+
+    @override_settings(SQL_PRESUPUESTO_ESTRICTO=True)
+    def test_presupuesto_excedido_lanza_en_modo_estricto(self):
+        with mock.patch.object(ReporteAnualViewSet, 'presupuesto_consultas', {'resumen_anual': 0}):
+            with self.assertRaises(PresupuestoConsultasExcedido):
+                self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+
+    @override_settings(SQL_PRESUPUESTO_ESTRICTO=True)
+    def test_escritura_sobre_presupuesto_solo_registra_warning(self):
+        # La escritura ya está confirmada: un 500 haría que el cliente la reintente
+        medida = Medida.objects.create(
+            nombre='Recambio', tipo='no_regulatoria', fecha_inicio=datetime.date(2024, 1, 1),
+            fecha_termino=datetime.date(2024, 12, 31), organismo_responsable=self.organismo
+        )
+        datos = {
+            'nombre': 'Taller', 'fechaInicio': '2024-03-01', 'fechaTermino': '2024-03-02',
+            'medida': medida.id, 'organismoResponsable': self.organismo.id,
+        }
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        with mock.patch.object(ActividadViewSet, 'presupuesto_consultas', {'create': 0}):
+            with self.assertLogs('reportes.instrumentacion', level='WARNING'):
+                response = self.client.post(reverse('actividad-list'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Actividad.objects.filter(nombre='Taller').exists())
+
+    @override_settings(SQL_ESTADISTICAS_MUESTREO=0)
+    def test_sin_muestreo_no_registra(self):
+        self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+        self.assertEqual(estadisticas_consultas(), [])
+
+    @override_settings(SQL_PRESUPUESTO_ESTRICTO=False)
+    def test_presupuesto_excedido_registra_warning(self):
+        with mock.patch.object(ReporteAnualViewSet, 'presupuesto_consultas', {'resumen_anual': 0}):
+            with self.assertLogs('reportes.instrumentacion', level='WARNING'):
+                response = self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(estadisticas_consultas()[0]['excedidas'], 1)
+
+    def test_endpoint_solo_staff(self):
+        self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+        response = self.consultar(self.user, reverse('diagnostico-consultas'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.consultar(self.staff, reverse('diagnostico-consultas'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ReporteAnualViewSet.resumen_anual', [fila['endpoint'] for fila in response.data])
+
+    def test_comando_estadisticas(self):
+        self.consultar(self.user, reverse('reporte-anual-resumen-anual'))
+        salida = StringIO()
+        call_command('estadisticas_consultas', stdout=salida)
+        self.assertIn('ReporteAnualViewSet.resumen_anual', salida.getvalue())
+
+        call_command('estadisticas_consultas', '--reiniciar', stdout=StringIO())
+        self.assertEqual(estadisticas_consultas(), [])
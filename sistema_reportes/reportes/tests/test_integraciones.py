@@ -0,0 +1,191 @@
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+from django.urls import reverse
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Indicador, EstadoIntegracion, EjecucionSincronizacion
+from reportes import ingesta
+from reportes.sincronizacion import adquirir_bloqueo, fuentes_en_curso, liberar_bloqueo
+from reportes.tasks import tarea_integrar_fuentes, tarea_integrar_snifa
+from reportes.tests.servidor_stub import ServidorStub
+
+User = get_user_model()
+
+DATOS_SNIFA = [{'parametro': 'PM10', 'valor': 40 + i} for i in range(50)]
+DATOS_AIRECOO = [{'nombre': 'PM2.5', 'valor': 10 + i, 'unidad': 'µg/m³'} for i in range(50)]
+
+
+@contextmanager
+def bloqueo_en_otra_conexion(fuente):
+    """
+    Mantiene tomado el bloqueo de la fuente desde otro hilo, con su propia
+    conexión, como lo haría otro worker.
+    """
+    tomado, soltar = threading.Event(), threading.Event()
+    resultado = {}
+
+    def sostener():
+        try:
+            resultado['tomado'] = adquirir_bloqueo(fuente)
+            tomado.set()
+            soltar.wait()
+            liberar_bloqueo(fuente)
+        finally:
+            connection.close()
+
+    hilo = threading.Thread(target=sostener)
+    hilo.start()
+    tomado.wait()
+    try:
+        yield resultado['tomado']
+    finally:
+        soltar.set()
+        hilo.join()
+
+
+class IntegracionConcurrenteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fuentes_se_descargan_en_paralelo(self):
+        demora = 0.4
+        rutas = {'/snifa': DATOS_SNIFA, '/airecoo': DATOS_AIRECOO}
+        with ServidorStub(rutas, demora=demora) as stub:
+            with override_settings(
+                SNIFA_API_URL=stub.url('/snifa'),
+                AIRECOO_API_URL=stub.url('/airecoo'),
+                INTEGRACION_ORGANISMO_ID=self.organismo.id,
+            ):
+                inicio = time.monotonic()
+                resultado = tarea_integrar_fuentes.apply().get()
+                duracion = time.monotonic() - inicio
+
+        self.assertEqual(resultado['snifa']['insertados'], 50)
+        self.assertEqual(resultado['airecoo']['insertados'], 50)
+        self.assertLess(duracion, demora * 2)
+        self.assertEqual(Indicador.objects.filter(fuente='SNIFA').count(), 50)
+        self.assertEqual(Indicador.objects.filter(fuente='Airecoo').count(), 50)
+
+    def test_fuente_caida_no_detiene_la_otra(self):
+        with ServidorStub({'/airecoo': DATOS_AIRECOO}) as stub:
+            with override_settings(
+                SNIFA_API_URL=stub.url('/no-existe'),
+                AIRECOO_API_URL=stub.url('/airecoo'),
+                INTEGRACION_ORGANISMO_ID=self.organismo.id,
+                INTEGRACION_REINTENTOS=0,
+            ):
+                resultado = tarea_integrar_fuentes.apply().get()
+
+        self.assertEqual(resultado['snifa']['insertados'], 0)
+        self.assertEqual(len(resultado['snifa']['errores']), 1)
+        self.assertEqual(resultado['airecoo']['insertados'], 50)
+
+    def test_marca_de_agua_por_fuente(self):
+        datos = [
+            {'parametro': 'PM10', 'valor': 40, 'fecha': '2024-05-10T08:00:00+00:00'},
+            {'parametro': 'PM10', 'valor': 41, 'fecha': '2024-05-10T09:00:00+00:00'},
+        ]
+        with ServidorStub({'/snifa': datos}) as stub:
+            with override_settings(SNIFA_API_URL=stub.url('/snifa'), INTEGRACION_ORGANISMO_ID=self.organismo.id):
+                primera = tarea_integrar_snifa.apply().get()
+                segunda = tarea_integrar_snifa.apply().get()
+
+        self.assertEqual(primera['snifa']['insertados'], 2)
+        self.assertEqual(segunda['snifa']['insertados'], 0)
+        self.assertEqual(Indicador.objects.filter(fuente='SNIFA').count(), 2)
+        estado = EstadoIntegracion.objects.get(fuente='snifa')
+        self.assertEqual(estado.ultima_medicion.isoformat(), '2024-05-10T09:00:00+00:00')
+        self.assertNotIn('desde=', stub.solicitudes[0])
+        self.assertIn('desde=2024-05-10T09', stub.solicitudes[1])
+
+    def test_lote_fallido_no_avanza_la_marca(self):
+        datos = [
+            {'parametro': 'PM10', 'valor': 40, 'fecha': '2024-05-10T08:00:00+00:00'},
+            {'parametro': 'PM10', 'valor': 41, 'fecha': '2024-05-10T09:00:00+00:00'},
+        ]
+        guardar_lote = ingesta._guardar_lote
+
+        def falla_el_primero(lote, resultado):
+            if lote[0].valor == 40:
+                raise DatabaseError('sin conexión')
+            return guardar_lote(lote, resultado)
+
+        with ServidorStub({'/snifa': datos}) as stub:
+            with override_settings(
+                SNIFA_API_URL=stub.url('/snifa'), INTEGRACION_ORGANISMO_ID=self.organismo.id,
+                INTEGRACION_TAMANO_LOTE=1,
+            ), mock.patch('reportes.ingesta._guardar_lote', side_effect=falla_el_primero):
+                with self.assertLogs('reportes.ingesta', level='ERROR'):
+                    resultado = tarea_integrar_snifa.apply().get()
+
+        self.assertEqual((resultado['snifa']['insertados'], resultado['snifa']['rechazados']), (1, 1))
+        self.assertIsNone(EstadoIntegracion.objects.get(fuente='snifa').ultima_medicion)
+        ejecucion = EjecucionSincronizacion.objects.get(fuente='snifa')
+        self.assertEqual(ejecucion.estado, 'fallida')
+        self.assertIn('sin conexión', ejecucion.error)
+
+    def test_ejecuciones_registradas_y_bloqueo(self):
+        with ServidorStub({'/snifa': DATOS_SNIFA}) as stub:
+            with override_settings(SNIFA_API_URL=stub.url('/snifa'), INTEGRACION_ORGANISMO_ID=self.organismo.id):
+                tarea_integrar_snifa.apply().get()
+                with bloqueo_en_otra_conexion('snifa') as tomado:
+                    self.assertTrue(tomado)
+                    self.assertEqual(fuentes_en_curso(), {'snifa'})
+                    resultado = tarea_integrar_snifa.apply().get()
+
+        self.assertEqual(resultado, {'snifa': {'omitida': True}})
+        exitosa = EjecucionSincronizacion.objects.get(fuente='snifa', estado='exitosa')
+        self.assertEqual((exitosa.filas_obtenidas, exitosa.filas_insertadas), (50, 50))
+        self.assertIsNotNone(exitosa.duracion)
+        self.assertTrue(EjecucionSincronizacion.objects.filter(fuente='snifa', estado='omitida').exists())
+        # Las corridas liberan su bloqueo aunque la conexión siga abierta
+        self.assertEqual(fuentes_en_curso(), set())
+        self.assertTrue(adquirir_bloqueo('snifa'))
+        liberar_bloqueo('snifa')
+
+
+class IntegracionViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin1', password='testpass123')
+        cls.admin.groups.add(Group.objects.create(name='admin'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_integrar_encola_y_retorna_job_id(self):
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch('reportes.views.tarea_integrar_snifa.delay') as delay:
+            delay.return_value.id = 'abc-123'
+            response = self.client.post(reverse('integrar_snifa'))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()['job_id'], 'abc-123')
+        delay.assert_called_once_with()
+
+    def test_estado_integraciones(self):
+        EstadoIntegracion.objects.create(fuente='snifa', ultima_medicion=timezone.now())
+        EjecucionSincronizacion.objects.create(
+            fuente='snifa', estado='exitosa', fin=timezone.now(), duracion=2, filas_obtenidas=100, filas_insertadas=80
+        )
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('estado_integraciones'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        fuentes = {f['fuente']: f for f in response.data}
+        self.assertEqual(fuentes['snifa']['throughput_filas_segundo'], 50)
+        self.assertEqual(fuentes['snifa']['ultima_ejecucion']['filas_insertadas'], 80)
+        self.assertIsNotNone(fuentes['snifa']['rezago_segundos'])
+        self.assertIsNone(fuentes['airecoo']['ultima_ejecucion'])
@@ -0,0 +1,132 @@
+import json
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
+from rest_framework.utils.encoders import JSONEncoder
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from djangorestframework_camel_case.util import camelize
+from reportes.models import OrganismoSectorial, PPDA, Medida, MedidaAvance, Indicador, Actividad, ReporteAnual
+from reportes.serializers import (
+    PPDASerializer, MedidaAvanceSerializer, IndicadorSerializer, ActividadSerializer, ReporteAnualSerializer
+)
+from reportes.views import ActividadViewSet
+from reportes.benchmarks import benchmark_listas
+import datetime
+import shutil
+import tempfile
+
+User = get_user_model()
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL, RESPUESTAS_CACHE=True)
+class ListaValoresTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='testpass123')
+        cls.admin.groups.add(Group.objects.create(name='admin'))
+        sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.ppda = PPDA.objects.create(
+            nombre='PPDA Coyhaique', fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31), organismo=sea
+        )
+        PPDA.objects.create(
+            nombre='PPDA sin organismo', fecha_inicio=datetime.date(2021, 1, 1),
+            fecha_termino=datetime.date(2031, 12, 31)
+        )
+        medida = Medida.objects.create(
+            nombre='Recambio', tipo='no_regulatoria', descripcion='Recambio',
+            fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=sea, ppda=cls.ppda
+        )
+        avances = [
+            MedidaAvance.objects.create(
+                medida=medida, descripcion=f'Avance {i}', fecha_limite=datetime.date(2024, 1, i + 1),
+                avance=i * 10, estado='PECR'[i % 4]
+            )
+            for i in range(5)
+        ]
+        for i in range(5):
+            Indicador.objects.create(
+                nombre='PM2.5', valor=i / 3, unidad='µg/m³', organismo_sectorial=sea,
+                ppda=cls.ppda if i % 2 else None
+            )
+        indicador = Indicador.objects.first()
+        indicador.medio_verificacion.save('acta.pdf', ContentFile(b'%PDF'))
+        for i in range(3):
+            ReporteAnual.objects.create(
+                organismo_responsable=sea, periodo=datetime.date(2024 - i, 12, 31),
+                medida=avances[i], cumplimiento=50 + i
+            )
+            Actividad.objects.create(
+                nombre=f'Actividad {i}', fecha_inicio=datetime.date(2024, 1, i + 1),
+                fecha_termino=datetime.date(2024, 12, 31), medida=medida, organismo_responsable=sea
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    maxDiff = None
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.admin.pk))
+
+    def esperado(self, serializer_class, queryset, request=None):
+        serializer = serializer_class(queryset, many=True, context={'request': request})
+        legibles = [nombre for nombre, campo in serializer.child.fields.items() if not campo.write_only]
+        # El serializer omite la clave cuando la relación es nula; la lista la entrega como null
+        filas = [{campo: fila.get(campo) for campo in legibles} for fila in serializer.data]
+        return camelize(json.loads(json.dumps(filas, cls=JSONEncoder)))
+
+    def test_misma_salida_que_el_serializer(self):
+        casos = [
+            ('ppda-list', PPDASerializer, PPDA.objects.order_by('-fecha_creacion')),
+            ('medida-avance-list', MedidaAvanceSerializer, MedidaAvance.objects.order_by('-fecha_actualizacion')),
+            ('indicador-list', IndicadorSerializer, Indicador.objects.order_by('-fecha_registro', '-id')),
+            ('reporte-anual-list', ReporteAnualSerializer, ReporteAnual.objects.order_by('-periodo')),
+        ]
+        for nombre, serializer_class, queryset in casos:
+            with self.subTest(nombre):
+                response = self.client.get(reverse(nombre))
+                self.assertEqual(response.status_code, 200)
+                esperado = self.esperado(serializer_class, queryset, response.wsgi_request)
+                self.assertEqual(response.json()['results'], esperado)
+
+    def test_etiquetas_y_archivos(self):
+        avance = self.client.get(reverse('medida-avance-list')).json()['results'][0]
+        self.assertEqual(avance['medidaTipo'], 'No Regulatoria')
+        indicadores = self.client.get(reverse('indicador-list')).json()['results']
+        urls = [i['medioVerificacion'] for i in indicadores if i['medioVerificacion']]
+        self.assertEqual(len(urls), 1)
+        self.assertTrue(urls[0].startswith('http://testserver/'))
+
+    def test_actividades(self):
+        request = APIRequestFactory().get('/api/actividades/')
+        force_authenticate(request, user=User.objects.get(pk=self.admin.pk))
+        response = ActividadViewSet.as_view({'get': 'list'})(request)
+        response.render()
+        esperado = self.esperado(ActividadSerializer, Actividad.objects.order_by('-fecha_inicio'))
+        self.assertEqual(json.loads(response.content)['results'], esperado)
+
+    def test_consultas_constantes(self):
+        for i in range(20):
+            ReporteAnual.objects.create(
+                organismo_responsable=OrganismoSectorial.objects.get(), periodo=datetime.date(2000 + i, 1, 1),
+                medida=MedidaAvance.objects.first(), cumplimiento=10
+            )
+        # grupos, validadores, count y página, más la carga en frío de los organismos
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('reporte-anual-list'))
+        self.assertEqual(response.json()['count'], 23)
+
+    def test_benchmark(self):
+        resultados = benchmark_listas(filas=20, repeticiones=1)
+        self.assertEqual([r['lista'] for r in resultados], ['medidas-avance', 'indicadores'])
+        self.assertTrue(all(r['values_filas_s'] > 0 for r in resultados))
+        self.assertEqual(MedidaAvance.objects.count(), 5)
@@ -0,0 +1,114 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Medida, MedidaAvance, CumplimientoSnapshot, PerfilUsuario
+import datetime
+
+User = get_user_model()
+
+
+class MedidaAvanceLoteTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=cls.sea)
+        cls.medidas = [
+            Medida.objects.create(
+                nombre=f'Medida {i}',
+                tipo='regulatoria',
+                descripcion='Medida del plan',
+                fecha_inicio=datetime.date(2020, 1, 1),
+                fecha_termino=datetime.date(2030, 12, 31),
+                organismo_responsable=cls.sea
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+    def lote(self, cantidad, **campos):
+        return [
+            {
+                'medida': self.medidas[i % len(self.medidas)].id,
+                'descripcion': f'Avance {i}',
+                'fecha_limite': '2025-06-30',
+                'avance': 10,
+                **campos,
+            }
+            for i in range(cantidad)
+        ]
+
+    def crear(self, datos):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('medida-avance-lote'), datos, format='json')
+
+    def test_crear_lote_con_consultas_constantes(self):
+        # El primer lote crea el snapshot; los siguientes solo lo actualizan
+        self.crear(self.lote(1))
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        with CaptureQueriesContext(connection) as pocos:
+            response = self.crear(self.lote(3))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        with CaptureQueriesContext(connection) as muchos:
+            response = self.crear(self.lote(60))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 60)
+        self.assertTrue(all(item['id'] for item in response.data))
+        self.assertEqual(response.data[0]['medida_nombre'], 'Medida 0')
+        self.assertEqual(len(pocos.captured_queries), len(muchos.captured_queries))
+        self.assertEqual(CumplimientoSnapshot.objects.get(anio=2025).total_avances, 64)
+
+    def test_lote_invalido_no_crea_nada(self):
+        datos = self.lote(3)
+        datos[1]['avance'] = 150
+        datos[2]['medida'] = 999999
+        response = self.crear(datos)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('avance', response.data[1])
+        self.assertIn('medida', response.data[2])
+        self.assertFalse(MedidaAvance.objects.exists())
+
+    def test_actualizar_lote(self):
+        ids = [item['id'] for item in self.crear(self.lote(4)).data]
+        datos = [{'id': pk, 'avance': 100, 'estado': 'C'} for pk in ids[:3]]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse('medida-avance-lote'), datos, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(MedidaAvance.objects.filter(estado='C').order_by('id').values_list('id', flat=True)), ids[:3]
+        )
+        self.assertEqual(MedidaAvance.objects.get(pk=ids[3]).avance, 10)
+        self.assertEqual(CumplimientoSnapshot.objects.get(anio=2025).completados, 3)
+
+    def test_actualizar_lote_con_ids_inexistentes(self):
+        response = self.client.patch(reverse('medida-avance-lote'), [{'id': 999999, 'avance': 50}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['ids'], [999999])
+
+    def test_actualizacion_individual_guarda_una_vez(self):
+        avance = MedidaAvance.objects.create(
+            medida=self.medidas[0], descripcion='Avance', fecha_limite=datetime.date(2025, 6, 30)
+        )
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.patch(
+                reverse('medida-avance-detail', args=[avance.pk]), {'avance': 40}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [q for q in contexto.captured_queries if q['sql'].startswith('UPDATE "reportes_medidaavance"')]
+        self.assertEqual(len(updates), 1)
@@ -0,0 +1,66 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.grupos import grupos_de_usuario
+
+User = get_user_model()
+
+
+class GruposDeUsuarioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Group.objects.create(name='admin')
+        cls.auditor = Group.objects.create(name='auditor')
+        cls.user = User.objects.create_user(username='admin1', password='testpass123')
+        cls.user.groups.add(cls.admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_grupos_memorizados_en_usuario_y_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(grupos_de_usuario(self.user), {'admin'})
+            grupos_de_usuario(self.user)
+
+        otra_instancia = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(grupos_de_usuario(otra_instancia), {'admin'})
+
+    def test_invalidacion_al_cambiar_grupos(self):
+        grupos_de_usuario(self.user)
+        self.user.groups.add(self.auditor)
+        self.assertEqual(grupos_de_usuario(User.objects.get(pk=self.user.pk)), {'admin', 'auditor'})
+
+        grupos_de_usuario(User.objects.get(pk=self.user.pk))
+        self.admin.user_set.clear()
+        self.assertEqual(grupos_de_usuario(User.objects.get(pk=self.user.pk)), {'auditor'})
+
+
+class PermisosJWTTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin1', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='admin'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_token_incluye_grupos_y_evita_consulta(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'admin1',
+            'password': 'testpass123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cache.clear()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(reverse('organismo-sectorial-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('auth_user_groups' in q['sql'] for q in contexto.captured_queries))
@@ -0,0 +1,106 @@
+from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from reportes.models import OrganismoSectorial, Indicador, PerfilUsuario
+from reportes.referencias import nombres_organismo_por_id, organismos
+from reportes.serializers import IndicadorSerializer
+
+User = get_user_model()
+
+
+class OrganismosCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG', telefono='123')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lista_desde_cache(self):
+        with self.assertNumQueries(1):
+            primera = organismos()
+        with self.assertNumQueries(0):
+            self.assertEqual(organismos(), primera)
+        self.assertEqual([o['nombre'] for o in primera], ['SAG', 'SEA'])
+        self.assertEqual(primera[1]['nombre_display'], 'Servicio de Evaluación Ambiental')
+
+    def test_guardar_y_eliminar_invalidan(self):
+        organismos()
+        self.sag.telefono = '999'
+        self.sag.save()
+        self.assertEqual(organismos()[0]['telefono'], '999')
+        OrganismoSectorial.objects.create(nombre='CONAF')
+        self.assertEqual(len(organismos()), 3)
+        self.sea.delete()
+        self.assertNotIn(self.sea.pk, nombres_organismo_por_id())
+
+    def test_serializer_sin_join_ni_consulta_por_fila(self):
+        for i in range(5):
+            Indicador.objects.create(nombre='PM2.5', valor=i, organismo_sectorial=self.sea if i % 2 else self.sag)
+        organismos()
+        with self.assertNumQueries(1):
+            data = IndicadorSerializer(Indicador.objects.all(), many=True).data
+        self.assertEqual(
+            {fila['organismo_nombre'] for fila in data},
+            {'Servicio de Evaluación Ambiental', 'Servicio Agrícola y Ganadero'}
+        )
+        # Con la relación ya cargada no se usa la cache
+        indicador = Indicador.objects.select_related('organismo_sectorial').first()
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(IndicadorSerializer(indicador).data['organismo_nombre'])
+
+
+class ListasSinJoinTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(username='analista', password='testpass123')
+        cls.usuario.groups.add(Group.objects.create(name='user'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        Indicador.objects.create(nombre='PM2.5', valor=1, organismo_sectorial=cls.sea)
+        PerfilUsuario.objects.filter(user=cls.usuario).update(organismo=cls.sea)
+
+    def test_indicadores_sin_join_a_organismos(self):
+        cache.clear()
+        organismos()
+        self.client.force_authenticate(user=User.objects.get(pk=self.usuario.pk))
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('indicador-list'))
+        self.assertEqual(response.json()['results'][0]['organismoNombre'], 'Servicio de Evaluación Ambiental')
+        self.assertFalse(any('reportes_organismosectorial' in c['sql'] for c in consultas.captured_queries))
+
+
+class PermisosCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grupo = Group.objects.create(name='auditor')
+        cls.user = User.objects.create_user(username='auditor', password='testpass123')
+        cls.user.groups.add(cls.grupo)
+        cls.permiso = Permission.objects.get(codename='view_indicador')
+
+    def setUp(self):
+        cache.clear()
+
+    def usuario(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_has_perm_desde_cache(self):
+        self.assertFalse(self.usuario().has_perm('reportes.view_indicador'))
+        user = self.usuario()
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_perm('reportes.view_indicador'))
+
+    def test_cambios_de_permisos_invalidan(self):
+        self.assertFalse(self.usuario().has_perm('reportes.view_indicador'))
+        self.grupo.permissions.add(self.permiso)
+        self.assertTrue(self.usuario().has_perm('reportes.view_indicador'))
+        user = self.usuario()
+        user.groups.remove(self.grupo)
+        self.assertFalse(self.usuario().has_perm('reportes.view_indicador'))
+        user.user_permissions.add(self.permiso)
+        self.assertTrue(self.usuario().has_perm('reportes.view_indicador'))
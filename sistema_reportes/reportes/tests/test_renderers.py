@@ -0,0 +1,79 @@
+import json
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from reportes.models import OrganismoSectorial, Medida, MedidaAvance, PerfilUsuario
+from reportes.renderers import CamelCaseORJSONRenderer
+from reportes.serializers import MedidaAvanceSerializer
+from reportes.benchmarks import benchmark_renderizado
+import datetime
+
+User = get_user_model()
+
+
+class CamelCaseORJSONRendererTests(SimpleTestCase):
+    def renderizar(self, data):
+        return json.loads(CamelCaseORJSONRenderer().render(data)), json.loads(CamelCaseJSONRenderer().render(data))
+
+    def test_misma_salida_que_el_renderer_actual(self):
+        organismo = OrganismoSectorial(id=1, nombre='SEA')
+        medida = Medida(id=3, nombre='Recambio', tipo='regulatoria', organismo_responsable=organismo)
+        avances = [
+            MedidaAvance(id=i, medida=medida, descripcion='Avance', fecha_limite=datetime.date(2024, 1, i), avance=i)
+            for i in range(1, 4)
+        ]
+        rapido, actual = self.renderizar(MedidaAvanceSerializer(avances, many=True).data)
+        self.assertEqual(rapido, actual)
+        self.assertIn('medidaNombre', rapido[0])
+        self.assertIn('fechaLimite', rapido[0])
+
+    def test_datos_sin_serializer_y_anidados(self):
+        data = {
+            'next_page': None,
+            'results': [{'organismo_id': 1, 'sub_items': [{'valor_2': 2.5}]}],
+            'periodo_inicio': datetime.date(2024, 1, 1),
+        }
+        rapido, actual = self.renderizar(data)
+        self.assertEqual(rapido, actual)
+        self.assertEqual(rapido['results'][0]['subItems'][0], {'valor2': 2.5})
+
+    def test_errores_de_validacion(self):
+        serializer = MedidaAvanceSerializer(data={'avance': 150})
+        serializer.is_valid()
+        rapido, actual = self.renderizar(serializer.errors)
+        self.assertEqual(rapido, actual)
+        self.assertIn('fechaLimite', rapido)
+
+    def test_benchmark(self):
+        resultados = benchmark_renderizado(filas=20, repeticiones=1)
+        self.assertEqual(
+            [r['payload'] for r in resultados], ['MedidaAvanceSerializer', 'IndicadorSerializer']
+        )
+        self.assertTrue(all(r['camelcase_orjson_ms'] >= 0 for r in resultados))
+
+
+class RendererPorViewSetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        sea = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=sea)
+        medida = Medida.objects.create(
+            nombre='Recambio', tipo='regulatoria', descripcion='Recambio',
+            fecha_inicio=datetime.date(2020, 1, 1), fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=sea
+        )
+        MedidaAvance.objects.create(medida=medida, descripcion='Avance', fecha_limite=datetime.date(2024, 6, 30))
+
+    def test_medidas_avance_usa_renderer_rapido(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        response = self.client.get(reverse('medida-avance-list'))
+        self.assertIsInstance(response.accepted_renderer, CamelCaseORJSONRenderer)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('fechaActualizacion', response.json()['results'][0])
@@ -0,0 +1,143 @@
+import io
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import (
+    OrganismoSectorial, PPDA, Medida, MedidaAvance, ReporteAnual, Actividad, Indicador, ReporteConsolidado,
+    PerfilUsuario
+)
+from reportes.consolidado import generar_reporte_consolidado
+from reportes.series import actualizar_agregados
+import datetime
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+User = get_user_model()
+
+MEDIA_PRUEBAS = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_PRUEBAS, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class GenerarReporteConsolidadoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.ppda = PPDA.objects.create(
+            nombre='PPDA Coyhaique',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo=cls.sea
+        )
+        medida = Medida.objects.create(
+            nombre='Recambio de calefactores',
+            tipo='regulatoria',
+            descripcion='Recambio de calefactores a leña',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=cls.sea,
+            ppda=cls.ppda
+        )
+        cls.avance = MedidaAvance.objects.create(
+            medida=medida, descripcion='Avance anual', fecha_limite=datetime.date(2023, 12, 31), avance=40, estado='E'
+        )
+        ReporteAnual.objects.create(
+            organismo_responsable=cls.sea, periodo=datetime.date(2023, 12, 31), medida=cls.avance, cumplimiento=80
+        )
+        Actividad.objects.create(
+            nombre='Fiscalización', fecha_inicio=datetime.date(2023, 3, 1), fecha_termino=datetime.date(2023, 9, 30),
+            medida=medida, organismo_responsable=cls.sea
+        )
+        for valor in (10, 30):
+            Indicador.objects.create(
+                nombre='PM2.5', valor=valor, unidad='µg/m³', organismo_sectorial=cls.sea, ppda=cls.ppda,
+                fecha_medicion=timezone.make_aware(datetime.datetime(2023, 6, 15, 12))
+            )
+        actualizar_agregados()
+
+    def test_genera_archivo_y_resumen(self):
+        reporte, regenerado = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+
+        self.assertTrue(regenerado)
+        self.assertTrue(reporte.archivo_reporte.name.startswith('reportes_anuales/'))
+        self.assertEqual(len(reporte.hash_entradas), 64)
+        self.assertIn('Actividades: 1', reporte.resumen_actividades)
+        self.assertIn('Cumplimiento promedio (%): 80.0', reporte.resumen_actividades)
+        with reporte.archivo_reporte.open('rb') as archivo:
+            contenido = zipfile.ZipFile(io.BytesIO(archivo.read()))
+        self.assertIn('xl/worksheets/sheet5.xml', contenido.namelist())
+
+    def test_reutiliza_si_los_datos_no_cambian(self):
+        primero, _ = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+        with mock.patch('reportes.consolidado.escribir_xlsx') as escribir:
+            segundo, regenerado = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+        self.assertFalse(regenerado)
+        escribir.assert_not_called()
+        self.assertEqual(segundo.pk, primero.pk)
+        self.assertEqual(segundo.archivo_reporte.name, primero.archivo_reporte.name)
+
+    def test_regenera_si_cambian_los_datos(self):
+        primero, _ = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+        archivo_anterior = primero.archivo_reporte.name
+        MedidaAvance.objects.filter(pk=self.avance.pk).update(avance=90)
+
+        segundo, regenerado = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+        self.assertTrue(regenerado)
+        self.assertEqual(segundo.pk, primero.pk)
+        self.assertNotEqual(segundo.hash_entradas, primero.hash_entradas)
+        self.assertFalse(segundo.archivo_reporte.storage.exists(archivo_anterior))
+        self.assertEqual(ReporteConsolidado.objects.count(), 1)
+
+    @unittest.skipIf(openpyxl is None, 'openpyxl no está instalado')
+    def test_xlsx_legible(self):
+        reporte, _ = generar_reporte_consolidado(self.sea.id, 2023, ppda_id=self.ppda.id)
+        with reporte.archivo_reporte.open('rb') as archivo:
+            libro = openpyxl.load_workbook(io.BytesIO(archivo.read()), read_only=True)
+        self.assertEqual(libro.sheetnames, ['Resumen', 'Actividades', 'Avances', 'Reportes anuales', 'Indicadores'])
+        indicadores = list(libro['Indicadores'].values)
+        self.assertEqual(indicadores[1][:3], ('PM2.5', 'µg/m³', 20))
+        self.assertEqual(list(libro['Avances'].values)[1][5], 'En progreso')
+
+
+class GenerarReporteConsolidadoViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=cls.sea)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+    def test_generar_encola_tarea(self):
+        with mock.patch('reportes.views.tarea_generar_reporte_consolidado.delay') as delay:
+            delay.return_value.id = 'abc-123'
+            response = self.client.post(
+                reverse('reporte-consolidado-generar'), {'organismo': self.sea.id, 'anio': 2023}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['job_id'], 'abc-123')
+        delay.assert_called_once_with(self.sea.id, 2023, None, False)
+
+    def test_generar_valida_datos(self):
+        response = self.client.post(reverse('reporte-consolidado-generar'), {'organismo': 999999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('anio', response.data)
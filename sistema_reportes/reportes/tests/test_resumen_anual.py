@@ -0,0 +1,104 @@
+from django.urls import reverse
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Medida, MedidaAvance, ReporteAnual
+import datetime
+
+User = get_user_model()
+
+
+class ResumenAnualTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        # Sin alcance por organismo: las pruebas filtran entre organismos
+        cls.user.groups.add(Group.objects.get_or_create(name='auditor')[0])
+        cls.sea = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.sag = OrganismoSectorial.objects.create(nombre='SAG')
+        medida = Medida.objects.create(
+            nombre='Recambio de calefactores',
+            tipo='regulatoria',
+            descripcion='Recambio de calefactores a leña',
+            fecha_inicio=datetime.date(2020, 1, 1),
+            fecha_termino=datetime.date(2030, 12, 31),
+            organismo_responsable=cls.sea
+        )
+        cls.avance = MedidaAvance.objects.create(
+            medida=medida,
+            descripcion='Avance anual',
+            fecha_limite=datetime.date(2030, 12, 31)
+        )
+
+    def crear_periodos(self, anios):
+        for anio in anios:
+            periodo = datetime.date(anio, 12, 31)
+            for organismo, cumplimiento in ((self.sea, 60), (self.sea, 80), (self.sag, 40)):
+                ReporteAnual.objects.create(
+                    organismo_responsable=organismo,
+                    periodo=periodo,
+                    medida=self.avance,
+                    cumplimiento=cumplimiento
+                )
+
+    def consultar_resumen(self, **params):
+        cache.clear()
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(reverse('reporte-anual-resumen-anual'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(contexto.captured_queries)
+
+    def test_resumen_por_periodo_y_organismo(self):
+        self.crear_periodos([2022])
+        response, _ = self.consultar_resumen()
+
+        self.assertEqual(len(response.data), 1)
+        periodo = response.data[0]
+        self.assertEqual(periodo['periodo'], datetime.date(2022, 12, 31))
+        self.assertEqual(periodo['promedio_cumplimiento'], 60)
+        self.assertEqual(periodo['minimo_cumplimiento'], 40)
+        self.assertEqual(periodo['maximo_cumplimiento'], 80)
+        self.assertEqual(periodo['total_reportes'], 3)
+        organismos = {o['organismo']: o for o in periodo['organismos']}
+        self.assertEqual(organismos['SEA']['promedio_cumplimiento'], 70)
+        self.assertEqual(organismos['SEA']['total_reportes'], 2)
+        self.assertEqual(organismos['SAG']['organismo_nombre'], 'Servicio Agrícola y Ganadero')
+
+    def test_resumen_filtros(self):
+        self.crear_periodos([2020, 2021, 2022, 2023])
+
+        response, _ = self.consultar_resumen(anio_desde=2021, anio_hasta=2022)
+        self.assertEqual([p['periodo'].year for p in response.data], [2021, 2022])
+
+        response, _ = self.consultar_resumen(organismo_id=self.sag.id)
+        self.assertEqual(len(response.data), 4)
+        self.assertTrue(all(p['promedio_cumplimiento'] == 40 for p in response.data))
+
+    def test_resumen_cantidad_de_consultas_constante(self):
+        self.crear_periodos([2020, 2021])
+        _, consultas_pocos_periodos = self.consultar_resumen()
+
+        self.crear_periodos(range(2022, 2032))
+        response, consultas_muchos_periodos = self.consultar_resumen()
+
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(consultas_pocos_periodos, consultas_muchos_periodos)
+
+    def test_parametros_invalidos(self):
+        self.client.force_authenticate(user=self.user)
+        for params in ({'anio_desde': 'abc'}, {'anio_hasta': '2020-01'}, {'organismo_id': 'abc'}):
+            response = self.client.get(reverse('reporte-anual-resumen-anual'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        for params in ({'organismo_id': 'abc'}, {'periodo': '2022-13-01'}):
+            response = self.client.get(reverse('reporte-anual-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        self.crear_periodos([2022])
+        response, _ = self.consultar_resumen(anio_desde='', organismo_id='')
+        self.assertEqual(len(response.data), 1)
@@ -0,0 +1,124 @@
+import datetime
+import shutil
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from reportes.datos_sinteticos import _insertar, generar_datos, limpiar_datos
+from reportes.models import (
+    Actividad, AlertaCritica, EjecucionSincronizacion, EstadoIntegracion, Indicador, Medida, MedidaAvance,
+    OrganismoSectorial, PerfilUsuario, PPDA, ReglaAlerta, ReporteAnual, ReporteConsolidado
+)
+
+User = get_user_model()
+
+MEDIA_PRUEBAS = tempfile.mkdtemp()
+
+
+def contenido():
+    """
+    Filas generadas sin ids ni fechas de creación, para comparar cargas (la
+    clave de las alertas lleva el id de la regla).
+    """
+    return {
+        'medidas': list(Medida.objects.order_by('id').values_list('nombre', 'tipo', 'prioridad', 'fecha_inicio')),
+        'avances': list(MedidaAvance.objects.order_by('id').values_list('descripcion', 'avance', 'estado')),
+        'reportes': list(ReporteAnual.objects.order_by('id').values_list('periodo', 'cumplimiento')),
+        'actividades': list(Actividad.objects.order_by('id').values_list('nombre', 'descripcion', 'fecha_termino')),
+        'indicadores': list(
+            Indicador.objects.order_by('id').values_list('nombre', 'valor', 'unidad', 'estacion', 'clave_deduplicacion')
+        ),
+        'alertas': sorted(
+            AlertaCritica.objects.values_list('regla__descripcion', 'estacion', 'fecha_medicion', 'valor')
+        ),
+    }
+
+
+class CargaCopyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_copy_y_bulk_create_cargan_lo_mismo(self):
+        volumenes = {'indicadores': 2000, 'avances': 60, 'actividades': 30, 'ppdas': 2}
+        generar_datos(**volumenes, tamano_lote=700, agregados=False, usar_copy=True)
+        con_copy = contenido()
+        limpiar_datos()
+        generar_datos(**volumenes, tamano_lote=700, agregados=False, usar_copy=False)
+        self.assertEqual(con_copy, contenido())
+        self.assertTrue(con_copy['alertas'])
+
+    def test_valores_por_defecto_y_escape(self):
+        medida = Medida.objects.create(
+            nombre='Recambio', tipo='regulatoria', descripcion='Recambio', fecha_inicio=datetime.date(2024, 1, 1),
+            fecha_termino=datetime.date(2024, 12, 31), organismo_responsable=OrganismoSectorial.objects.create(
+                nombre='SEA'
+            )
+        )
+        texto = 'Tabulación\tbarra \\N y\nsalto de línea'
+        [lote] = _insertar(
+            MedidaAvance, [{'medida_id': medida.id, 'descripcion': texto, 'fecha_limite': datetime.date(2024, 6, 1)}],
+            10, usar_copy=True
+        )
+        avance = MedidaAvance.objects.get(id=lote[0]['id'])
+        self.assertEqual(avance.descripcion, texto)
+        self.assertEqual((avance.avance, avance.estado, avance.observaciones), (0, 'P', ''))
+        self.assertIsNotNone(avance.fecha_actualizacion)
+        self.assertIsNotNone(MedidaAvance.objects.filter(id=avance.id).values_list('busqueda', flat=True)[0])
+
+    def test_recargar_no_repite_lecturas(self):
+        generar_datos(indicadores=500, ppdas=1, agregados=False)
+        generar_datos(indicadores=500, ppdas=1, agregados=False)
+        self.assertEqual(Indicador.objects.count(), 1000)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class SeedDatosTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_PRUEBAS, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, **opciones):
+        salida = StringIO()
+        opciones = {'indicadores': 3000, 'avances': 200, 'actividades': 100, 'ppdas': 3, **opciones}
+        call_command('seed_datos', stdout=salida, **opciones)
+        return salida.getvalue()
+
+    def test_todos_los_modelos_con_valores_validos(self):
+        salida = self.seed(password='clave-segura-123')
+        self.assertIn('Datos cargados con COPY', salida)
+
+        for modelo in (PPDA, Medida, MedidaAvance, ReporteAnual, Actividad, Indicador, EjecucionSincronizacion):
+            self.assertTrue(modelo.objects.exists(), modelo.__name__)
+            for fila in modelo.objects.order_by('?')[:20]:
+                fila.clean_fields(exclude=['medio_verificacion'])
+        self.assertEqual(set(EstadoIntegracion.objects.values_list('fuente', flat=True)), {'snifa', 'airecoo'})
+        self.assertEqual(ReglaAlerta.objects.count(), 6)
+        self.assertTrue(AlertaCritica.objects.filter(regla__isnull=False).exists())
+        for reporte in ReporteConsolidado.objects.all():
+            self.assertTrue(reporte.archivo_reporte.storage.exists(reporte.archivo_reporte.name))
+
+        usuario = User.objects.get(username='usuario_sea')
+        self.assertTrue(usuario.check_password('clave-segura-123'))
+        self.assertEqual(usuario.groups.get().name, 'user')
+        self.assertEqual(PerfilUsuario.objects.get(user=usuario).organismo.nombre, 'SEA')
+
+    def test_limpiar_reconstruye_los_mismos_datos(self):
+        self.seed(sin_consolidados=True)
+        avances = list(MedidaAvance.objects.order_by('id').values_list('descripcion', 'avance'))
+        usuarios = User.objects.count()
+        self.seed(sin_consolidados=True, limpiar=True, sin_copy=True)
+        self.assertEqual(list(MedidaAvance.objects.order_by('id').values_list('descripcion', 'avance')), avances)
+        self.assertEqual(Indicador.objects.count(), 3000)
+        self.assertEqual(User.objects.count(), usuarios)
+        self.assertFalse(User.objects.get(username='admin_seed').has_usable_password())
+
+    def test_cantidades_invalidas(self):
+        with self.assertRaises(CommandError):
+            self.seed(ppdas=0)
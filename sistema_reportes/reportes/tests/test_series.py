@@ -0,0 +1,148 @@
+import threading
+import time
+from unittest import mock
+from django.urls import reverse
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from reportes.models import OrganismoSectorial, Indicador, IndicadorAgregado, PerfilUsuario
+from reportes.series import BLOQUEO_AGREGADOS, actualizar_agregados
+from reportes.tasks import tarea_actualizar_agregados_indicadores
+import datetime
+
+User = get_user_model()
+
+
+def crear_lectura(organismo, fecha, valor, nombre='PM2.5'):
+    return Indicador.objects.create(
+        nombre=nombre,
+        valor=valor,
+        unidad='µg/m³',
+        organismo_sectorial=organismo,
+        fecha_medicion=fecha
+    )
+
+
+class AgregadosIndicadorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+        cls.base = timezone.make_aware(datetime.datetime(2024, 5, 10, 8, 15))
+
+    def test_agregados_por_resolucion(self):
+        crear_lectura(self.organismo, self.base, 10)
+        crear_lectura(self.organismo, self.base + datetime.timedelta(minutes=30), 20)
+        crear_lectura(self.organismo, self.base + datetime.timedelta(hours=3), 60)
+        actualizar_agregados()
+
+        horas = IndicadorAgregado.objects.filter(resolucion='hora').order_by('periodo')
+        self.assertEqual([(h.promedio, h.cantidad) for h in horas], [(15, 2), (60, 1)])
+
+        dia = IndicadorAgregado.objects.get(resolucion='dia')
+        self.assertEqual((dia.promedio, dia.minimo, dia.maximo, dia.cantidad), (30, 10, 60, 3))
+        self.assertEqual(IndicadorAgregado.objects.get(resolucion='mes').cantidad, 3)
+
+    def test_actualizacion_incremental(self):
+        crear_lectura(self.organismo, self.base - datetime.timedelta(days=40), 5)
+        crear_lectura(self.organismo, self.base, 10)
+        actualizar_agregados()
+        anterior = IndicadorAgregado.objects.get(resolucion='dia', periodo__lt=self.base - datetime.timedelta(days=1))
+
+        nueva = crear_lectura(self.organismo, self.base + datetime.timedelta(hours=1), 30)
+        actualizar_agregados(desde=nueva.fecha_medicion)
+
+        dia = IndicadorAgregado.objects.get(resolucion='dia', periodo__gte=self.base - datetime.timedelta(days=1))
+        self.assertEqual((dia.promedio, dia.cantidad), (20, 2))
+        # Los periodos anteriores a la ingesta no se recalculan
+        self.assertTrue(IndicadorAgregado.objects.filter(pk=anterior.pk).exists())
+
+    def test_actualizaciones_concurrentes_se_esperan(self):
+        # Otra conexión (otro worker) está actualizando los agregados
+        tomado, soltar = threading.Event(), threading.Event()
+
+        def sostener():
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_lock(%s, %s)', BLOQUEO_AGREGADOS)
+                    tomado.set()
+                    soltar.wait()
+                    cursor.execute('SELECT pg_advisory_unlock(%s, %s)', BLOQUEO_AGREGADOS)
+            finally:
+                connection.close()
+
+        hilo = threading.Thread(target=sostener)
+        hilo.start()
+        tomado.wait()
+        threading.Timer(0.3, soltar.set).start()
+        crear_lectura(self.organismo, self.base, 10)
+        inicio = time.monotonic()
+        actualizar_agregados(resoluciones=['dia'])
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.3)
+        hilo.join()
+        self.assertEqual(IndicadorAgregado.objects.filter(resolucion='dia').count(), 1)
+
+
+class SeriesIndicadoresViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='analista', password='testpass123')
+        cls.user.groups.add(Group.objects.create(name='user'))
+        cls.organismo = OrganismoSectorial.objects.create(nombre='SEA')
+        PerfilUsuario.objects.filter(user=cls.user).update(organismo=cls.organismo)
+        base = timezone.make_aware(datetime.datetime(2024, 5, 10, 8, 0))
+        for dias in range(3):
+            crear_lectura(cls.organismo, base + datetime.timedelta(days=dias), 10 * (dias + 1))
+            crear_lectura(cls.organismo, base + datetime.timedelta(days=dias), 1, nombre='SO2')
+        actualizar_agregados()
+
+    def test_serie_diaria(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('indicadores-series'), {'resolucion': 'dia', 'nombre': 'PM2.5'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['promedio'] for p in response.data], [10, 20, 30])
+
+    def test_escrituras_por_api_actualizan_la_serie(self):
+        self.client.force_authenticate(user=self.user)
+        datos = {
+            'nombre': 'PM2.5', 'valor': 40, 'unidad': 'µg/m³', 'organismoSectorial': self.organismo.id,
+            'fechaMedicion': '2024-05-11T12:00:00Z',
+        }
+        encolar = mock.patch(
+            'reportes.views.tarea_actualizar_agregados_indicadores.delay',
+            side_effect=lambda desde: tarea_actualizar_agregados_indicadores.apply(args=[desde]),
+        )
+        with encolar as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('indicador-list'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        delay.assert_called_once()
+        self.assertEqual(datetime.datetime.fromisoformat(delay.call_args.args[0]).date(), datetime.date(2024, 5, 11))
+        serie = self.client.get(reverse('indicadores-series'), {'resolucion': 'dia', 'nombre': 'PM2.5'})
+        self.assertEqual([p['promedio'] for p in serie.data], [10, 30, 30])
+
+        with encolar, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('indicador-detail', args=[response.data['id']]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        serie = self.client.get(reverse('indicadores-series'), {'resolucion': 'dia', 'nombre': 'PM2.5'})
+        self.assertEqual([p['promedio'] for p in serie.data], [10, 20, 30])
+
+    def test_resolucion_invalida(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('indicadores-series'), {'resolucion': 'semana'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_parametros_invalidos(self):
+        self.client.force_authenticate(user=self.user)
+        for params in ({'organismo_id': 'abc'}, {'ppda_id': '1.5'}, {'desde': '2024-13-01'}, {'hasta': 'ayer'}):
+            response = self.client.get(reverse('indicadores-series'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_filtro_por_fechas(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            reverse('indicadores-series'), {'nombre': 'PM2.5', 'desde': '2024-05-11', 'hasta': '2024-05-11T23:59'}
+        )
+        self.assertEqual([p['promedio'] for p in response.data], [20])
@@ -0,0 +1,172 @@
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from reportes.datos_sinteticos import generar_datos
+from reportes.instrumentacion import estadisticas_consultas, reiniciar_estadisticas
+from reportes.models import OrganismoSectorial, PerfilUsuario, ReporteAnual
+from reportes.serializers import TokenConGruposSerializer
+
+User = get_user_model()
+
+
+@override_settings(SQL_PRESUPUESTO_ESTRICTO=True)
+class VistasAsincronasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generar_datos(indicadores=400, avances=80, actividades=10, ppdas=2)
+        cls.admin = User.objects.create_user(username='admin1', password='testpass123')
+        cls.admin.groups.add(Group.objects.create(name='admin'))
+        cls.analista = User.objects.create_user(username='analista', password='testpass123')
+        cls.analista.groups.add(Group.objects.create(name='user'))
+        cls.organismo = OrganismoSectorial.objects.filter(reporteanual__isnull=False).order_by('id').first()
+        PerfilUsuario.objects.filter(user=cls.analista).update(organismo=cls.organismo)
+        cls.auditor = User.objects.create_user(username='auditor', password='testpass123')
+        cls.auditor.groups.add(Group.objects.create(name='auditor'))
+        cls.tokens = {
+            user.username: str(TokenConGruposSerializer.get_token(user).access_token)
+            for user in (cls.admin, cls.analista, cls.auditor)
+        }
+
+    def autorizacion(self, user):
+        return {'authorization': f'Bearer {self.tokens[user.username]}'} if user else {}
+
+    def setUp(self):
+        cache.clear()
+
+    async def get_sync(self, ruta, user, **parametros):
+        cliente = APIClient()
+        cliente.credentials(HTTP_AUTHORIZATION=self.autorizacion(user)['authorization'])
+        return await sync_to_async(cliente.get)(reverse(ruta), parametros)
+
+    async def get_async(self, ruta, user=None, args=(), **parametros):
+        return await self.async_client.get(reverse(ruta, args=args), parametros, headers=self.autorizacion(user))
+
+    async def assertMismaRespuesta(self, sincronica, asincronica, user, **parametros):
+        esperada = await self.get_sync(sincronica, user, **parametros)
+        response = await self.get_async(asincronica, user, **parametros)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], esperada['Content-Type'])
+        if response.streaming:
+            data = json.loads(b''.join([parte async for parte in response.streaming_content]))
+        else:
+            data = response.json()
+        self.assertEqual(data, esperada.json())
+        return data
+
+    async def test_series_igual_que_la_vista_sincronica(self):
+        data = await self.assertMismaRespuesta(
+            'indicadores-series', 'async-indicadores-series', self.admin, resolucion='mes'
+        )
+        self.assertTrue(data)
+        self.assertIn('organismoSectorialId', data[0])
+
+        with mock.patch('reportes.vistas_asincronas.TAMANO_PARTE', 7):
+            await self.assertMismaRespuesta(
+                'indicadores-series', 'async-indicadores-series', self.admin, resolucion='dia'
+            )
+        data = await self.assertMismaRespuesta(
+            'indicadores-series', 'async-indicadores-series', self.admin, nombre='no existe'
+        )
+        self.assertEqual(data, [])
+
+        response = await self.get_async('async-indicadores-series', self.admin, resolucion='semana')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_dashboard_igual_que_la_vista_sincronica(self):
+        data = await self.assertMismaRespuesta('dashboard-cumplimiento', 'async-dashboard-cumplimiento', self.admin)
+        self.assertTrue(data)
+        self.assertIsNotNone(data[0]['organismoNombre'])
+
+    async def test_resumen_anual_con_alcance_del_organismo(self):
+        data = await self.assertMismaRespuesta('reporte-anual-resumen-anual', 'async-resumen-anual', self.analista)
+        total = sum(periodo['totalReportes'] for periodo in data)
+        self.assertEqual(total, await ReporteAnual.objects.filter(organismo_responsable=self.organismo).acount())
+        self.assertEqual(
+            {organismo['organismoId'] for periodo in data for organismo in periodo['organismos']},
+            {self.organismo.id}
+        )
+        await self.assertMismaRespuesta(
+            'reporte-anual-resumen-anual', 'async-resumen-anual', self.admin, anio_desde=2023
+        )
+
+    async def test_series_y_dashboard_con_alcance_del_organismo(self):
+        for sincronica, asincronica, campo in (
+            ('indicadores-series', 'async-indicadores-series', 'organismoSectorialId'),
+            ('dashboard-cumplimiento', 'async-dashboard-cumplimiento', 'organismo'),
+        ):
+            data = await self.assertMismaRespuesta(sincronica, asincronica, self.analista)
+            self.assertTrue(data)
+            self.assertEqual({fila[campo] for fila in data}, {self.organismo.id})
+
+            otro = await OrganismoSectorial.objects.exclude(pk=self.organismo.pk).afirst()
+            data = await self.assertMismaRespuesta(sincronica, asincronica, self.analista, organismo_id=otro.id)
+            self.assertEqual(data, [])
+
+    async def test_parametros_invalidos(self):
+        for ruta, parametros in (
+            ('async-indicadores-series', {'desde': 'ayer'}),
+            ('async-dashboard-cumplimiento', {'anio': 'abc'}),
+            ('async-resumen-anual', {'organismo_id': 'abc'}),
+        ):
+            response = await self.get_async(ruta, self.admin, **parametros)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, ruta)
+
+    async def test_estado_integraciones(self):
+        esperada = (await self.get_sync('estado_integraciones', self.admin)).json()
+        data = (await self.get_async('async-estado-integraciones', self.admin)).json()
+        for fila in esperada + data:
+            fila.pop('rezagoSegundos')
+        self.assertEqual(data, esperada)
+        self.assertEqual([fila['fuente'] for fila in data], ['snifa', 'airecoo'])
+
+    async def test_autenticacion_y_permisos(self):
+        response = await self.get_async('async-dashboard-cumplimiento')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        response = await self.async_client.get(
+            reverse('async-dashboard-cumplimiento'), headers={'authorization': 'Bearer invalido'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.get_async('async-indicadores-series', self.auditor)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.get_async('async-estado-integraciones', self.analista)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.get_async('async-integrar-snifa', self.admin)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(response['Allow'], 'POST')
+
+    async def test_integrar_encola_y_retorna_job_id(self):
+        with mock.patch('reportes.vistas_asincronas.tarea_integrar_fuentes.delay') as delay:
+            delay.return_value.id = 'abc-123'
+            response = await self.async_client.post(
+                reverse('async-integrar-fuentes'), headers=self.autorizacion(self.admin)
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()['job_id'], 'abc-123')
+        delay.assert_called_once_with()
+
+        with mock.patch('reportes.views.AsyncResult') as resultado:
+            resultado.return_value.state = 'SUCCESS'
+            resultado.return_value.successful.return_value = True
+            resultado.return_value.result = {'snifa': {'insertadas': 3}}
+            response = await self.get_async('async-estado-tarea', self.admin, args=['abc-123'])
+        self.assertEqual(response.json(), {
+            'job_id': 'abc-123', 'estado': 'SUCCESS', 'resultado': {'snifa': {'insertadas': 3}}
+        })
+
+    async def test_instrumentacion_en_modo_async(self):
+        reiniciar_estadisticas()
+        await self.get_async('async-dashboard-cumplimiento', self.admin)
+        estadisticas = {fila['endpoint']: fila for fila in estadisticas_consultas()}
+        self.assertEqual(estadisticas['dashboard_cumplimiento_async']['peticiones'], 1)
+        self.assertEqual(estadisticas['dashboard_cumplimiento_async']['presupuesto'], 4)
+        self.assertGreaterEqual(estadisticas['dashboard_cumplimiento_async']['consultas'], 2)
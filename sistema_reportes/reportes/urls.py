@@ -1,20 +1,65 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import OrganismoSectorialViewSet, PPDAViewSet, MedidaAvanceViewSet, frontend_view, integrar_snifa, integrar_airecoo
+from .views import (
+    OrganismoSectorialViewSet,
+    PPDAViewSet,
+    MedidaAvanceViewSet,
+    IndicadorViewSet,
+    ActividadViewSet,
+    ReporteAnualViewSet,
+    ReporteConsolidadoViewSet,
+    frontend_view,
+    integrar_snifa,
+    integrar_airecoo,
+    integrar_fuentes,
+    estado_sincronizacion,
+    estado_tarea,
+    series_indicadores,
+    dashboard_cumplimiento,
+    diagnostico_consultas,
+    exportar_datos,
+    buscar_texto,
+)
+from . import vistas_asincronas
 
 router = DefaultRouter()
 router.register(r'organismos-sectoriales', OrganismoSectorialViewSet, basename='organismo-sectorial')
 router.register(r'planes-ppda', PPDAViewSet, basename='ppda')
 router.register(r'medidas-avance', MedidaAvanceViewSet, basename='medida-avance')
-router.register(r'indicadores', MedidaAvanceViewSet, basename='indicadores')
+router.register(r'indicadores', IndicadorViewSet, basename='indicador')
+router.register(r'actividades', ActividadViewSet, basename='actividad')
+router.register(r'reportes-anuales', ReporteAnualViewSet, basename='reporte-anual')
+router.register(r'reportes-consolidados', ReporteConsolidadoViewSet, basename='reporte-consolidado')
+
+# Variantes async de las lecturas del dashboard y de las integraciones, para servir con ASGI
+urlpatterns_async = [
+    path('indicadores/series/', vistas_asincronas.series_indicadores_async, name='async-indicadores-series'),
+    path(
+        'dashboard/cumplimiento/', vistas_asincronas.dashboard_cumplimiento_async,
+        name='async-dashboard-cumplimiento'
+    ),
+    path('reportes-anuales/resumen_anual/', vistas_asincronas.resumen_anual_async, name='async-resumen-anual'),
+    path('integrar-snifa/', vistas_asincronas.integrar_snifa_async, name='async-integrar-snifa'),
+    path('integrar-airecoo/', vistas_asincronas.integrar_airecoo_async, name='async-integrar-airecoo'),
+    path('integrar-fuentes/', vistas_asincronas.integrar_fuentes_async, name='async-integrar-fuentes'),
+    path('integraciones/estado/', vistas_asincronas.estado_sincronizacion_async, name='async-estado-integraciones'),
+    path('integraciones/tareas/<str:job_id>/', vistas_asincronas.estado_tarea_async, name='async-estado-tarea'),
+]
 
 urlpatterns = [
+    # Debe ir antes del router para no confundirse con el detalle de indicadores
+    path('indicadores/series/', series_indicadores, name='indicadores-series'),
     path('', include(router.urls)),
     path('auth/', include('rest_framework.urls', namespace='rest_framework')),
     path('frontend/', frontend_view, name='frontend'),  # Nueva ruta para el frontend
     path('integrar-snifa/', integrar_snifa, name='integrar_snifa'),
     path('integrar-airecoo/', integrar_airecoo, name='integrar_airecoo'),
-
-
-
+    path('integrar-fuentes/', integrar_fuentes, name='integrar_fuentes'),
+    path('integraciones/estado/', estado_sincronizacion, name='estado_integraciones'),
+    path('integraciones/tareas/<str:job_id>/', estado_tarea, name='estado_tarea'),
+    path('dashboard/cumplimiento/', dashboard_cumplimiento, name='dashboard-cumplimiento'),
+    path('diagnostico/consultas/', diagnostico_consultas, name='diagnostico-consultas'),
+    path('exportar/<str:conjunto>/', exportar_datos, name='exportar'),
+    path('buscar/', buscar_texto, name='buscar'),
+    path('async/', include(urlpatterns_async)),
 ]
@@ -1,54 +1,101 @@
 from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated, BasePermission
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, BasePermission
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.db import transaction
 from django.db.models import Prefetch
-from .models import OrganismoSectorial, PPDA, MedidaAvance, Indicador, Actividad, ReporteAnual
+from .models import OrganismoSectorial, PPDA, Medida, MedidaAvance, Indicador, Actividad, ReporteAnual, ReporteConsolidado
 from .serializers import (
     OrganismoSectorialSerializer,
     PPDASerializer,
+    MedidaSerializer,
     MedidaAvanceSerializer,
     IndicadorSerializer,
     ActividadSerializer,
     ReporteAnualSerializer,
+    CumplimientoSnapshotSerializer,
+    ReporteConsolidadoSerializer,
+    GenerarReporteConsolidadoSerializer,
 )
-from .snifa_integration import obtener_datos_snifa
-from .airecoo_integration import obtener_datos_airecoo
+from .alcance import alcance_de_request, guardar_en_alcance, verificar_organismos
+from .arbol import arbol_ppda, etag_arbol
+from .busqueda import LIMITE_MAXIMO, MODELOS_BUSQUEDA, buscar
+from .cache_respuestas import CacheHTTPMixin
+from .cumplimiento import resumen_cumplimiento
+from .exportacion import CONJUNTOS, TIPOS_CONTENIDO, exportar, parquet_disponible
+from .filtros import (
+    ActividadFilter,
+    IndicadorFilter,
+    MedidaAvanceFilter,
+    PPDAFilter,
+    ReporteAnualFilter,
+    ReporteConsolidadoFilter,
+    reportes_de_request,
+    serie_de_request,
+    snapshots_de_request,
+)
+from .grupos import tiene_grupo
+from .listas import ListaValoresMixin, nombre_opcion
+from .instrumentacion import estadisticas_consultas, presupuesto_consultas
+from .paginacion import KeysetPagination
+from .renderers import RENDERERS_RAPIDOS
+from .sincronizacion import estado_integraciones
 from rest_framework.decorators import api_view, permission_classes
+from celery.result import AsyncResult
+from .tasks import (
+    tarea_integrar_snifa,
+    tarea_integrar_airecoo,
+    tarea_integrar_fuentes,
+    tarea_generar_reporte_consolidado,
+    tarea_actualizar_agregados_indicadores,
+)
 
 class IsAdminPermission(BasePermission):
     """
     Permiso para usuarios del grupo 'admin'
     """
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='admin').exists()
+        return tiene_grupo(request, 'admin')
 
 class IsUserPermission(BasePermission):
     """
     Permiso para usuarios del grupo 'user'
     """
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='user').exists()
+        return tiene_grupo(request, 'user')
 
 class IsAuditorPermission(BasePermission):
     """
     Permiso para usuarios del grupo 'auditor'
     """
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='auditor').exists()
+        return tiene_grupo(request, 'auditor')
 
 class IsAdminOrUserPermission(BasePermission):
     """
     Permiso para usuarios de los grupos 'admin' o 'user'
     """
     def has_permission(self, request, view):
-        return request.user.groups.filter(name__in=['admin', 'user']).exists()
+        return tiene_grupo(request, 'admin', 'user')
 
-class OrganismoSectorialViewSet(viewsets.ModelViewSet):
+class IsAdminOrAuditorPermission(BasePermission):
+    """
+    Permiso para usuarios de los grupos 'admin' o 'auditor'
+    """
+    def has_permission(self, request, view):
+        return tiene_grupo(request, 'admin', 'auditor')
+
+class OrganismoSectorialViewSet(CacheHTTPMixin, viewsets.ModelViewSet):
     serializer_class = OrganismoSectorialSerializer
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    presupuesto_consultas = {'list': 4, 'retrieve': 3, '*': 6}
+    campo_modificacion = 'fecha_actualizacion'
+    campo_organismo = 'id'
     
     def get_queryset(self):
         queryset = OrganismoSectorial.objects.all().order_by('nombre')
@@ -68,195 +115,416 @@ class OrganismoSectorialViewSet(viewsets.ModelViewSet):
             headers=headers
         )
 
-class PPDAViewSet(viewsets.ModelViewSet):
+class PPDAViewSet(CacheHTTPMixin, ListaValoresMixin, viewsets.ModelViewSet):
     serializer_class = PPDASerializer
     permission_classes = [IsAuthenticated, IsAdminPermission,]
+    presupuesto_consultas = {'list': 5, 'retrieve': 4, 'arbol': 7, '*': 6}
+    campo_modificacion = 'fecha_actualizacion'
+    modelos_cache = (PPDA, OrganismoSectorial)
+    campo_organismo = 'organismo_id'
+    filterset_class = PPDAFilter
+    campos_lista = {
+        'id': 'id',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'fecha_inicio': 'fecha_inicio',
+        'fecha_termino': 'fecha_termino',
+        'fecha_creacion': 'fecha_creacion',
+    }
+    campos_lista_fecha_hora = ('fecha_creacion',)
+    campos_lista_organismo = {'organismo_nombre': 'organismo_id'}
     
     def get_queryset(self):
-        queryset = PPDA.objects.select_related('organismo').order_by('-fecha_creacion')
-        organismo_id = self.request.query_params.get('organismo_id')
-        if organismo_id:
-            queryset = queryset.filter(organismo_id=organismo_id)
-        return queryset
+        return PPDA.objects.order_by('-fecha_creacion')
     
     @action(detail=True, methods=['get'])
     def medidas(self, request, pk=None):
         ppda = self.get_object()
-        medidas = ppda.medida_set.all()
-        serializer = MedidaAvanceSerializer(medidas, many=True)
+        medidas = ppda.medidas.order_by('id')
+        serializer = MedidaSerializer(medidas, many=True)
         return Response(serializer.data)
 
-class MedidaAvanceViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def arbol(self, request, pk=None):
+        """
+        PPDA con sus medidas, los avances y actividades de cada medida y sus
+        indicadores, armado con prefetch y servido desde la cache.
+        """
+        ppda = self.get_object()
+        etag = etag_arbol(ppda.pk)
+        respuesta = get_conditional_response(request, etag=quote_etag(etag))
+        if respuesta is None:
+            respuesta = Response(arbol_ppda(ppda, self.get_serializer_context(), etag))
+        respuesta['ETag'] = quote_etag(etag)
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        patch_vary_headers(respuesta, ('Authorization',))
+        return respuesta
+
+class MedidaAvanceViewSet(CacheHTTPMixin, ListaValoresMixin, viewsets.ModelViewSet):
     serializer_class = MedidaAvanceSerializer
     permission_classes = [IsAuthenticated, IsAdminOrUserPermission]
+    presupuesto_consultas = {'list': 5, 'retrieve': 4, 'crear_lote': 20, 'actualizar_lote': 20, '*': 15}
+    renderer_classes = RENDERERS_RAPIDOS
+    campo_modificacion = 'fecha_actualizacion'
+    modelos_cache = (MedidaAvance, Medida)
+    campo_organismo = 'medida__organismo_responsable_id'
+    filterset_class = MedidaAvanceFilter
+    campos_lista = {
+        'id': 'id',
+        'medida_nombre': 'medida__nombre',
+        'medida_tipo': nombre_opcion('medida__tipo', Medida.TIPOS_MEDIDA),
+        'descripcion': 'descripcion',
+        'fecha_limite': 'fecha_limite',
+        'avance': 'avance',
+        'estado': 'estado',
+        'observaciones': 'observaciones',
+        'fecha_actualizacion': 'fecha_actualizacion',
+    }
+    campos_lista_fecha_hora = ('fecha_actualizacion',)
     
     def get_queryset(self):
-        queryset = MedidaAvance.objects.select_related(
+        return MedidaAvance.objects.select_related(
             'medida', 
             'medida__ppda'
         ).order_by('-fecha_actualizacion')
-        
-        estado = self.request.query_params.get('estado')
-        if estado:
-            queryset = queryset.filter(estado=estado)
-            
-        avance_min = self.request.query_params.get('avance_min')
-        if avance_min:
-            queryset = queryset.filter(avance__gte=avance_min)
-            
-        return queryset
-    
+
+    def _verificar_medidas(self, datos):
+        verificar_organismos(
+            self.request, [avance['medida'].organismo_responsable_id for avance in datos if 'medida' in avance]
+        )
+
+    def perform_create(self, serializer):
+        self._verificar_medidas([serializer.validated_data])
+        serializer.save()
+
     def perform_update(self, serializer):
-        instance = serializer.save()
-        instance.fecha_actualizacion = timezone.now()
-        instance.save()
+        self._verificar_medidas([serializer.validated_data])
+        serializer.save()
+
+    def _validar_lote(self, data):
+        if not isinstance(data, list) or not data:
+            return "Se espera una lista no vacía de avances."
+        if len(data) > settings.MEDIDA_AVANCE_LOTE_MAXIMO:
+            return f"El lote no puede superar {settings.MEDIDA_AVANCE_LOTE_MAXIMO} avances."
+        return None
+
+    @action(detail=False, methods=['post'], url_path='lote', url_name='lote')
+    def crear_lote(self, request):
+        """
+        Crea varios avances en una transacción. Si un elemento es inválido no se crea ninguno.
+        """
+        error = self._validar_lote(request.data)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self._verificar_medidas(serializer.validated_data)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @crear_lote.mapping.patch
+    def actualizar_lote(self, request):
+        """
+        Actualización parcial en lote; cada elemento identifica su avance con `id`.
+        """
+        error = self._validar_lote(request.data)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        ids = [item.get('id') if isinstance(item, dict) else None for item in request.data]
+        if len(set(ids)) != len(ids):
+            return Response({"error": "Hay ids repetidos en el lote."}, status=status.HTTP_400_BAD_REQUEST)
+        avances = self.filter_queryset(self.get_queryset()).in_bulk([i for i in ids if isinstance(i, int)])
+        faltantes = [i for i in ids if avances.get(i) is None]
+        if faltantes:
+            return Response(
+                {"error": "Avances inexistentes.", "ids": faltantes},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer([avances[i] for i in ids], data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        self._verificar_medidas(serializer.validated_data)
+        serializer.save()
+        return Response(serializer.data)
 
-class ActividadViewSet(viewsets.ModelViewSet):
+class IndicadorViewSet(CacheHTTPMixin, ListaValoresMixin, viewsets.ModelViewSet):
+    serializer_class = IndicadorSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrUserPermission]
+    presupuesto_consultas = {'list': 5, 'retrieve': 5, '*': 7}
+    pagination_class = KeysetPagination
+    renderer_classes = RENDERERS_RAPIDOS
+    modelos_cache = (Indicador, OrganismoSectorial, PPDA)
+    campo_organismo = 'organismo_sectorial_id'
+    filterset_class = IndicadorFilter
+    validar_con_total = False
+    campos_lista = {
+        'id': 'id',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'valor': 'valor',
+        'unidad': 'unidad',
+        'ppda_nombre': 'ppda__nombre',
+        'fecha_registro': 'fecha_registro',
+        'fecha_medicion': 'fecha_medicion',
+        'medio_verificacion': 'medio_verificacion',
+    }
+    campos_lista_fecha_hora = ('fecha_medicion',)
+    campos_lista_archivo = ('medio_verificacion',)
+    campos_lista_organismo = {'organismo_nombre': 'organismo_sectorial_id'}
+
+    def get_queryset(self):
+        return Indicador.objects.select_related('ppda').order_by('-fecha_registro', '-id')
+
+    def _actualizar_series(self, *fechas):
+        """
+        Las lecturas escritas por la API también entran en las series: se
+        recalculan los agregados desde la fecha de medición más antigua
+        afectada, en un worker, cuando la transacción se confirma.
+        """
+        desde = min(fechas).isoformat()
+        transaction.on_commit(lambda: tarea_actualizar_agregados_indicadores.delay(desde), robust=True)
+
+    def perform_create(self, serializer):
+        indicador = guardar_en_alcance(self.request, serializer, 'organismo_sectorial')
+        self._actualizar_series(indicador.fecha_medicion)
+
+    def perform_update(self, serializer):
+        anterior = serializer.instance.fecha_medicion
+        indicador = guardar_en_alcance(self.request, serializer, 'organismo_sectorial')
+        self._actualizar_series(anterior, indicador.fecha_medicion)
+
+    def perform_destroy(self, instance):
+        fecha = instance.fecha_medicion
+        instance.delete()
+        self._actualizar_series(fecha)
+
+class ActividadViewSet(CacheHTTPMixin, ListaValoresMixin, viewsets.ModelViewSet):
     serializer_class = ActividadSerializer
     permission_classes = [IsAuthenticated, IsAdminOrUserPermission]
+    presupuesto_consultas = {'list': 6, 'retrieve': 5, '*': 7}
+    modelos_cache = (Actividad, Medida, OrganismoSectorial)
+    campo_organismo = 'organismo_responsable_id'
+    filterset_class = ActividadFilter
+    campos_lista = {
+        'id': 'id',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'fecha_inicio': 'fecha_inicio',
+        'fecha_termino': 'fecha_termino',
+        'medida_nombre': 'medida__nombre',
+    }
+    campos_lista_organismo = {'organismo_nombre': 'organismo_responsable_id'}
     
     def get_queryset(self):
-        queryset = Actividad.objects.select_related(
-            'organismo_responsable',
-            'medida'
-        ).order_by('-fecha_inicio')
-        
-        # Filtro por organismo del usuario
-        if not self.request.user.is_superuser:
-            queryset = queryset.filter(
-                organismo_responsable=self.request.user.perfilusuario.organismo_responsable
-            )
-            
-        # Filtros adicionales
-        medida_id = self.request.query_params.get('medida_id')
-        if medida_id:
-            queryset = queryset.filter(medida_id=medida_id)
-            
-        estado = self.request.query_params.get('estado')
-        if estado:
-            queryset = queryset.filter(estado=estado)
-            
-        return queryset
+        # El filtro por organismo del usuario lo aplica AlcanceOrganismoFilter
+        # y los de la query ActividadFilter
+        return Actividad.objects.select_related('medida').order_by('-fecha_inicio')
 
     def perform_create(self, serializer):
-        if not hasattr(self.request.user, 'perfilusuario'):
-            raise PermissionDenied("Usuario no tiene perfil asignado")
-        if not self.request.user.perfilusuario.organismo_responsable:
-            raise PermissionDenied("Usuario no tiene organismo asignado")
-        serializer.save(organismo_responsable=self.request.user.perfilusuario.organismo_responsable)
+        guardar_en_alcance(self.request, serializer, 'organismo_responsable')
         
     def perform_update(self, serializer):
-        instance = serializer.save()
-        instance.fecha_actualizacion = timezone.now()
-        instance.save()
+        guardar_en_alcance(self.request, serializer, 'organismo_responsable')
 
-class ReporteAnualViewSet(viewsets.ModelViewSet):
+class ReporteAnualViewSet(CacheHTTPMixin, ListaValoresMixin, viewsets.ModelViewSet):
     serializer_class = ReporteAnualSerializer
     permission_classes = [IsAuthenticated, IsAdminOrUserPermission]
+    presupuesto_consultas = {'list': 6, 'resumen_anual': 4, 'retrieve': 5, '*': 15}
+    filterset_class = ReporteAnualFilter
+    modelos_cache = (ReporteAnual, OrganismoSectorial, MedidaAvance, Medida)
+    campo_organismo = 'organismo_responsable_id'
+    campos_lista = {
+        'id': 'id',
+        'periodo': 'periodo',
+        'medida_nombre': 'medida__medida__nombre',
+        'cumplimiento': 'cumplimiento',
+        'observaciones': 'observaciones',
+    }
+    campos_lista_organismo = {'organismo_nombre': 'organismo_responsable_id'}
     
     def get_queryset(self):
-        queryset = ReporteAnual.objects.select_related(
-            'organismo_responsable',
-            'medida'
-        ).prefetch_related(
-            'medida__medidaavance_set'
-        ).order_by('-periodo')
-        
-        periodo = self.request.query_params.get('periodo')
-        if periodo:
-            queryset = queryset.filter(periodo=periodo)
-            
-        organismo_id = self.request.query_params.get('organismo_id')
-        if organismo_id:
-            queryset = queryset.filter(organismo_responsable_id=organismo_id)
-            
-        return queryset
+        # Los filtros de la query los aplica ReporteAnualFilter
+        return ReporteAnual.objects.select_related('medida__medida').order_by('-periodo')
 
     def perform_create(self, serializer):
-        serializer.save(organismo_responsable=self.request.user.perfilusuario.organismo_responsable)
+        guardar_en_alcance(self.request, serializer, 'organismo_responsable')
+
+    def perform_update(self, serializer):
+        guardar_en_alcance(self.request, serializer, 'organismo_responsable')
         
     @action(detail=False, methods=['get'])
     def resumen_anual(self, request):
-        periodos = ReporteAnual.objects.values_list('periodo', flat=True).distinct()
-        data = []
-        for periodo in periodos:
-            reportes = ReporteAnual.objects.filter(periodo=periodo)
-            promedio = reportes.aggregate(Avg('cumplimiento'))['cumplimiento__avg']
-            data.append({
-                'periodo': periodo,
-                'promedio_cumplimiento': round(promedio, 2) if promedio else 0
-            })
-        return Response(data)
+        return Response(resumen_cumplimiento(reportes_de_request(request)))
 
-def frontend_view(request):
-    return render(request, 'reportes/index.html')
+class ReporteConsolidadoViewSet(CacheHTTPMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = ReporteConsolidadoSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrUserPermission]
+    presupuesto_consultas = {'list': 6, 'retrieve': 5, 'generar': 6}
+    campo_modificacion = 'fecha_generacion'
+    modelos_cache = (ReporteConsolidado, OrganismoSectorial, PPDA)
+    campo_organismo = 'organismo_responsable_id'
+    filterset_class = ReporteConsolidadoFilter
 
-def guardar_datos_snifa(datos):
-    if not isinstance(datos, list):
-        raise ValueError("Los datos deben ser una lista")
-        
-    indicadores = []
-    for dato in datos:
-        if not all(key in dato for key in ['parametro', 'valor']):
-            raise ValueError(f"Datos incompletos en SNIFA: {dato}")
-            
-        indicador = Indicador(
-            nombre=dato['parametro'],
-            valor=dato['valor'],
-            unidad="µg/m³",
-            organismo_sectorial_id=1,
-            fuente="SNIFA"
+    def get_queryset(self):
+        return ReporteConsolidado.objects.select_related('ppda').order_by('-periodo', '-fecha_creacion')
+
+    @action(detail=False, methods=['post'])
+    def generar(self, request):
+        """
+        Encola la generación del reporte consolidado de un organismo, PPDA y año.
+        """
+        serializer = GenerarReporteConsolidadoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        verificar_organismos(request, [datos['organismo'].id])
+        ppda = datos.get('ppda')
+        tarea = tarea_generar_reporte_consolidado.delay(
+            datos['organismo'].id, datos['anio'], ppda.id if ppda else None, datos['forzar']
+        )
+        return Response(
+            {"mensaje": "Generación del reporte consolidado encolada.", "job_id": tarea.id},
+            status=status.HTTP_202_ACCEPTED
         )
-        indicadores.append(indicador)
-    
-    # Bulk create para mejor performance
-    Indicador.objects.bulk_create(indicadores)
+
+@presupuesto_consultas(3)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrUserPermission])
+def series_indicadores(request):
+    """
+    Serie de indicadores leída desde la tabla de agregados según resolución.
+    """
+    return Response(list(serie_de_request(request)))
+
+@presupuesto_consultas(3)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrUserPermission])
+def buscar_texto(request):
+    """
+    Búsqueda de texto completo en PPDA, medidas, avances y actividades,
+    ordenada por relevancia.
+    """
+    texto = request.query_params.get('q', '').strip()
+    if not texto:
+        return Response({"error": "Debe indicar el texto a buscar en 'q'"}, status=status.HTTP_400_BAD_REQUEST)
+    modelos = [m for m in request.query_params.get('modelos', '').split(',') if m]
+    invalidos = [m for m in modelos if m not in MODELOS_BUSQUEDA]
+    if invalidos:
+        return Response(
+            {"error": f"Modelos inválidos: {', '.join(invalidos)}; use {', '.join(MODELOS_BUSQUEDA)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limite = min(int(request.query_params.get('limite', 20)), LIMITE_MAXIMO)
+    except ValueError:
+        return Response({"error": "El límite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+    if limite < 1:
+        return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+    resultados = buscar(texto, modelos, limite, organismo_id=alcance_de_request(request))
+    return Response({'consulta': texto, 'resultados': resultados})
+
+@presupuesto_consultas(4)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrUserPermission])
+def dashboard_cumplimiento(request):
+    """
+    Cumplimiento por PPDA, organismo y año leído desde los snapshots precalculados.
+    """
+    return Response(CumplimientoSnapshotSerializer(snapshots_de_request(request), many=True).data)
+
+@presupuesto_consultas(3)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrAuditorPermission])
+def exportar_datos(request, conjunto):
+    """
+    Descarga completa de un conjunto en CSV, XLSX o Parquet. Las filas se
+    leen con un cursor y se envían a medida que se generan.
+    """
+    if conjunto not in CONJUNTOS:
+        return Response(
+            {"error": f"Conjunto inválido, use uno de: {', '.join(CONJUNTOS)}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    formato = request.query_params.get('formato', 'csv')
+    if formato not in TIPOS_CONTENIDO:
+        return Response(
+            {"error": f"Formato inválido, use uno de: {', '.join(TIPOS_CONTENIDO)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if formato == 'parquet' and not parquet_disponible():
+        return Response(
+            {"error": "La exportación Parquet requiere pyarrow."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    response = StreamingHttpResponse(
+        exportar(conjunto, formato, request.query_params),
+        content_type=TIPOS_CONTENIDO[formato]
+    )
+    nombre = f"{conjunto}-{timezone.localdate():%Y%m%d}.{formato}"
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return response
+
+def frontend_view(request):
+    return render(request, 'reportes/index.html')
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminPermission])
 def integrar_snifa(request):
-    try:
-        datos_snifa = obtener_datos_snifa()
-        if not datos_snifa:
-            return JsonResponse({"error": "No se recibieron datos de SNIFA."}, status=500)
-        guardar_datos_snifa(datos_snifa)
-        return JsonResponse({"mensaje": "Datos de SNIFA integrados correctamente."})
-    except ValueError as ve:
-        return JsonResponse({"error": f"Error de validación: {str(ve)}"}, status=400)
-    except Exception as e:
-        return JsonResponse({"error": f"Error al integrar datos de SNIFA: {str(e)}"}, status=500)
-
-def guardar_datos_airecoo(datos):
-    if not isinstance(datos, list):
-        raise ValueError("Los datos deben ser una lista")
-        
-    indicadores = []
-    for dato in datos:
-        if not all(key in dato for key in ['nombre', 'valor', 'unidad']):
-            raise ValueError(f"Datos incompletos en Airecoo: {dato}")
-            
-        indicador = Indicador(
-            nombre=dato['nombre'],
-            valor=dato['valor'],
-            unidad=dato['unidad'],
-            organismo_sectorial_id=1,
-            fuente="Airecoo"
-        )
-        indicadores.append(indicador)
-    
-    # Bulk create para mejor performance
-    Indicador.objects.bulk_create(indicadores)
+    tarea = tarea_integrar_snifa.delay()
+    return JsonResponse(
+        {"mensaje": "Integración de SNIFA encolada.", "job_id": tarea.id},
+        status=status.HTTP_202_ACCEPTED
+    )
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminPermission])
 def integrar_airecoo(request):
-    try:
-        datos_airecoo = obtener_datos_airecoo()
-        if not datos_airecoo:
-            return JsonResponse({"error": "No se recibieron datos de Airecoo."}, status=500)
-        guardar_datos_airecoo(datos_airecoo)
-        return JsonResponse({"mensaje": "Datos de Airecoo integrados correctamente."})
-    except ValueError as ve:
-        return JsonResponse({"error": f"Error de validación: {str(ve)}"}, status=400)
-    except Exception as e:
-        return JsonResponse({"error": f"Error al integrar datos de Airecoo: {str(e)}"}, status=500)
+    tarea = tarea_integrar_airecoo.delay()
+    return JsonResponse(
+        {"mensaje": "Integración de Airecoo encolada.", "job_id": tarea.id},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminPermission])
+def integrar_fuentes(request):
+    tarea = tarea_integrar_fuentes.delay()
+    return JsonResponse(
+        {"mensaje": "Integración de SNIFA y Airecoo encolada.", "job_id": tarea.id},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+@presupuesto_consultas(10)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminPermission])
+def estado_sincronizacion(request):
+    """
+    Última ejecución, rezago y throughput de cada integración.
+    """
+    return Response(estado_integraciones())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminPermission])
+def estado_tarea(request, job_id):
+    """
+    Estado de una tarea encolada por los endpoints de integración.
+    """
+    return JsonResponse(datos_tarea(job_id))
+
+def datos_tarea(job_id):
+    """
+    Estado y resultado de una tarea desde el backend de resultados de Celery.
+    """
+    resultado = AsyncResult(job_id)
+    data = {"job_id": job_id, "estado": resultado.state}
+    if resultado.successful():
+        data["resultado"] = resultado.result
+    elif resultado.failed():
+        data["error"] = str(resultado.result)
+    return data
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def diagnostico_consultas(request):
+    """
+    Estadísticas de SQL por endpoint acumuladas por InstrumentacionSQLMiddleware (solo staff).
+    """
+    return Response(estadisticas_consultas())
@@ -0,0 +1,193 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .cumplimiento import aresumen_cumplimiento
+from .filtros import reportes_de_request, serie_de_request, snapshots_de_request
+from .instrumentacion import presupuesto_consultas
+from .serializers import CumplimientoSnapshotSerializer
+from .sincronizacion import aestado_integraciones
+from .tasks import tarea_integrar_airecoo, tarea_integrar_fuentes, tarea_integrar_snifa
+from .views import IsAdminOrUserPermission, IsAdminPermission, datos_tarea
+
+# Filas por parte de las respuestas que se envían a medida que se leen
+TAMANO_PARTE = 2000
+
+
+def responder(data, status=status.HTTP_200_OK):
+    """
+    Respuesta JSON con el primer renderer de DRF, para que la salida sea la
+    misma que la de las vistas sincrónicas.
+    """
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), content_type=renderer.media_type, status=status)
+
+
+async def _arreglo_json(filas, tamano):
+    """
+    Arreglo JSON de las filas de un iterador async, renderizado y enviado
+    de a `tamano` filas.
+    """
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    yield b'['
+    parte, separador = [], b''
+    async for fila in filas:
+        parte.append(fila)
+        if len(parte) == tamano:
+            yield separador + renderer.render(parte)[1:-1]
+            parte, separador = [], b','
+    if parte:
+        yield separador + renderer.render(parte)[1:-1]
+    yield b']'
+
+
+def _error(exc, request, autenticadores=()):
+    """
+    Respuesta de una APIException con el exception_handler de DRF.
+    """
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        cabecera = autenticadores[0].authenticate_header(request) if autenticadores else None
+        if cabecera:
+            exc.auth_header = cabecera
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    error = exception_handler(exc, {'request': request})
+    response = responder(error.data, error.status_code)
+    for cabecera in ('WWW-Authenticate', 'Retry-After'):
+        if cabecera in error:
+            response[cabecera] = error[cabecera]
+    return response
+
+
+def _autorizar(request, permisos):
+    """
+    Autentica y verifica los permisos como APIView.initial. Retorna la
+    Request de DRF y la respuesta de error, si la hay.
+    """
+    autenticadores = [clase() for clase in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    drf_request = Request(request, authenticators=autenticadores)
+    try:
+        drf_request.user
+        for clase in permisos:
+            permiso = clase()
+            if not permiso.has_permission(drf_request, None):
+                if autenticadores and not drf_request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permiso, 'message', None))
+    except exceptions.APIException as exc:
+        return drf_request, _error(exc, drf_request, autenticadores)
+    return drf_request, None
+
+
+def vista_asincrona(*permisos, metodos=('GET',)):
+    """
+    Vista async de la API para servir con ASGI. DRF 3.14 no tiene vistas
+    async: la autenticación y los permisos de DRF, que pueden consultar la
+    base, corren con sync_to_async y la vista recibe la Request de DRF.
+    Las APIException de la vista se responden como en DRF. Solo responde
+    JSON (sin API navegable).
+    """
+    metodos = set(metodos) | ({'HEAD'} if 'GET' in metodos else set())
+
+    def decorador(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            if request.method not in metodos:
+                response = _error(exceptions.MethodNotAllowed(request.method), request)
+                response['Allow'] = ', '.join(sorted(metodos))
+                return response
+            drf_request, error = await sync_to_async(_autorizar)(request, permisos)
+            if error is not None:
+                return error
+            try:
+                return await vista(drf_request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return _error(exc, drf_request)
+
+        # Igual que las vistas de DRF: la autenticación es por JWT, sin sesión
+        envoltura.csrf_exempt = True
+        return envoltura
+    return decorador
+
+
+@presupuesto_consultas(3)
+@vista_asincrona(IsAuthenticated, IsAdminOrUserPermission)
+async def series_indicadores_async(request):
+    """
+    Versión async de series_indicadores. La serie se lee con aiterator y se
+    envía por partes, sin cargarla completa en memoria.
+    """
+    # El alcance puede consultar la base: el queryset se arma fuera del event loop
+    serie = await sync_to_async(serie_de_request)(request)
+    return StreamingHttpResponse(
+        _arreglo_json(serie.aiterator(chunk_size=TAMANO_PARTE), TAMANO_PARTE),
+        content_type=api_settings.DEFAULT_RENDERER_CLASSES[0].media_type
+    )
+
+
+@presupuesto_consultas(4)
+@vista_asincrona(IsAuthenticated, IsAdminOrUserPermission)
+async def dashboard_cumplimiento_async(request):
+    """
+    Versión async de dashboard_cumplimiento.
+    """
+    snapshots = [snapshot async for snapshot in await sync_to_async(snapshots_de_request)(request)]
+    # Los nombres de organismo salen de la cache de referencias, que puede consultar la base
+    data = await sync_to_async(lambda: CumplimientoSnapshotSerializer(snapshots, many=True).data)()
+    return responder(data)
+
+
+@presupuesto_consultas(4)
+@vista_asincrona(IsAuthenticated, IsAdminOrUserPermission)
+async def resumen_anual_async(request):
+    """
+    Versión async de ReporteAnualViewSet.resumen_anual, con el mismo
+    alcance por organismo.
+    """
+    queryset = await sync_to_async(reportes_de_request)(request)
+    return responder(await aresumen_cumplimiento(queryset))
+
+
+@presupuesto_consultas(10)
+@vista_asincrona(IsAuthenticated, IsAdminPermission)
+async def estado_sincronizacion_async(request):
+    """
+    Versión async de estado_sincronizacion.
+    """
+    return responder(await aestado_integraciones())
+
+
+@vista_asincrona(IsAuthenticated, IsAdminPermission)
+async def estado_tarea_async(request, job_id):
+    """
+    Versión async de estado_tarea. El backend de resultados se consulta
+    fuera del event loop.
+    """
+    return JsonResponse(await sync_to_async(datos_tarea)(job_id))
+
+
+async def _encolar(tarea, mensaje):
+    # Publicar en el broker es I/O bloqueante: se hace fuera del event loop
+    resultado = await sync_to_async(tarea.delay)()
+    return JsonResponse({"mensaje": mensaje, "job_id": resultado.id}, status=status.HTTP_202_ACCEPTED)
+
+
+@vista_asincrona(IsAuthenticated, IsAdminPermission, metodos=('POST',))
+async def integrar_snifa_async(request):
+    return await _encolar(tarea_integrar_snifa, "Integración de SNIFA encolada.")
+
+
+@vista_asincrona(IsAuthenticated, IsAdminPermission, metodos=('POST',))
+async def integrar_airecoo_async(request):
+    return await _encolar(tarea_integrar_airecoo, "Integración de Airecoo encolada.")
+
+
+@vista_asincrona(IsAuthenticated, IsAdminPermission, metodos=('POST',))
+async def integrar_fuentes_async(request):
+    return await _encolar(tarea_integrar_fuentes, "Integración de SNIFA y Airecoo encolada.")
@@ -1,8 +1,7 @@
-from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sistema_reportes.settings')
 app = Celery('sistema_reportes')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
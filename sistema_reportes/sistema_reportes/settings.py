@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
+from celery.schedules import crontab
 
 
 load_dotenv()
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
@@ -34,6 +36,7 @@ INSTALLED_APPS = [
 # Middleware
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'reportes.instrumentacion.InstrumentacionSQLMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,8 +78,36 @@ DATABASES = {
         'PORT': '5432',       # El puerto por defecto de PostgreSQL
     }
 }
-# Autenticación y permisos
-AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+
+# Cache compartida entre procesos web y workers. CACHE_URL acepta
+# redis://host:puerto/db, file:///ruta/directorio, db://tabla (requiere
+# `manage.py createcachetable`) o locmem:// (por proceso, valor por defecto;
+# no sirve para la cache de respuestas)
+CACHE_URL = os.getenv('CACHE_URL', 'locmem://')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    _CACHE_BACKEND = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}
+elif CACHE_URL.startswith('file://'):
+    _CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL[len('file://'):],
+    }
+elif CACHE_URL.startswith('db://'):
+    _CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': CACHE_URL[len('db://'):] or 'cache_reportes',
+    }
+else:
+    _CACHE_BACKEND = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sistema-reportes'}
+CACHES = {
+    'default': {
+        **_CACHE_BACKEND,
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'reportes'),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+    }
+}
+
+# Autenticación y permisos (los permisos se resuelven desde la cache)
+AUTHENTICATION_BACKENDS = ['reportes.referencias.PermisosCacheBackend']
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -100,13 +131,53 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'reportes.serializers.TokenConGruposSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'reportes.serializers.TokenRefreshConGruposSerializer',
 }
 
+# Tiempo (segundos) que se guardan en cache los grupos de cada usuario
+GRUPOS_CACHE_TIMEOUT = int(os.getenv('GRUPOS_CACHE_TIMEOUT', '300'))
+
+# Tiempo (segundos) de los datos de referencia en cache (organismos y
+# permisos); además se invalidan por versión al guardar o eliminar
+REFERENCIAS_CACHE_TIMEOUT = int(os.getenv('REFERENCIAS_CACHE_TIMEOUT', '86400'))
+
+# Cache de respuestas GET de la API (ETag y respuestas serializadas); se
+# invalida por versión de modelo al escribir, también desde los workers, así
+# que requiere una cache compartida y por defecto se activa solo si la hay
+RESPUESTAS_CACHE = os.getenv('RESPUESTAS_CACHE', str(not _CACHE_BACKEND['BACKEND'].endswith('LocMemCache'))) == 'True'
+RESPUESTAS_CACHE_TIMEOUT = int(os.getenv('RESPUESTAS_CACHE_TIMEOUT', '300'))
+
+# Árbol de un PPDA (/planes-ppda/{id}/arbol/): indicadores más recientes que
+# incluye y segundos en cache (se invalida antes si cambia cualquiera de sus filas)
+PPDA_ARBOL_MAX_INDICADORES = int(os.getenv('PPDA_ARBOL_MAX_INDICADORES', '100'))
+PPDA_ARBOL_CACHE_TIMEOUT = int(os.getenv('PPDA_ARBOL_CACHE_TIMEOUT', '86400'))
+
+# Máximo de avances por request en los endpoints de lote
+MEDIDA_AVANCE_LOTE_MAXIMO = int(os.getenv('MEDIDA_AVANCE_LOTE_MAXIMO', '500'))
+
+# Filas leídas por vuelta del cursor (y por row group en Parquet) al exportar
+EXPORTACION_CHUNK_SIZE = int(os.getenv('EXPORTACION_CHUNK_SIZE', '5000'))
+
+# Instrumentación SQL por endpoint, activa por defecto solo en desarrollo. Con
+# presupuesto estricto (desarrollo y tests) exceder el presupuesto en una
+# lectura lanza una excepción; en escrituras y en producción solo se registra
+# un warning. Las estadísticas se guardan para una fracción de las requests
+# (cada una cuesta unas cinco operaciones en la cache).
+SQL_INSTRUMENTACION = os.getenv('SQL_INSTRUMENTACION', str(DEBUG)) == 'True'
+SQL_ESTADISTICAS_MUESTREO = float(os.getenv('SQL_ESTADISTICAS_MUESTREO', '1' if DEBUG else '0.1'))
+SQL_PRESUPUESTO_ESTRICTO = os.getenv('SQL_PRESUPUESTO_ESTRICTO', str(DEBUG)) == 'True'
+SQL_CONSULTAS_LENTAS = int(os.getenv('SQL_CONSULTAS_LENTAS', '5'))
+SQL_ESTADISTICAS_TIMEOUT = int(os.getenv('SQL_ESTADISTICAS_TIMEOUT', '86400'))
+
 # DRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework_simplejwt.authentication.JWTAuthentication'],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_FILTER_BACKENDS': [
+        'reportes.alcance.AlcanceOrganismoFilter',
+        'django_filters.rest_framework.DjangoFilterBackend',
+    ],
     'DEFAULT_RENDERER_CLASSES': [
         'djangorestframework_camel_case.render.CamelCaseJSONRenderer',
         'djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer',
@@ -160,6 +231,9 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Logging
@@ -216,6 +290,41 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Celery
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_TRACK_STARTED = True
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'integrar-fuentes': {
+        'task': 'reportes.tasks.tarea_integrar_fuentes',
+        'schedule': timedelta(minutes=int(os.getenv('INTEGRACION_INTERVALO_MINUTOS', '15'))),
+    },
+    # Los snapshots se mantienen por señales; la reconstrucción diaria actualiza los vencidos
+    'recalcular-snapshots-cumplimiento': {
+        'task': 'reportes.tasks.tarea_recalcular_snapshots_cumplimiento',
+        'schedule': crontab(hour=2, minute=0),
+    },
+}
+
+# Integraciones externas (SNIFA / Airecoo)
+SNIFA_API_URL = os.getenv('SNIFA_API_URL', 'https://snifa.sma.gob.cl/api/datos')
+SNIFA_API_TOKEN = os.getenv('SNIFA_API_TOKEN', '')
+AIRECOO_API_URL = os.getenv('AIRECOO_API_URL', 'http://www.airecoo.mma.gob.cl/api/calidad-aire')
+INTEGRACION_TIMEOUT = (
+    float(os.getenv('INTEGRACION_TIMEOUT_CONEXION', '5')),
+    float(os.getenv('INTEGRACION_TIMEOUT_LECTURA', '30')),
+)
+INTEGRACION_REINTENTOS = int(os.getenv('INTEGRACION_REINTENTOS', '3'))
+INTEGRACION_BACKOFF = float(os.getenv('INTEGRACION_BACKOFF', '0.5'))
+# Registros por bulk_create / transacción, bytes por lectura del stream y errores reportados
+INTEGRACION_TAMANO_LOTE = int(os.getenv('INTEGRACION_TAMANO_LOTE', '1000'))
+INTEGRACION_TAMANO_CHUNK = int(os.getenv('INTEGRACION_TAMANO_CHUNK', '65536'))
+INTEGRACION_MAX_ERRORES = int(os.getenv('INTEGRACION_MAX_ERRORES', '100'))
+# Organismo al que se asignan las lecturas importadas
+INTEGRACION_ORGANISMO_ID = int(os.getenv('INTEGRACION_ORGANISMO_ID', '1'))
+
 # Grupos por defecto
 DEFAULT_GROUPS = {
     'admin': {
@@ -1,4 +1,6 @@
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import permissions
@@ -18,3 +20,6 @@ urlpatterns = [
     path('frontend/', frontend_view, name='frontend'),
     path('integrar-snifa/', integrar_snifa, name='integrar_snifa')
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)